@@ -1,31 +1,31 @@
+import contextlib
+import json
 import os
-import requests
 import re
 import time
 from datetime import datetime
-from youtube_transcript_api import YouTubeTranscriptApi
-import google.generativeai as genai
+import http_session
+import model_router
+import playlist_cache
+import report_index
+import report_mapreduce
+import report_render
+import report_schema
+import report_stream
+import response_cache
+import transcript_cache
+import transcript_compact
+import trend_engine
 import sys
 import io
 
 # Removed manual sys.stdout/stderr wrapping to fix I/O issues
 
 # --- Configuration ---
-def load_config():
-    import json
-    config_path = os.path.join(os.path.dirname(__file__), "config.json")
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = json.load(f)
-                for key, value in config.items():
-                    os.environ[key] = value
-        except Exception:
-            pass
+from app_config import load_config
 
 load_config()
 API_KEY = os.getenv("GOOGLE_API_KEY", "")
-genai.configure(api_key=API_KEY)
 
 PLAYLISTS = {
     "AM": "https://www.youtube.com/playlist?list=PLVups02-DZEWWyOMyk4jjGaWJ_0o1N1iO", # ӽ 𴶷ƾ
@@ -33,161 +33,24 @@ PLAYLISTS = {
 }
 
 OUTPUT_DIR = os.path.join("output", "reports")
-LOG_FILE = "logs/agent_b.log"
-
-def log(message):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    formatted_message = f"[{timestamp}] {message}"
-    
-    # Ensure logs directory exists
-    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-    
-    try:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(formatted_message + "\n")
-    except Exception as e:
-        print(f"Logging file error: {e}")
-        
-    try:
-        # Avoid print encoding issues on Windows
-        print(formatted_message.encode('utf-8', errors='replace').decode('utf-8'))
-    except Exception as e:
-        pass
-
-def get_latest_video_id(playlist_url, timeframe):
-    try:
-        import json
-        response = requests.get(playlist_url, timeout=10)
-        if response.status_code != 200:
-            return None, None
-            
-        # 1. Robust JSON extraction from ytInitialData
-        match = re.search(r'var ytInitialData = (\{.*?\});', response.text)
-        video_data = []
-        if match:
-            try:
-                data = json.loads(match.group(1))
-                # navigate to contents (this path is typical for desktop)
-                try:
-                    section_contents = data['contents']['twoColumnBrowseResultsRenderer']['tabs'][0]['tabRenderer']['content']['sectionListRenderer']['contents'][0]['itemSectionRenderer']['contents'][0]['playlistVideoListRenderer']['contents']
-                    for item in section_contents:
-                        if 'playlistVideoRenderer' in item:
-                            vid = item['playlistVideoRenderer']['videoId']
-                            title = item['playlistVideoRenderer']['title']['runs'][0]['text']
-                            video_data.append((vid, title))
-                except (KeyError, IndexError, TypeError):
-                    pass
-            except Exception as e:
-                log(f"JSON navigation failed: {e}")
-        
-        # 2. Fallback to regex if JSON extraction yielded nothing
-        if not video_data:
-            # Match specifically in playlistVideoRenderer context to pair correctly
-            video_data = re.findall(r'"playlistVideoRenderer":\{"videoId":"([^"]+)".*?"title":\{"runs":\[\{"text":"([^"]+)"\}\]', response.text)
-        
-        # 3. Last resort legacy regex
-        if not video_data:
-            video_data = re.findall(r'"videoId":"([^"]+)".*?"title":\{"runs":\[\{"text":"([^"]+)"\}\]', response.text)
-
-        today_str = datetime.now().strftime("%Y%m%d")
-        today_kr_str = f"{datetime.now().month}월{datetime.now().day}일"
-        
-        for video_id, title in video_data:
-            if today_str in title or today_kr_str in title:
-                log(f"Matched today's video: {title} ({video_id})")
-                return video_id, title
-        
-        if video_data:
-            log(f"No date match, using latest from playlist: {video_data[0][1]} ({video_data[0][0]})")
-            return video_data[0][0], video_data[0][1]
-            
-    except Exception as e:
-        log(f"Error fetching playlist: {e}")
-    return None, None
-
-def get_transcript(video_id, use_description=False):
-    try:
-        from youtube_transcript_api import YouTubeTranscriptApi
-        log(f"Attempting transcript for {video_id}")
-        
-        transcript_list = None
-        
-        # 1. Try static list_transcripts()
-        if hasattr(YouTubeTranscriptApi, 'list_transcripts'):
-            try:
-                log("Trying YouTubeTranscriptApi.list_transcripts(video_id)...")
-                transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
-                log("Success with list_transcripts()")
-            except Exception as e:
-                log(f"list_transcripts() failed: {e}")
-
-        # 2. Try static list()
-        if not transcript_list and hasattr(YouTubeTranscriptApi, 'list'):
-            try:
-                log("Trying YouTubeTranscriptApi.list(video_id)...")
-                transcript_list = YouTubeTranscriptApi.list(video_id)
-                log("Success with YouTubeTranscriptApi.list()")
-            except Exception as e:
-                log(f"YouTubeTranscriptApi.list() failed: {e}")
-
-        # 3. Try instance list()
-        if not transcript_list:
-            try:
-                log("Trying api = YouTubeTranscriptApi(); api.list(video_id)...")
-                api = YouTubeTranscriptApi()
-                transcript_list = api.list(video_id)
-                log("Success with instance list()")
-            except Exception as e:
-                log(f"Instance list() failed: {e}")
-
-        if transcript_list:
-            # Try to find Korean transcript
-            try:
-                transcript = transcript_list.find_generated_transcript(['ko'])
-            except:
-                try:
-                    transcript = transcript_list.find_transcript(['ko'])
-                except:
-                    # Last resort: first available
-                    transcript = next(iter(transcript_list))
-                
-            data = transcript.fetch()
-            return " ".join([s.get('text', '') if isinstance(s, dict) else getattr(s, 'text', '') for s in data])
-        
-    except Exception as e:
-        log(f"Transcript API failed for {video_id}: {e}")
-        
-    # Manual fallback to description ONLY if explicitly requested
-    if use_description:
-        try:
-            log(f"Falling back to video description for {video_id} (requested)")
-            url = f"https://www.youtube.com/watch?v={video_id}"
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                meta_match = re.search(r'"shortDescription":"(.*?)"', response.text)
-                if meta_match:
-                    desc = meta_match.group(1).replace("\\n", "\n")
-                    log("Successfully retrieved video description as fallback.")
-                    return f"[VIDEO DESCRIPTION FALLBACK]\n{desc}"
-        except Exception as e:
-            log(f"Description fallback failed: {e}")
-        
-    return None
-
-def analyze_report(transcript, timeframe):
-    if not transcript:
-        return "No transcript available for analysis."
-    # Use gemini-flash-latest which typically has better quota
-    model = genai.GenerativeModel('gemini-flash-latest')
-    display_timeframe = "AM Brief" if timeframe == "AM" else "PM Brief"
-    
-    prompt = f"""
+# 자막 실패로 재시도할 때는 방금 받은 재생목록을 다시 받을 필요가 없다
+PLAYLIST_REUSE_SECONDS = 600
+MAX_ATTEMPTS = 3
+RETRY_DELAY_SECONDS = 30
+# 응답 캐시 키의 기준 모델 (실제 호출은 model_router 가 후보 중에서 고름)
+REPORT_MODEL = 'gemini-flash-latest'
+# analyze_report 의 프롬프트를 고치면 올릴 것 (이전 응답 캐시를 무효화)
+PROMPT_VERSION = 2
+# 보고서 프롬프트 템플릿 ({display_timeframe}, {transcript}, {trend_context}, {report_date})
+REPORT_PROMPT = """
     당신은 <우석에 닿기를> 투자 동향 분석의 전문 투자 분석 에이전트입니다.
     제공되는 YouTube 영상 자막을 분석하여 [국내주식, 미국주식, 코인] 중심의 '{display_timeframe}' 보고서를 작성하세요.
     
     [분석 대상 자막]
     {transcript}
     
+    {trend_context}
+    
     [보고서 형식 및 지침 - 매우 중요]
     1. 제목: ☀️ <b>{display_timeframe} 투자 동향 요약</b> (반드시 이모지와 굵은 글씨 사용)
     2. 섹션별 필수 포함 내용 및 구조: (각 큰 시장 섹션 전에는 반드시 굵은 실선 `━━━━━━━━━━━━━━━━━━━━━━━━━` 을 넣어주세요)
@@ -260,50 +123,338 @@ def analyze_report(transcript, timeframe):
        - 소제목과 소제목 사이(예: `[지수 동향]`과 `[주요 정책]` 사이)에는 `-------------` (하이픈 13개) 정도의 가벼운 선을 넣어 단락을 구분해 주세요.
        - 각 큰 섹션(국내 시장, 미국 시장, 코인 시장, 투자 인사이트) 직전에는 굵은 실선 구분자(`━━━━━━━━━━━━━━━━━━━━━━━━━`)를 1줄만 짧게 넣어 4가지 파트가 시각적으로 확실히 나뉘게 하세요.
        - 주요 종목명, 상승/하락률, 핵심 수치, 중요 키워드 등은 반드시 **굵은 글씨(**텍스트**)**로 강조하세요.
-    4. 내용: 반드시 오늘 날짜({datetime.now().strftime("%Y-%m-%d")}) 기준으로 가장 최신 정보를 우선하여 요약하세요. (자막에 해당 내용이 부족할 경우, 있는 내용 내에서 카테고리에 맞게 최대한 분류할 것)
+    4. 내용: 반드시 오늘 날짜({report_date}) 기준으로 가장 최신 정보를 우선하여 요약하세요. (자막에 해당 내용이 부족할 경우, 있는 내용 내에서 카테고리에 맞게 최대한 분류할 것)
     5. 면책 조항: 보고서 맨 마지막에 빈 줄을 둔 후, 다음 면책 조항을 포함하세요:
        "⚠️ 본 보고서는 참고용으로만 제공되며, 투자 결정에 대한 모든 책임은 투자자 본인에게 있습니다."
     """
+# 구조화(JSON) 보고서 프롬프트. 고치면 JSON_PROMPT_VERSION 을 올릴 것
+JSON_PROMPT_VERSION = 2
+# ({display_timeframe}, {transcript}, {trend_context}, {report_date}, {example})
+REPORT_JSON_PROMPT = """
+    당신은 <우석에 닿기를> 투자 동향 분석의 전문 투자 분석 에이전트입니다.
+    제공되는 YouTube 영상 자막을 분석하여 [국내주식, 미국주식, 코인] 중심의 '{display_timeframe}' 보고서 내용을
+    아래 JSON 형식으로만 출력하세요 (설명 문장이나 코드 블록 없이 JSON 객체 하나).
+
+    [분석 대상 자막]
+    {transcript}
+
+    {trend_context}
+
+    [JSON 형식 - 예시]
+    {example}
+
+    [작성 지침]
+    1. sections 는 kr(국내 시장), us(미국 시장), crypto(코인 시장), insight(BWS 투자 인사이트) 4개를 이 순서로 모두 포함하세요.
+    2. indices: 지수(코스피/코스닥, 다우/나스닥/S&P500 등)마다 name, value(종가 등 문자열), change_pct(등락률 숫자, 모르면 null), note(한 줄 설명).
+    3. flows: 수급 동향, 거래대금 등 지수 동향 보충 설명 (문장 하나씩).
+    4. policies: 정부 발표, 금리, 연준 인사 발언, 물가 지표, 환율 등 주요 정책/거시 이슈 (title, detail).
+    5. tickers: 특징주와 섹터 (name, change_pct, reason). 등락률이 자막에 없으면 change_pct 는 null.
+    6. comments: crypto 는 시장 심리 및 영향 요인(거시 연동성 위주, "미언급" 같은 표현 금지), insight 는 핵심 코멘트와 향후 투자 전략 2개 이상.
+    7. 반드시 오늘 날짜({report_date}) 기준으로 가장 최신 정보를 우선하세요. 내용이 부족하면 있는 내용 안에서 항목에 맞게 최대한 분류하고, 해당 내용이 없는 목록은 빈 목록 [] 으로 두세요.
+    8. 굵은 글씨(**), HTML 태그, 이모지는 넣지 마세요 (출력 형식은 렌더러가 정합니다).
+    """
+LOG_FILE = "logs/agent_b.log"
+
+def structured_enabled():
+    """REPORT_FORMAT=markdown 이면 예전처럼 모델이 Markdown 을 직접 작성"""
+    load_config()
+    return os.getenv("REPORT_FORMAT", "json").strip().lower() != "markdown"
+
+def log(message):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    formatted_message = f"[{timestamp}] {message}"
+    
+    # Ensure logs directory exists
+    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
     
     try:
-        response = model.generate_content(prompt)
-        return response.text
+        with open(LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(formatted_message + "\n")
     except Exception as e:
-        log(f"Error during Gemini analysis: {e}")
+        print(f"Logging file error: {e}")
+        
+    try:
+        # Avoid print encoding issues on Windows
+        print(formatted_message.encode('utf-8', errors='replace').decode('utf-8'))
+    except Exception as e:
+        pass
+
+def title_has_date(title, day):
+    """제목에 day 날짜(20260302 또는 3월2일)가 들어 있는지"""
+    return day.strftime("%Y%m%d") in title or f"{day.month}월{day.day}일" in title
+
+def find_dated_video(video_data, day):
+    """제목에 day 날짜가 들어간 첫 영상 (videoId, title). 없으면 (None, None)"""
+    for video_id, title, _ in video_data:
+        if title_has_date(title, day):
+            return video_id, title
+    return None, None
+
+def get_latest_video_id(playlist_url, timeframe, max_age=0, target_date=None):
+    try:
+        # 조건부 GET 캐시: 변경이 없으면 파싱된 목록을 스냅샷에서 그대로 받는다
+        video_data = playlist_cache.fetch_videos(playlist_url, max_age=max_age)
+        if video_data is None:
+            return None, None
+        if not video_data:
+            log("No playlistVideoRenderer entries found in playlist page.")
+
+        # target_date 가 주어지면 (백필) 해당 날짜 영상을 찾는다
+        day = target_date or datetime.now()
+        video_id, title = find_dated_video(video_data, day)
+        if video_id:
+            log(f"Matched today's video: {title} ({video_id})")
+            return video_id, title
+        
+        # 최신 영상 대체는 당일 실행에서만 (지난 날짜에 오늘 영상을 쓰지 않도록)
+        if video_data and day.date() == datetime.now().date():
+            log(f"No date match, using latest from playlist: {video_data[0][1]} ({video_data[0][0]})")
+            return video_data[0][0], video_data[0][1]
+            
+    except Exception as e:
+        log(f"Error fetching playlist: {e}")
+    return None, None
+
+def get_transcript(video_id, use_description=False):
+    try:
+        log(f"Attempting transcript for {video_id}")
+        # 저장소(선행 수집 포함) → 원격 조회 순. 최근 "자막 없음" 이면 조회를 건너뜀
+        segments = transcript_cache.get_segments(video_id, log_fn=log)
+        if segments:
+            if not transcript_compact.enabled():
+                return transcript_cache.segments_text(segments)
+            # 추임새/반복/무음 구간 제거 + 토큰 예산 적용.
+            # map-reduce 로 나눠 분석할 긴 자막은 예산으로 자르지 않음 (report_mapreduce)
+            text, stats = transcript_compact.compact(segments, budget=0)
+            if not report_mapreduce.should_use(text):
+                fitted = transcript_compact.fit_text(text)
+                if fitted != text:
+                    text = fitted
+                    stats.update(tokens_after=transcript_compact.estimate_tokens(text), truncated=True)
+            log(f"Transcript compacted: {transcript_compact.summary(stats)}")
+            return text
+    except Exception as e:
+        log(f"Transcript API failed for {video_id}: {e}")
+        
+    # Manual fallback to description ONLY if explicitly requested
+    if use_description:
+        try:
+            log(f"Falling back to video description for {video_id} (requested)")
+            url = f"https://www.youtube.com/watch?v={video_id}"
+            response = http_session.get(url, timeout=10)
+            if response.status_code == 200:
+                meta_match = re.search(r'"shortDescription":"(.*?)"', response.text)
+                if meta_match:
+                    desc = meta_match.group(1).replace("\\n", "\n")
+                    log("Successfully retrieved video description as fallback.")
+                    return f"[VIDEO DESCRIPTION FALLBACK]\n{desc}"
+        except Exception as e:
+            log(f"Description fallback failed: {e}")
+        
+    return None
+
+def _emit_sections(text, on_section):
+    stream = report_stream.SectionStream()
+    for section in stream.feed(text) + stream.close():
+        on_section(section)
+
+def _generate_streaming(model, prompt, timeframe, target_date, on_section):
+    """
+    스트리밍으로 생성하면서 <보고서>.partial 파일에 이어 쓰고,
+    ━━━ 섹션이 완성될 때마다 on_section(섹션 텍스트) 호출
+    """
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    partial_path = report_path(timeframe, target_date) + ".partial"
+    stream = report_stream.SectionStream()
+    chunks = []
+    start = time.time()
+    first_section_at = None
+    try:
+        with open(partial_path, "w", encoding="utf-8") as f:
+            for chunk in model.generate_content(prompt, stream=True):
+                text = chunk.text
+                chunks.append(text)
+                f.write(text)
+                f.flush()
+                for section in stream.feed(text):
+                    first_section_at = first_section_at or time.time() - start
+                    on_section(section)
+        for section in stream.close():
+            first_section_at = first_section_at or time.time() - start
+            on_section(section)
+    finally:
+        try:
+            os.remove(partial_path)
+        except OSError:
+            pass
+    log(f"Streamed report in {time.time() - start:.1f}s (first section after {first_section_at or 0:.1f}s)")
+    return "".join(chunks)
+
+def _generate_structured(model, source, trend, display_timeframe, timeframe, report_date):
+    """구조화 문서 요청 → 검증된 문서. 형식 검증 실패 시 None (모델 호출 오류는 그대로 예외)"""
+    prompt = REPORT_JSON_PROMPT.format(
+        display_timeframe=display_timeframe, transcript=source, trend_context=trend, report_date=report_date,
+        example=json.dumps(report_schema.EXAMPLE, ensure_ascii=False, indent=2))
+    start = time.time()
+    text = model.generate_content(prompt).text
+    try:
+        doc = report_schema.parse(text, timeframe=timeframe, date=report_date)
+    except report_schema.ReportSchemaError as e:
+        log(f"Structured report failed validation: {e}")
         return None
+    log(f"Structured report generated in {time.time() - start:.1f}s")
+    return doc
+
+def analyze_report_structured(transcript, timeframe, target_date=None, on_section=None):
+    """
+    (Markdown 보고서, 구조화 문서 또는 None).
+    구조화 모드(REPORT_FORMAT=json, 기본)에서는 report_schema 형식의 JSON 을 받아 검증하고
+    report_render 로 Markdown 을 그립니다. 검증에 실패하면 Markdown 프롬프트로 다시 요청합니다.
+    on_section 을 넘기면 스트리밍 모드: 완성된 ━━━ 섹션을 생성 도중 바로 넘겨 줍니다
+    (JSON 은 끝까지 받아야 검증할 수 있으므로 스트리밍은 Markdown 프롬프트를 사용,
+    캐시 적중 시에는 저장된 보고서를 섹션 단위로 넘김).
+    """
+    if not transcript:
+        return "No transcript available for analysis.", None
+    display_timeframe = "AM Brief" if timeframe == "AM" else "PM Brief"
+    report_date = (target_date or datetime.now()).strftime("%Y-%m-%d")
+    structured = on_section is None and structured_enabled()
+    # 지난 보고서에서 뽑은 지수/수급 추세 요약 (이 보고서 이전 것만 쓰므로 재실행해도 같은 값)
+    trend = trend_engine.context_for(report_date, timeframe)
+    variant = f"{timeframe}:{response_cache.digest(trend)[:16]}" if trend else timeframe
+
+    # 같은 자막·추세·날짜·프롬프트 버전이면 저장된 응답 재사용
+    json_key = response_cache.make_key(REPORT_MODEL, f"json{JSON_PROMPT_VERSION}.{report_schema.SCHEMA_VERSION}",
+                                       transcript, report_date, variant)
+    cache_key = response_cache.make_key(REPORT_MODEL, PROMPT_VERSION, transcript, report_date, variant)
+    parsed = {}
+
+    def usable(key, text):
+        if key != json_key:
+            return True
+        try:
+            parsed["doc"] = report_schema.parse(text, timeframe=timeframe, date=report_date)
+            return True
+        except report_schema.ReportSchemaError as e:
+            log(f"Cached structured report is invalid, ignoring: {e}")
+            return False
+
+    # 구조화 응답 → Markdown 응답 순으로 찾되 캐시 통계에는 조회 한 번으로 기록
+    hit_key, cached = response_cache.get_any([json_key, cache_key] if structured else [cache_key], accept=usable)
+    if hit_key == json_key:
+        log(f"Gemini response cache hit ({json_key[:12]}, structured)")
+        return report_render.markdown(parsed["doc"]), parsed["doc"]
+    if cached:
+        log(f"Gemini response cache hit ({cache_key[:12]})")
+        if on_section:
+            _emit_sections(cached, on_section)
+        return cached, None
 
-def run_agent_b(timeframe, use_description=False):
-    log(f"Starting Agent B for {timeframe}...")
+    # 후보 모델 중 지연/오류율 기준으로 선택, 느리면 헤지, 할당량 초과 시 다음 모델
+    model = model_router.routed_model("report")
+    if model is None:
+        log("GOOGLE_API_KEY is not set; skipping Gemini analysis.")
+        return None, None
+    
+    # 긴 자막은 구간별 사실 추출(map) 결과를 자막 대신 넣어 보고서 작성(reduce)
+    source = transcript
+    if report_mapreduce.should_use(transcript):
+        facts = report_mapreduce.extract_facts(model, transcript, log_fn=log)
+        if facts:
+            source = facts
+        else:
+            log("Map-reduce failed; falling back to single-shot analysis")
+            source = transcript_compact.fit_text(transcript) if transcript_compact.enabled() else transcript
+    
+    try:
+        if structured:
+            doc = _generate_structured(model, source, trend, display_timeframe, timeframe, report_date)
+            if doc:
+                response_cache.put(json_key, json.dumps(doc, ensure_ascii=False))
+                return report_render.markdown(doc), doc
+            log("Falling back to the Markdown report prompt")
+        prompt = REPORT_PROMPT.format(display_timeframe=display_timeframe, transcript=source,
+                                      trend_context=trend, report_date=report_date)
+        if on_section:
+            report = _generate_streaming(model, prompt, timeframe, target_date, on_section)
+        else:
+            response = model.generate_content(prompt)
+            report = response.text
+        response_cache.put(cache_key, report)
+        return report, None
+    except Exception as e:
+        log(f"Error during Gemini analysis: {e}")
+        return None, None
+
+def analyze_report(transcript, timeframe, target_date=None, on_section=None):
+    """Markdown 보고서만 필요할 때 (analyze_report_structured 참고)"""
+    return analyze_report_structured(transcript, timeframe, target_date=target_date, on_section=on_section)[0]
+
+def report_path(timeframe, target_date=None):
+    date_str = (target_date or datetime.now()).strftime("%Y%m%d")
+    return os.path.join(OUTPUT_DIR, f"{date_str}_{timeframe}_분석보고서.md")
+
+def save_report(report, timeframe, target_date=None, doc=None):
+    """doc(구조화 문서)이 있으면 같은 이름의 .json 사이드카도 저장, 없으면 이전 사이드카 삭제"""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    file_path = report_path(timeframe, target_date)
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write(report)
+    if doc:
+        report_schema.save(doc, file_path)
+    else:
+        report_schema.remove(file_path)
+    log(f"Report saved to {file_path}" + (" (+ structured sidecar)" if doc else ""))
+    try:
+        report_index.add(file_path)
+    except Exception as e:
+        log(f"Report index update failed (will be picked up on next refresh): {e}")
+    return file_path
+
+def _limited(limits, service):
+    """limits: 서비스별 동시 실행 한도 (threading.Semaphore 등). 없으면 제한 없음"""
+    return limits[service] if limits and service in limits else contextlib.nullcontext()
+
+def run_agent_b(timeframe, use_description=False, target_date=None, on_section=None, limits=None):
+    """
+    on_section: 스트리밍 모드에서 완성된 섹션을 받을 콜백 (analyze_report 참고)
+    limits: 다중 실행에서 "youtube"(재생목록·자막) / "gemini"(분석) 호출을 감쌀 한도 (main.run_pipelines)
+    """
+    label = f"{target_date.strftime('%Y%m%d')} {timeframe}" if target_date else timeframe
+    log(f"Starting Agent B for {label}...")
     os.makedirs(OUTPUT_DIR, exist_ok=True)  # output/reports 자동 생성
     playlist_url = PLAYLISTS.get(timeframe)
     
-    for attempt in range(1, 4):
-        video_id, title = get_latest_video_id(playlist_url, timeframe)
+    playlist_max_age = 0
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        with _limited(limits, "youtube"):
+            video_id, title = get_latest_video_id(playlist_url, timeframe, max_age=playlist_max_age,
+                                                  target_date=target_date)
+        # 영상을 찾았다면 다음 시도는 스냅샷 재사용, 못 찾았다면 재검증
+        playlist_max_age = PLAYLIST_REUSE_SECONDS if video_id else 0
         if video_id:
-            log(f"Found video ID: {video_id} | Title: {title} (Attempt {attempt})")
-            transcript = get_transcript(video_id, use_description=use_description)
+            log(f"[{label}] Found video ID: {video_id} | Title: {title} (Attempt {attempt})")
+            with _limited(limits, "youtube"):
+                transcript = get_transcript(video_id, use_description=use_description)
             if transcript:
-                report = analyze_report(transcript, timeframe)
+                with _limited(limits, "gemini"):
+                    report, doc = analyze_report_structured(transcript, timeframe, target_date=target_date,
+                                                            on_section=on_section)
                 if report:
-                    date_str = datetime.now().strftime("%Y%m%d")
-                    file_name = f"{date_str}_{timeframe}_분석보고서.md"
-                    file_path = os.path.join(OUTPUT_DIR, file_name)
-                    
-                    with open(file_path, "w", encoding="utf-8") as f:
-                        f.write(report)
-                    
-                    log(f"Report saved to {file_path}")
+                    save_report(report, timeframe, target_date, doc=doc)
                     return True
+                # 분석이 실패하면 이미 넘긴 섹션과 섞이지 않도록 재시도는 일반 모드로
+                on_section = None
             else:
-                log(f"Failed to extract transcript for {video_id}.")
+                log(f"[{label}] Failed to extract transcript for {video_id}.")
         else:
-            log(f"No video found in playlist (Attempt {attempt}).")
+            log(f"[{label}] No video found in playlist (Attempt {attempt}).")
         
-        if attempt < 3:
-            log("Waiting 30 seconds before retry...")
-            time.sleep(30) # 30 seconds for testing
+        if attempt < MAX_ATTEMPTS:
+            log(f"Waiting {RETRY_DELAY_SECONDS} seconds before retry...")
+            time.sleep(RETRY_DELAY_SECONDS)
             
-    log(f"당일 [{timeframe}] 업데이트 없음")
+    log(f"당일 [{label}] 업데이트 없음")
     return False
 
 if __name__ == "__main__":
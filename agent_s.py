@@ -24,19 +24,14 @@ else:
     VENV_PYTHON = SKILL_PATH / ".venv" / "bin" / "python"
 REPORTS_DIR = Path(__file__).parent / "output" / "reports"   # Agent B 보고서
 SCRIPTS_DIR = Path(__file__).parent / "output" / "scripts"   # Agent S 영상기획
+NOTEBOOKLM_DIR = Path(__file__).parent / "output" / "notebooklm"  # 구조화 보고서의 NotebookLM 렌더링
 
 # --- Configuration ---
-def load_config():
-    import json
-    config_path = os.path.join(os.path.dirname(__file__), "config.json")
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = json.load(f)
-                for key, value in config.items():
-                    os.environ[key] = value
-        except Exception:
-            pass
+from app_config import load_config
+import model_router
+import notebooklm_manifest
+import notebooklm_service
+import report_render
 
 load_config()
 
@@ -57,11 +52,58 @@ def get_venv_python() -> str:
     return "python"
 
 
-def upload_report_to_notebook(report_path: str) -> bool:
+def call_service(command: str, timeout: float, **args) -> dict | None:
+    """
+    상주 브라우저(notebooklm_service.py)로 명령 실행. 서비스를 쓸 수 없으면 None
+    → 호출하는 쪽은 기존처럼 스크립트를 새로 실행
+    """
+    if not notebooklm_service.enabled():
+        return None
+    if notebooklm_service.autostart():
+        if not notebooklm_service.ensure_running(get_venv_python()):
+            return None
+    try:
+        reply = notebooklm_service.call(command, timeout=timeout, notebook_url=NOTEBOOK_URL, **args)
+    except notebooklm_service.ServiceUnavailable as e:
+        log(f"상주 브라우저 사용 불가 ({e}), 새 브라우저로 실행")
+        return None
+    for line in reply.get("log", "").strip().split("\n"):
+        if line.strip():
+            log(f"  [Service] {line}")
+    if reply.get("error"):
+        log(f"  [Service 오류] {reply['error']}")
+    if reply.get("busy"):
+        # 서비스가 아직 처리 중일 수 있으므로 새 브라우저로 다시 실행하지 않음
+        log(f"상주 브라우저 {command} 응답 없음 → 이번 실행은 실패로 처리")
+        return reply
+    log(f"상주 브라우저 {command} 처리 {reply['elapsed']:.1f}초")
+    return reply
+
+
+def upload_report_to_notebook(report_paths) -> bool:
     """
     upload_source.py를 사용해 보고서를 NotebookLM에 업로드합니다.
+    여러 파일이면 한 번의 브라우저/업로드 대화상자로 함께 올림.
+    업로드 기록(notebooklm_manifest)상 이미 올린 파일은 빼고, 모두 올렸으면 브라우저를 띄우지 않음.
+    상주 브라우저 서비스가 있으면 열어 둔 노트북 페이지에서 바로 업로드
     """
-    log("NotebookLM에 보고서 업로드 중...")
+    report_paths = [report_paths] if isinstance(report_paths, (str, Path)) else list(report_paths)
+    report_paths = [os.path.abspath(p) for p in report_paths]
+    uploaded = set(report_paths) - set(notebooklm_manifest.pending(NOTEBOOK_URL, report_paths))
+    if uploaded:
+        log(f"이미 업로드한 파일 건너뜀: {', '.join(os.path.basename(p) for p in sorted(uploaded))}")
+        report_paths = [p for p in report_paths if p not in uploaded]
+    if not report_paths:
+        log("업로드할 새 파일 없음")
+        return True
+    # 노트북 첫 로딩(최대 90초) + 업로드 대기(90초) + 여유, 파일당 30초
+    timeout = 240 + 30 * (len(report_paths) - 1)
+    log(f"NotebookLM에 보고서 업로드 중... ({len(report_paths)}개 파일)")
+
+    reply = call_service("upload", timeout=timeout, paths=report_paths)
+    if reply is not None:
+        log("업로드 성공!" if reply["ok"] else "업로드 실패 (상주 브라우저)")
+        return reply["ok"]
     
     upload_script = Path(__file__).parent / "upload_source.py"
     python_exe = get_venv_python()
@@ -71,13 +113,13 @@ def upload_report_to_notebook(report_path: str) -> bool:
     
     try:
         result = subprocess.run(
-            [python_exe, str(upload_script), report_path, NOTEBOOK_URL],
+            [python_exe, str(upload_script), *report_paths, "--notebook", NOTEBOOK_URL],
             capture_output=True,
             text=True,
             encoding="utf-8",
             errors="replace",
             env=env,
-            timeout=120  # 업로드 최대 2분
+            timeout=timeout
         )
         
         # 로그 출력
@@ -97,7 +139,7 @@ def upload_report_to_notebook(report_path: str) -> bool:
             return False
             
     except subprocess.TimeoutExpired:
-        log("업로드 타임아웃 (120초 초과)")
+        log(f"업로드 타임아웃 ({timeout}초 초과)")
         return False
     except Exception as e:
         log(f"업로드 중 예외 발생: {e}")
@@ -109,6 +151,10 @@ def ask_notebooklm(question: str) -> str | None:
     ask_question.py를 사용해 NotebookLM에 질의합니다.
     """
     log("NotebookLM에 영상 기획 스크립트 생성 요청 중...")
+
+    reply = call_service("ask", timeout=300, question=question)  # 노트북 첫 로딩 + 답변 대기 150초
+    if reply is not None:
+        return reply["result"] if reply["ok"] and reply["result"] else None
     
     python_exe = get_venv_python()
     ask_script = SCRIPTS_PATH / "ask_question.py"
@@ -168,32 +214,25 @@ def ask_notebooklm(question: str) -> str | None:
         return None
 
 
-def generate_fallback_script(report_content: str, timeframe: str, date_str: str) -> str:
+def generate_fallback_script(report_content: str, timeframe: str, date_str: str, doc: dict | None = None) -> str:
     """
     NotebookLM 실패 시 Gemini로 폴백 기획안 생성
+    doc(구조화 보고서)을 주면 보고서 본문 대신 한 줄 요약 목록(report_render.script_input)을 사용
     """
-    import json
-    
     log("NotebookLM 실패 → Gemini 폴백으로 기획안 생성...")
+    if doc:
+        report_content = report_render.script_input(doc)
     
-    # config.json에서 API 키 로드
-    config_path = Path(__file__).parent / "config.json"
     try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = json.load(f)
-        api_key = config.get("GOOGLE_API_KEY", "")
-    except Exception:
-        api_key = ""
-    
-    if not api_key:
+        model = model_router.routed_model("script")
+    except Exception as e:
+        log(f"Gemini 폴백 실패: {e}")
+        return f"# {date_str} {timeframe} 영상 기획안\n\n기획안 생성 중 오류 발생: {e}"
+    if model is None:
         log("Gemini API 키 없음. 기본 템플릿 반환.")
         return f"# {date_str} {timeframe} 영상 기획안 (미생성)\n\n API 키 또는 NotebookLM 연결이 필요합니다."
 
     try:
-        import google.generativeai as genai
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel("gemini-flash-latest")
-        
         if timeframe == "AM":
             opening = "안녕하세요, <우석에 닿기를> 투자 동향 분석입니다. 오늘은 당일 주요 기사들을 바탕으로 어제 시장에 대한 심층 분석 내용을 준비했습니다."
         else:
@@ -221,6 +260,22 @@ def generate_fallback_script(report_content: str, timeframe: str, date_str: str)
         return f"# {date_str} {timeframe} 영상 기획안\n\n기획안 생성 중 오류 발생: {e}"
 
 
+def notebooklm_source(report_file: Path) -> Path:
+    """
+    구조화 사이드카가 있으면 NotebookLM 용 Markdown(제목/표, HTML 없음)을 같은 파일명으로 만들어 반환.
+    없으면 보고서 파일 그대로 (소스 이름은 어느 쪽이든 같다)
+    """
+    content = report_file.read_text(encoding="utf-8")
+    doc = report_render.matching_doc(str(report_file), content)
+    if doc is None:
+        return report_file
+    NOTEBOOKLM_DIR.mkdir(parents=True, exist_ok=True)
+    target = NOTEBOOKLM_DIR / report_file.name
+    target.write_text(report_render.notebooklm_markdown(doc), encoding="utf-8")
+    log(f"구조화 보고서를 NotebookLM 형식으로 렌더링: {target}")
+    return target
+
+
 def create_date_instruction_file(date_str: str) -> str:
     """날짜 인식을 위한 임시 지침 파일 생성"""
     temp_dir = Path(__file__).parent / "tmp"
@@ -239,17 +294,34 @@ def create_date_instruction_file(date_str: str) -> str:
 
 
 
-def run_agent_s(timeframe: str) -> bool:
+def date_instruction_enabled() -> bool:
+    """날짜 지침 파일도 소스로 올릴지 (날마다 소스가 하나씩 늘어나므로 기본 off)"""
+    return os.getenv("NOTEBOOKLM_DATE_INSTRUCTION", "off").strip().lower() in ("on", "1", "true", "yes")
+
+
+def upload_with_instruction(report_path: str, date_str: str) -> bool:
+    """
+    보고서 업로드. NOTEBOOKLM_DATE_INSTRUCTION 이 켜져 있으면 그날의 날짜 지침 파일도 한 번에 올림
+    (지침 파일은 AM 에 이미 올렸으면 업로드 기록에서 걸러짐)
+    """
+    if not date_instruction_enabled():
+        return upload_report_to_notebook(report_path)
+    day = datetime.strptime(date_str, "%Y%m%d").strftime("%Y-%m-%d")
+    instruction = create_date_instruction_file(day)
+    return upload_report_to_notebook([report_path, instruction])
+
+
+def run_agent_s(timeframe: str, date_str: str | None = None) -> bool:
     """
     Agent S 메인 실행 함수 (NotebookLM 업로드 전용)
+    date_str(YYYYMMDD)를 주면 해당 날짜 보고서를 업로드 (백필용)
     """
     log(f"=== Agent S 시작 (NotebookLM 업로드) [{timeframe}] ===")
     
     REPORTS_DIR.mkdir(parents=True, exist_ok=True)
     
     # 1. 보고서 파일 확인
-    now = datetime.now()
-    date_str = now.strftime("%Y%m%d")
+    date_str = date_str or datetime.now().strftime("%Y%m%d")
     report_file = REPORTS_DIR / f"{date_str}_{timeframe}_분석보고서.md"
     
     if not report_file.exists():
@@ -259,7 +331,7 @@ def run_agent_s(timeframe: str) -> bool:
     log(f"보고서 확인: {report_file}")
     
     # 2. 보고서 업로드
-    upload_success = upload_report_to_notebook(str(report_file))
+    upload_success = upload_with_instruction(str(notebooklm_source(report_file)), date_str)
     
     if upload_success:
         log("NotebookLM 소스 업로드 완료.")
@@ -1,81 +1,157 @@
 import os
-import requests
 import time
 from datetime import datetime
 
 # --- Configuration ---
-def load_config():
-    import json
-    config_path = os.path.join(os.path.dirname(__file__), "config.json")
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, "r", encoding="utf-8") as f:
-                config = json.load(f)
-                for key, value in config.items():
-                    os.environ[key] = value
-        except Exception:
-            pass
+from app_config import load_config
+import delivery_ledger
+import report_index
+import report_render
+import telegram_delivery
+import telegram_format
 
 load_config()
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 
 WATCH_DIR = os.path.join("output", "reports")  # Agent B가 저장하는 위치
-PROCESSED_LOG = "data/processed_reports.txt"
 
-import re
 import sys
 import io
 
-import html
-
 # Removed manual sys.stdout/stderr wrapping
 
 def log(message):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] [Agent W] {message}")
 
-def get_processed_files():
-    if not os.path.exists(PROCESSED_LOG):
-        return set()
-    with open(PROCESSED_LOG, "r", encoding="utf-8") as f:
-        return set(line.strip() for line in f)
+def record_results(file_name, content_hash, messages, results, offsets):
+    """채팅방별 전송 결과를 원장에 기록 (이어 보낸 경우 이전 조각 수를 더함)"""
+    for r in results:
+        parts_sent = offsets.get(r.chat_id, 0) + r.sent
+        status = delivery_ledger.record(file_name, r.chat_id, content_hash, len(messages), parts_sent,
+                                        r.message_ids, r.attempts, r.error)
+        if status != delivery_ledger.SENT:
+            log(f"Chat {r.chat_id}: {status} ({parts_sent}/{len(messages)}), will resume on next run")
+
+def parse_chat_ids():
+    return [cid.strip() for cid in (TELEGRAM_CHAT_ID or "").split(",") if cid.strip()]
+
+class StreamingDelivery:
+    """
+    Agent B 스트리밍 모드의 섹션 콜백. 완성된 섹션으로 확정된 메시지를 바로 채팅방별 전송 큐에 넣어
+    보고서 생성이 끝나기 전에 텔레그램 전송을 시작합니다.
+    메시지 분할은 build_messages(저장된 보고서)와 같으므로(telegram_format.stream_messages),
+    finish() 에서 이미 보낸 조각 수를 원장에 기록하면 전송 단계는 나머지 조각만 보냅니다.
+    """
+
+    def __init__(self, file_name, chat_ids=None):
+        self.file_name = file_name
+        chat_ids = parse_chat_ids() if chat_ids is None else chat_ids
+        self.chat_ids = [cid for cid in chat_ids if not delivery_ledger.is_delivered(file_name, cid)]
+        self.sections = []
+        self.messages = []
+        self.results = []
+        self._queue = None
+
+    def __call__(self, section):
+        self.sections.append(section)
+        if not self.chat_ids:
+            return
+        ready = telegram_format.stream_messages(self.file_name, "".join(self.sections))[len(self.messages):]
+        if not ready:
+            return
+        if self._queue is None:
+            log(f"Streaming {self.file_name} to {len(self.chat_ids)} chat(s) while the report is generated")
+            self._queue = telegram_delivery.DeliveryQueue(self.chat_ids, label=self.file_name)
+        for message in ready:
+            self._queue.put(message)
+        self.messages.extend(ready)
+
+    def abort(self):
+        """생성이 실패했을 때: 큐에 넣은 메시지까지만 보내고 멈춤 (재생성한 보고서로 finish() 가능)"""
+        if self._queue is not None:
+            self.results = self._queue.close()
+            self._queue = None
+        return self.results
 
-def mark_as_processed(file_name):
-    with open(PROCESSED_LOG, "a", encoding="utf-8") as f:
-        f.write(f"{file_name}\n")
+    def finish(self, report_path):
+        """
+        보고서 저장 후 호출. 이미 보낸 메시지가 저장된 보고서의 메시지 앞부분과 같으면 나머지도 보내고,
+        다르면(재시도로 다시 생성 등) 같은 부분까지만 보낸 것으로 원장에 기록합니다.
+        """
+        content = None
+        if report_path and os.path.exists(report_path):
+            with open(report_path, "r", encoding="utf-8") as f:
+                content = f.read()
+        if content is None:
+            return self.abort()
+        messages = build_messages(report_path, content)
+        common = 0
+        while common < min(len(self.messages), len(messages)) and self.messages[common] == messages[common]:
+            common += 1
+        if self._queue is not None and common == len(self.messages):
+            for message in messages[common:]:
+                self._queue.put(message)
+        results = self.abort()
+        if common < len(self.messages):
+            log(f"Streamed {len(self.messages)} message(s) of {self.file_name} but only {common} match "
+                f"the saved report; the rest will be sent again")
+        for r in results:
+            if r.sent > common and common < len(self.messages):
+                r.sent = common
+                r.message_ids = r.message_ids[:common]
+        record_results(self.file_name, delivery_ledger.content_hash(content), messages, results, {})
+        return results
+
+def build_messages(file_path, content):
+    """
+    보고서 → 텔레그램 메시지 목록.
+    4000자 초과 시 섹션 경계에서 여러 메시지로 분할 (태그가 잘리지 않도록).
+    구조화 사이드카(.json)가 있으면 Markdown 을 다시 해석하지 않고 문서에서 바로 HTML 렌더링
+    """
+    file_name = os.path.basename(file_path)
+    doc = report_render.matching_doc(file_path, content)
+    if doc:
+        return telegram_format.build_html_messages(file_name, report_render.telegram_html(doc))
+    return telegram_format.build_report_messages(file_name, content)
+
+def deliver_report(file_name, content, messages, chat_ids):
+    """
+    원장 기준으로 아직 다 받지 못한 채팅방에만 전송 (일부 조각만 받은 채팅방은 이어서).
+    남은 미완료 채팅방 수를 반환 (0 이면 모든 채팅방 완료)
+    """
+    content_hash = delivery_ledger.content_hash(content)
+    offsets = delivery_ledger.resume_offsets(file_name, chat_ids, content_hash, len(messages))
+    if not offsets:
+        return 0
+    pending = [cid for cid in chat_ids if cid in offsets]
+    log(f"Processing report: {file_name} ({len(messages)} message(s), {len(pending)} pending chat(s))")
+
+    # 채팅방별 병렬 전송 (한도 대기, 429 retry_after, 일시 오류 재시도 포함)
+    results = telegram_delivery.deliver(pending, messages, label=file_name, offsets=offsets)
+    record_results(file_name, content_hash, messages, results, offsets)
+    success_count = sum(1 for r in results if r.ok)
+    log(f"Delivered {file_name} to {success_count}/{len(pending)} pending chat(s)")
+    return len(pending) - success_count
 
 def send_telegram_message(text):
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-    payload = {
-        "chat_id": TELEGRAM_CHAT_ID,
-        "text": text,
-        "parse_mode": "HTML"
-    }
-    try:
-        response = requests.post(url, json=payload, timeout=10)
-        if response.status_code != 200:
-            log(f"Telegram API Error: {response.status_code} - {response.text}")
-        return response.status_code == 200
-    except Exception as e:
-        log(f"Error sending Telegram message: {e}")
-        return False
-
-def run_agent_w():
+    results = telegram_delivery.deliver([TELEGRAM_CHAT_ID], [text], label="direct")
+    return bool(results) and results[0].ok
+
+def run_agent_w(date_prefix=None, timeframe=None):
     log("Starting Agent W (Telegram Delivery)...")
-    processed_files = get_processed_files()
     
     log(f"Watching directory: {WATCH_DIR}")
     if not os.path.exists(WATCH_DIR):
         log(f"Error: Directory {WATCH_DIR} does not exist.")
         return
 
-    # 오늘 날짜 (YYYYMMDD) 추출
-    today_prefix = datetime.now().strftime("%Y%m%d")
+    # 오늘 날짜 (YYYYMMDD) 추출 - 백필 시에는 지정한 날짜
+    today_prefix = date_prefix or datetime.now().strftime("%Y%m%d")
     
     # 쉼표로 구분된 여러 채팅 ID 처리
-    raw_chat_ids = TELEGRAM_CHAT_ID.split(",")
-    chat_ids = [cid.strip() for cid in raw_chat_ids if cid.strip()]
+    chat_ids = parse_chat_ids()
     
     if not chat_ids:
         log("Error: No TELEGRAM_CHAT_ID specified.")
@@ -84,53 +160,19 @@ def run_agent_w():
     log(f"Filtering for today's reports (prefix: {today_prefix})")
     log(f"Target Chat IDs: {chat_ids}")
 
-    all_files = os.listdir(WATCH_DIR)
-    # 당일 보고서만 필터링 (YYYYMMDD로 시작하는 파일)
-    files = [f for f in all_files if f.startswith(today_prefix) and re.search(r'_(AM|PM)_.*\.md$', f)]
+    # 당일 보고서만 (보고서 색인의 날짜/AM·PM 인덱스 조회, 디렉터리 전체를 훑지 않음)
+    files = [row["name"] for row in report_index.for_date(today_prefix, timeframe)
+             if os.path.exists(os.path.join(WATCH_DIR, row["name"]))]
     log(f"Matching today's report files found: {len(files)}")
     
     for file_name in files:
-        if file_name not in processed_files:
-            log(f"Processing new report: {file_name}")
-            file_path = os.path.join(WATCH_DIR, file_name)
-            
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-            
-            # Format message (use HTML for safer delivery and better formatting)
-            timeframe = "AM Brief" if "_AM_" in file_name else "PM Brief"
-            title = f"☀️ &lt;우석에 닿기를&gt; 투자 동향 분석 {timeframe}"
-            
-            safe_content = html.escape(content)
-            formatted_content = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', safe_content)
-            
-            youtube_link = "https://www.youtube.com/@우석에닿기를"
-            message = f"<b>{title}</b>\n\n{formatted_content}\n\n{youtube_link}"
-            
-            if len(message) > 4000:
-                message = message[:4000] + "\n\n...(이하 생략)"
-            
-            success_count = 0
-            for cid in chat_ids:
-                # payload 복사하여 chat_id만 교체
-                url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-                payload = {
-                    "chat_id": cid,
-                    "text": message,
-                    "parse_mode": "HTML"
-                }
-                try:
-                    response = requests.post(url, json=payload, timeout=10)
-                    if response.status_code == 200:
-                        log(f"Successfully sent to Telegram Chat ID: {cid}")
-                        success_count += 1
-                    else:
-                        log(f"Telegram API Error (ID: {cid}): {response.status_code} - {response.text}")
-                except Exception as e:
-                    log(f"Error sending to {cid}: {e}")
-
-            if success_count > 0:
-                mark_as_processed(file_name)
+        # 모든 채팅방에 전송 완료된 보고서는 파일을 읽지 않고 건너뜀 (기본 키 조회)
+        if all(delivery_ledger.is_delivered(file_name, cid) for cid in chat_ids):
+            continue
+        file_path = os.path.join(WATCH_DIR, file_name)
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        deliver_report(file_name, content, build_messages(file_path, content), chat_ids)
 
 if __name__ == "__main__":
     run_agent_w()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+config.json 로더 (프로세스당 한 번만 읽음)
+
+main / agent_b / agent_w / agent_s 가 각자 config.json 을 다시 읽던 것을 대신합니다.
+값은 환경 변수로 올려 두므로 기존처럼 os.getenv 로 읽으면 됩니다.
+"""
+
+import json
+import os
+import threading
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_config(force: bool = False) -> bool:
+    """config.json 을 환경 변수로 로드. 이미 로드했다면 다시 읽지 않는다 (force=True 제외)"""
+    global _loaded
+    with _lock:
+        if _loaded and not force:
+            return True
+        if not os.path.exists(CONFIG_PATH):
+            print("Warning: config.json not found. Using environment variables.")
+            _loaded = True
+            return False
+        try:
+            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            for key, value in config.items():
+                os.environ[key] = value if isinstance(value, str) else json.dumps(value)
+        except Exception as e:
+            print(f"Warning: config.json load failed: {e}")
+        _loaded = True
+        return True
+
+
+def get_int(key: str, default: int) -> int:
+    try:
+        return int(os.getenv(key, default))
+    except ValueError:
+        return default
+
+
+def get_float(key: str, default: float) -> float:
+    try:
+        return float(os.getenv(key, default))
+    except ValueError:
+        return default
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+재생목록 파서 벤치마크: 기존 3단계(ytInitialData regex + json.loads + regex 폴백) vs 스트리밍 파서
+
+실행:
+    python bench_playlist.py                         # temp_playlist.html + 합성 페이지
+    python bench_playlist.py page1.html page2.html   # 저장해 둔 페이지 지정
+    python bench_playlist.py --synthetic 200 --repeat 20
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+
+import playlist_stream
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+DEFAULT_FIXTURES = ["temp_playlist.html"]
+
+
+def legacy_extract(text):
+    """agent_b.get_latest_video_id 의 기존 3단계 추출 경로 (비교용 그대로 보존)"""
+    match = re.search(r'var ytInitialData = (\{.*?\});', text)
+    video_data = []
+    if match:
+        try:
+            data = json.loads(match.group(1))
+            try:
+                section_contents = data['contents']['twoColumnBrowseResultsRenderer']['tabs'][0]['tabRenderer']['content']['sectionListRenderer']['contents'][0]['itemSectionRenderer']['contents'][0]['playlistVideoListRenderer']['contents']
+                for item in section_contents:
+                    if 'playlistVideoRenderer' in item:
+                        vid = item['playlistVideoRenderer']['videoId']
+                        title = item['playlistVideoRenderer']['title']['runs'][0]['text']
+                        video_data.append((vid, title))
+            except (KeyError, IndexError, TypeError):
+                pass
+        except Exception:
+            pass
+
+    if not video_data:
+        video_data = re.findall(r'"playlistVideoRenderer":\{"videoId":"([^"]+)".*?"title":\{"runs":\[\{"text":"([^"]+)"\}\]', text)
+
+    if not video_data:
+        video_data = re.findall(r'"videoId":"([^"]+)".*?"title":\{"runs":\[\{"text":"([^"]+)"\}\]', text)
+    return video_data
+
+
+def load_fixture(path):
+    """저장된 페이지를 읽는다 (PowerShell로 저장한 UTF-16 파일도 처리)"""
+    with open(path, "rb") as f:
+        raw = f.read()
+    if raw.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return raw.decode("utf-16")
+    return raw.decode("utf-8", errors="replace")
+
+
+def synthetic_page(n_videos, padding_kb=2048):
+    """실제 데스크톱 재생목록과 같은 구조의 페이지 합성 (앞뒤에 스크립트 잡음 포함)"""
+    items = []
+    for i in range(n_videos):
+        items.append({"playlistVideoRenderer": {
+            "videoId": f"vid{i:08d}",
+            "thumbnail": {"thumbnails": [{"url": f"https://i.ytimg.com/vi/vid{i:08d}/hq.jpg", "width": 168}]},
+            "title": {"runs": [{"text": f"[{i}] 3월{i % 28 + 1}일 시황 \"특집\" {{요약}}"}],
+                      "accessibility": {"accessibilityData": {"label": f"영상 {i}"}}},
+            "index": {"simpleText": str(i + 1)},
+            "videoInfo": {"runs": [{"text": f"조회수 {i}회"}, {"text": " • "}, {"text": f"{i}시간 전"}]},
+        }})
+    items.append({"continuationItemRenderer": {"trigger": "CONTINUATION_TRIGGER_ON_ITEM_SHOWN"}})
+    data = {"contents": {"twoColumnBrowseResultsRenderer": {"tabs": [{"tabRenderer": {"content": {
+        "sectionListRenderer": {"contents": [{"itemSectionRenderer": {"contents": [
+            {"playlistVideoListRenderer": {"contents": items}}]}}]}}}}]}},
+        "sidebar": {"playlistSidebarRenderer": {"items": [{"stub": "x" * 256}] * 64}}}
+    noise = "var ytcfg = {};" + ("/* polymer */ function f(){return 1};" * (padding_kb * 1024 // 38))
+    return (f"<html><head><script>{noise[:len(noise) // 2]}</script></head><body><script>"
+            f"var ytInitialData = {json.dumps(data, ensure_ascii=False, separators=(',', ':'))};</script>"
+            f"<script>{noise[len(noise) // 2:]}</script></body></html>")
+
+
+def chunked(data, size=playlist_stream.CHUNK_SIZE):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+def bench(name, text, repeat):
+    raw = text.encode("utf-8")
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        legacy = legacy_extract(text)
+    legacy_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    consumed = 0
+
+    def counting(chunks):
+        nonlocal consumed
+        for c in chunks:
+            consumed += len(c)
+            yield c
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        consumed = 0
+        streamed = list(playlist_stream.iter_playlist_videos(counting(chunked(raw))))
+    stream_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    same = [tuple(v[:2]) for v in legacy] == [v[:2] for v in streamed]
+    print(f"\n[{name}] {len(raw) / 1024:.0f} KB")
+    print(f"  legacy 3-pass : {legacy_ms:8.2f} ms  items={len(legacy)}")
+    print(f"  streaming     : {stream_ms:8.2f} ms  items={len(streamed)}  "
+          f"read={consumed / 1024:.0f} KB ({consumed * 100 // max(len(raw), 1)}%)")
+    print(f"  결과 일치: {same}")
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재생목록 파서 벤치마크")
+    parser.add_argument("fixtures", nargs="*", default=DEFAULT_FIXTURES,
+                        help="저장된 재생목록 HTML 경로")
+    parser.add_argument("--synthetic", type=int, default=100,
+                        help="합성 페이지 영상 수 (0이면 생략)")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    ok = True
+    for path in args.fixtures:
+        try:
+            text = load_fixture(path)
+        except OSError as e:
+            print(f"[건너뜀] {path}: {e}")
+            continue
+        ok &= bench(path, text, args.repeat)
+
+    if args.synthetic:
+        ok &= bench(f"synthetic x{args.synthetic}", synthetic_page(args.synthetic), args.repeat)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+자막 압축 벤치마크: 원본 자막 vs transcript_compact 결과
+
+저장된 자막(data/transcripts/*.json.gz)과 합성 자막에 대해 추정 토큰 수, 압축 시간,
+섹션(국내/미국/코인/정책) 키워드 보존 여부를 비교합니다.
+--live 를 주면 Gemini 로 실제 토큰 수(count_tokens)와 analyze_report 소요 시간을 양쪽 모두 측정합니다
+(GOOGLE_API_KEY 필요, 응답 캐시는 끔).
+
+실행:
+    python bench_transcript.py                        # 저장된 자막 + 합성 자막
+    python bench_transcript.py a.json.gz b.json       # 자막 파일 지정 (segments 목록 또는 transcript_cache 형식)
+    python bench_transcript.py --synthetic 0 --live
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+import transcript_cache
+import transcript_compact
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+SECTION_KEYWORDS = {
+    "국내": ["코스피", "코스닥"],
+    "미국": ["나스닥", "다우", "S&P"],
+    "코인": ["비트코인", "이더리움", "코인"],
+    "정책": ["금리", "연준", "환율"],
+}
+# analyze_report 프롬프트(약 3 KB) 자체의 추정 토큰 수
+PROMPT_OVERHEAD_TOKENS = 1500
+
+
+def load_segments(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    return data["segments"] if isinstance(data, dict) else data
+
+
+def synthetic_segments(minutes=20, seed=7):
+    """자동 생성 자막 흉내: 롤링 중복, 추임새, [음악], 반복 세그먼트, 무음 구간 포함"""
+    rng = random.Random(seed)
+    topics = [
+        "코스피는 외국인 매도에 1.2% 하락 마감했고 코스닥은 2차전지 중심으로 반등했습니다",
+        "정부는 밸류업 프로그램 후속 조치를 발표했고 금리 동결 기대가 커졌습니다",
+        "미국 나스닥은 엔비디아 실적 기대에 상승했고 다우와 S&P 500도 강보합이었습니다",
+        "연준 위원들은 물가 둔화를 확인해야 한다고 했고 달러 환율은 1380원대입니다",
+        "비트코인은 ETF 자금 유입으로 반등했고 이더리움도 코인 시장 전반과 함께 올랐습니다",
+        "투자 전략은 실적이 확인되는 반도체와 AI 인프라 중심으로 분할 매수를 권합니다",
+    ]
+    segments, t = [{"text": "[음악]", "start": 0.0, "duration": 6.0}], 6.0
+    per_topic = minutes * 60 / len(topics)
+    for topic in topics:
+        words = topic.split()
+        end = t + per_topic
+        previous = []
+        while t < end:
+            i = rng.randrange(len(words))
+            chunk = words[i:i + rng.randint(3, 6)]
+            if rng.random() < 0.3:
+                chunk = [rng.choice(["어", "음", "아"])] + chunk
+            text = " ".join(previous[-2:] + chunk)   # 롤링 중복
+            segments.append({"text": text, "start": round(t, 2), "duration": 2.5})
+            if rng.random() < 0.1:
+                segments.append({"text": text, "start": round(t + 2.5, 2), "duration": 1.0})
+            previous = chunk
+            t += 2.5 + (6.0 if rng.random() < 0.03 else 0.0)
+        segments.append({"text": "[음악]", "start": round(t, 2), "duration": 4.0})
+        t += 4.0
+    return segments
+
+
+def coverage(text):
+    return {name: any(k in text for k in keys) for name, keys in SECTION_KEYWORDS.items()}
+
+
+def live_measure(raw_text, compact_text):
+    """실제 토큰 수와 analyze_report 시간 (원본, 압축)"""
+    os.environ["GEMINI_CACHE"] = "off"
+    import agent_b
+    import gemini_client
+
+    model = gemini_client.get_model(agent_b.REPORT_MODEL)
+    if model is None:
+        print("  --live: GOOGLE_API_KEY 가 없어 건너뜁니다.")
+        return
+    for label, text in (("raw", raw_text), ("compact", compact_text)):
+        tokens = model.count_tokens(text).total_tokens
+        start = time.perf_counter()
+        report = agent_b.analyze_report(text, "AM")
+        elapsed = time.perf_counter() - start
+        kept = sum(coverage(report or "").values())
+        print(f"  live {label:<8}: {tokens:6d} tokens  analyze {elapsed:6.1f}s  report sections {kept}/{len(SECTION_KEYWORDS)}")
+
+
+def bench(name, segments, budget, repeat, live):
+    raw_text = transcript_cache.segments_text(segments)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        text, stats = transcript_compact.compact(segments, budget=budget)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    before, after = coverage(raw_text), coverage(text)
+    lost = [k for k in before if before[k] and not after[k]]
+    prompt_before = stats["tokens_before"] + PROMPT_OVERHEAD_TOKENS
+    prompt_after = stats["tokens_after"] + PROMPT_OVERHEAD_TOKENS
+    print(f"\n[{name}] {len(segments)} segments, {len(raw_text)} chars")
+    print(f"  {transcript_compact.summary(stats)}")
+    print(f"  prompt tokens ~{prompt_before} → ~{prompt_after} ({1 - prompt_after / prompt_before:.0%} less quota)")
+    print(f"  compaction {elapsed_ms:.2f} ms | sections kept: {sum(after.values())}/{sum(before.values())}"
+          + (f" (lost: {', '.join(lost)})" if lost else ""))
+    if live:
+        live_measure(raw_text, text)
+    return not lost
+
+
+def main():
+    parser = argparse.ArgumentParser(description="자막 압축 벤치마크")
+    parser.add_argument("files", nargs="*", help="자막 파일 (.json / .json.gz)")
+    parser.add_argument("--synthetic", type=int, default=20, help="합성 자막 길이(분), 0이면 생략")
+    parser.add_argument("--budget", type=int, default=None, help="토큰 예산 (기본: TRANSCRIPT_TOKEN_BUDGET)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--live", action="store_true", help="Gemini 로 실제 토큰 수/분석 시간 측정")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(transcript_cache.CACHE_DIR, "*.json.gz")))
+    ok = True
+    for path in files:
+        try:
+            segments = load_segments(path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[건너뜀] {path}: {e}")
+            continue
+        ok &= bench(os.path.basename(path), segments, args.budget, args.repeat, args.live)
+
+    if args.synthetic:
+        ok &= bench(f"synthetic {args.synthetic}min", synthetic_segments(args.synthetic),
+                    args.budget, args.repeat, args.live)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+캐시 적중/실패 카운터 (logs/cache_stats.json)
+
+각 캐시 모듈이 record("playlist", "hit") 처럼 이벤트를 남기면 누적 횟수와
+마지막 갱신 시각을 JSON 파일에 기록합니다.
+
+실행:
+    python cache_stats.py     # 현재 통계 출력
+"""
+
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+STATS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "cache_stats.json")
+
+_lock = threading.Lock()
+
+
+def _load() -> dict:
+    try:
+        with open(STATS_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record(cache: str, event: str, count: int = 1):
+    """cache 이름별 event 카운터를 count 만큼 증가"""
+    with _lock:
+        stats = _load()
+        entry = stats.setdefault(cache, {})
+        entry[event] = entry.get(event, 0) + count
+        entry["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            os.makedirs(os.path.dirname(STATS_FILE), exist_ok=True)
+            tmp_path = STATS_FILE + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(stats, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, STATS_FILE)
+        except OSError as e:
+            print(f"Cache stats write error: {e}")
+
+
+def get(cache: str) -> dict:
+    return _load().get(cache, {})
+
+
+def hit_rate(cache: str, hit_events=("hit",), miss_events=("miss",)) -> float:
+    entry = get(cache)
+    hits = sum(entry.get(e, 0) for e in hit_events)
+    total = hits + sum(entry.get(e, 0) for e in miss_events)
+    return hits / total if total else 0.0
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    print(json.dumps(_load(), ensure_ascii=False, indent=2))
@@ -1,5 +1,5 @@
 
-import requests
+import http_session
 import re
 import sys
 
@@ -9,7 +9,7 @@ video_id = "5jNIobMPY7I"
 url = f"https://www.youtube.com/watch?v={video_id}"
 
 try:
-    response = requests.get(url, timeout=10)
+    response = http_session.get(url, timeout=10)
     if response.status_code == 200:
         # Extract description (it's often in a script tag or hidden div)
         # simplified search
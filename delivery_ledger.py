@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+텔레그램 전송 원장 (data/delivery_ledger.db, SQLite)
+
+보고서 × 채팅방 단위로 전송 상태, 보낸 메시지 조각 수, 메시지 ID, 시각을 기록합니다.
+- 채팅방 5곳 중 1곳만 실패해도 그 채팅방만 다음 실행에서 다시 보냄
+- 여러 조각 중 일부만 보낸 경우 이어서 보냄 (보고서 내용이 바뀌지 않았을 때)
+- "이 보고서가 이 채팅방에 전송됐는가"는 기본 키 조회 한 번으로 확인
+
+기존 data/processed_reports.txt 는 최초 실행 시 "모든 채팅방 전송 완료(chat_id='*')"로 가져옵니다.
+
+실행:
+    python delivery_ledger.py status 20260302_AM_분석보고서.md
+    python delivery_ledger.py pending 20260302_AM_분석보고서.md <chat_id> [...]
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LEDGER_DB = os.path.join(BASE_DIR, "data", "delivery_ledger.db")
+LEGACY_LOG = os.path.join(BASE_DIR, "data", "processed_reports.txt")
+ALL_CHATS = "*"
+
+SENT, PARTIAL, FAILED = "sent", "partial", "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS deliveries (
+    report       TEXT NOT NULL,
+    chat_id      TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    content_hash TEXT,
+    parts_total  INTEGER NOT NULL DEFAULT 0,
+    parts_sent   INTEGER NOT NULL DEFAULT 0,
+    message_ids  TEXT NOT NULL DEFAULT '[]',
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    error        TEXT,
+    created_at   TEXT NOT NULL,
+    updated_at   TEXT NOT NULL,
+    PRIMARY KEY (report, chat_id)
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _now() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def content_hash(content: str) -> str:
+    """보고서 내용 해시 (내용이 바뀌면 이어 보내지 않고 처음부터 보냄)"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _connect(db_path: str = LEDGER_DB) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    _import_legacy(conn)
+    return conn
+
+
+_shared = {"conn": None, "path": None}
+_lock = threading.RLock()
+
+
+@contextmanager
+def _ledger():
+    """프로세스당 연결 하나를 재사용 (스키마·기존 기록 가져오기는 처음 연결할 때 한 번만). 스레드 간에는 잠금으로 직렬화"""
+    with _lock:
+        if _shared["conn"] is None or _shared["path"] != LEDGER_DB:
+            if _shared["conn"] is not None:
+                _shared["conn"].close()
+            _shared["conn"], _shared["path"] = _connect(LEDGER_DB), LEDGER_DB
+        yield _shared["conn"]
+
+
+def close():
+    with _lock:
+        if _shared["conn"] is not None:
+            _shared["conn"].close()
+        _shared["conn"] = _shared["path"] = None
+
+
+def _import_legacy(conn: sqlite3.Connection):
+    """processed_reports.txt 기록을 한 번만 가져온다"""
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+        return
+    names = []
+    if os.path.exists(LEGACY_LOG):
+        with open(LEGACY_LOG, "r", encoding="utf-8") as f:
+            names = [line.strip() for line in f if line.strip()]
+    now = _now()
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO deliveries (report, chat_id, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            [(name, ALL_CHATS, SENT, now, now) for name in names])
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_imported', ?)", (now,))
+
+
+def get(report: str, chat_id: str) -> dict | None:
+    with _ledger() as conn:
+        row = conn.execute("SELECT * FROM deliveries WHERE report = ? AND chat_id = ?", (report, chat_id)).fetchone()
+    return dict(row) if row else None
+
+
+def is_delivered(report: str, chat_id: str) -> bool:
+    """report 가 chat_id 에 모두 전송되었는지 (기존 processed_reports.txt 기록 포함)"""
+    with _ledger() as conn:
+        row = conn.execute(
+            "SELECT 1 FROM deliveries WHERE report = ? AND chat_id IN (?, ?) AND status = ? LIMIT 1",
+            (report, chat_id, ALL_CHATS, SENT)).fetchone()
+    return row is not None
+
+
+def resume_offsets(report: str, chat_ids: list, content_hash: str, parts_total: int) -> dict:
+    """
+    아직 다 받지 못한 채팅방별로 이미 보낸 조각 수를 반환 ({chat_id: 이어서 보낼 위치}).
+    완료된 채팅방은 결과에서 빠집니다. 내용이 바뀌었으면 처음부터 다시 보냅니다.
+    """
+    with _ledger() as conn:
+        if conn.execute("SELECT 1 FROM deliveries WHERE report = ? AND chat_id = ? AND status = ?",
+                        (report, ALL_CHATS, SENT)).fetchone():
+            return {}
+        rows = {
+            row["chat_id"]: row
+            for row in conn.execute(
+                f"SELECT * FROM deliveries WHERE report = ? AND chat_id IN ({','.join('?' * len(chat_ids))})",
+                (report, *chat_ids))
+        } if chat_ids else {}
+
+    offsets = {}
+    for cid in chat_ids:
+        row = rows.get(cid)
+        if row and row["status"] == SENT:
+            continue
+        same_content = row and row["content_hash"] == content_hash and row["parts_total"] == parts_total
+        offsets[cid] = row["parts_sent"] if same_content else 0
+    return offsets
+
+
+def record(report: str, chat_id: str, content_hash: str, parts_total: int, parts_sent: int,
+           message_ids: list, attempts: int, error: str = ""):
+    """전송 결과 기록 (parts_sent 는 이번 실행 이전 분량을 포함한 누적 값)"""
+    status = SENT if parts_sent >= parts_total else PARTIAL if parts_sent else FAILED
+    now = _now()
+    with _ledger() as conn, conn:
+        row = conn.execute("SELECT message_ids, attempts, content_hash FROM deliveries WHERE report = ? AND chat_id = ?",
+                           (report, chat_id)).fetchone()
+        previous_ids = []
+        previous_attempts = 0
+        if row and row["content_hash"] == content_hash:
+            previous_ids = json.loads(row["message_ids"] or "[]")
+            previous_attempts = row["attempts"]
+        conn.execute(
+            """INSERT INTO deliveries (report, chat_id, status, content_hash, parts_total, parts_sent,
+                                       message_ids, attempts, error, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(report, chat_id) DO UPDATE SET
+                   status = excluded.status, content_hash = excluded.content_hash,
+                   parts_total = excluded.parts_total, parts_sent = excluded.parts_sent,
+                   message_ids = excluded.message_ids, attempts = excluded.attempts,
+                   error = excluded.error, updated_at = excluded.updated_at""",
+            (report, chat_id, status, content_hash, parts_total, parts_sent,
+             json.dumps(previous_ids + list(message_ids)), previous_attempts + attempts, error, now, now))
+    return status
+
+
+def report_status(report: str) -> list:
+    with _ledger() as conn:
+        rows = conn.execute("SELECT * FROM deliveries WHERE report = ? ORDER BY chat_id", (report,)).fetchall()
+    return [dict(row) for row in rows]
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    if len(sys.argv) < 3 or sys.argv[1] not in ("status", "pending"):
+        print("사용법: python delivery_ledger.py status <보고서 파일명>")
+        print("        python delivery_ledger.py pending <보고서 파일명> <chat_id> [...]")
+        sys.exit(1)
+
+    command, report = sys.argv[1], sys.argv[2]
+    if command == "status":
+        rows = report_status(report)
+        if not rows:
+            print(f"{report}: 전송 기록 없음")
+        for row in rows:
+            print(f"{row['chat_id']:>16} | {row['status']:<7} | {row['parts_sent']}/{row['parts_total']} parts | "
+                  f"attempts {row['attempts']} | {row['updated_at']} | {row['error'] or ''}")
+    else:
+        for cid in sys.argv[3:]:
+            print(f"{cid}: {'delivered' if is_delivered(report, cid) else 'pending'}")
@@ -25,9 +25,19 @@ ssh -i $SSH_KEY -o StrictHostKeyChecking=no `
     "${SERVER_USER}@${SERVER_IP}" `
     "mkdir -p $REMOTE_DIR/output/reports $REMOTE_DIR/logs $REMOTE_DIR/data"
 
-# 2. 필요한 파일만 서버로 복사 (Agent B, W, 공통 파일)
+# 2. 필요한 파일만 서버로 복사 (main.py 와 main/scheduler 가 import 하는 모듈 전부)
+#    모듈을 새로 추가하면 여기와 deploy.sh 의 목록에 함께 추가
 Write-Host "[2/4] 파일 업로드..." -ForegroundColor Yellow
-$files = @("agent_b.py", "agent_w.py", "main.py", "scheduler.py", "config.json")
+$files = @(
+    "agent_b.py", "agent_s.py", "agent_w.py", "app_config.py",
+    "cache_stats.py", "delivery_ledger.py", "gemini_client.py", "http_session.py",
+    "main.py", "model_router.py", "notebooklm_manifest.py", "notebooklm_service.py",
+    "pipeline_dag.py", "playlist_cache.py", "playlist_stream.py", "report_index.py",
+    "report_mapreduce.py", "report_render.py", "report_schema.py", "report_stream.py",
+    "response_cache.py", "scheduler.py", "telegram_delivery.py", "telegram_format.py",
+    "transcript_api.py", "transcript_cache.py", "transcript_compact.py", "trend_engine.py",
+    "config.json"
+)
 foreach ($file in $files) {
     $localPath = Join-Path $LOCAL_DIR $file
     if (Test-Path $localPath) {
@@ -24,13 +24,38 @@ echo ""
 echo "[1/4] 서버 디렉토리 생성..."
 ssh -i "$SSH_KEY" -o StrictHostKeyChecking=no $SERVER_USER@$SERVER_IP "mkdir -p $REMOTE_DIR/output/reports $REMOTE_DIR/logs $REMOTE_DIR/data"
 
-# 2. 필요한 파일만 서버로 복사 (Agent B, W, main, scheduler)
+# 2. 필요한 파일만 서버로 복사 (main.py 와 main/scheduler 가 import 하는 모듈 전부)
+#    모듈을 새로 추가하면 여기와 deploy.ps1 의 목록에 함께 추가
 echo "[2/4] 파일 업로드..."
 scp -i "$SSH_KEY" \
     agent_b.py \
+    agent_s.py \
     agent_w.py \
+    app_config.py \
+    cache_stats.py \
+    delivery_ledger.py \
+    gemini_client.py \
+    http_session.py \
     main.py \
+    model_router.py \
+    notebooklm_manifest.py \
+    notebooklm_service.py \
+    pipeline_dag.py \
+    playlist_cache.py \
+    playlist_stream.py \
+    report_index.py \
+    report_mapreduce.py \
+    report_render.py \
+    report_schema.py \
+    report_stream.py \
+    response_cache.py \
     scheduler.py \
+    telegram_delivery.py \
+    telegram_format.py \
+    transcript_api.py \
+    transcript_cache.py \
+    transcript_compact.py \
+    trend_engine.py \
     config.json \
     $SERVER_USER@$SERVER_IP:$REMOTE_DIR/
 
@@ -1,13 +1,8 @@
-import requests
-import re
+import playlist_cache
 
 def get_channel_id(playlist_url):
     try:
-        response = requests.get(playlist_url)
-        if response.status_code == 200:
-            match = re.search(r'"channelId":"([^"]+)"', response.text)
-            if match:
-                return match.group(1)
+        return playlist_cache.channel_id(playlist_url)
     except Exception as e:
         print(f"Error: {e}")
     return None
@@ -1,17 +1,8 @@
-import requests
-import re
+import playlist_cache
 
 def find_channel_id(playlist_url):
-    response = requests.get(playlist_url)
-    # Look for "channelId":"..."
-    match = re.search(r'"channelId":"([^"]+)"', response.text)
-    if match:
-        return match.group(1)
-    # Look for browse_id
-    match = re.search(r'"browseId":"([^"]+)"', response.text)
-    if match:
-        return match.group(1)
-    return None
+    # 재생목록 스냅샷을 재사용하고, 앞부분에 없으면 전체 페이지에서 "channelId" → "browseId" 순으로 찾음
+    return playlist_cache.channel_id(playlist_url)
 
 p1 = "https://www.youtube.com/playlist?list=PLVups02-DZEWWyOMyk4jjGaWJ_0o1N1iO"
 p2 = "https://www.youtube.com/playlist?list=PLVups02-DZEUU9ozegLPLzfS6WiGGiI_T"
@@ -1,4 +1,7 @@
 import re
+import sys
+
+import selector_registry
 
 def find_buttons(html_file):
     with open(html_file, 'r', encoding='utf-8') as f:
@@ -27,5 +30,11 @@ def find_buttons(html_file):
     for typ in inputs:
         print(f"Input Type: '{typ}'")
 
+    # 셀렉터 레지스트리 후보 확인 (data/selector_stats.json 갱신 → 다음 실행 순서에 반영)
+    print("\n--- Selector Registry ---")
+    for action, found in selector_registry.refresh_from_html(html_file).items():
+        hits = [name for name, present in found.items() if present]
+        print(f"{action}: {', '.join(hits) if hits else '-'}")
+
 if __name__ == "__main__":
-    find_buttons('notebooklm_debug.html')
+    find_buttons(sys.argv[1] if len(sys.argv) > 1 else 'notebooklm_debug.html')
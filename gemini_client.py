@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gemini 클라이언트 공유 모듈
+
+genai.configure 와 GenerativeModel 생성을 프로세스당 한 번만 수행합니다.
+스케줄러 데몬처럼 오래 사는 프로세스에서는 매 실행마다 재사용됩니다.
+"""
+
+import os
+import threading
+
+from app_config import load_config
+
+DEFAULT_MODEL = "gemini-flash-latest"
+
+_models = {}
+_configured_key = None
+_lock = threading.Lock()
+
+
+def get_model(name: str = DEFAULT_MODEL):
+    """모델 이름별로 캐시된 GenerativeModel 반환. API 키가 없으면 None"""
+    global _configured_key
+    load_config()
+    api_key = os.getenv("GOOGLE_API_KEY", "")
+    if not api_key:
+        return None
+
+    import google.generativeai as genai
+
+    with _lock:
+        if api_key != _configured_key:
+            genai.configure(api_key=api_key)
+            _configured_key = api_key
+            _models.clear()
+        model = _models.get(name)
+        if model is None:
+            model = _models[name] = genai.GenerativeModel(name)
+        return model
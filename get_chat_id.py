@@ -1,12 +1,12 @@
 import os
-import requests
+import http_session
 import json
 
 TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "YOUR_TELEGRAM_BOT_TOKEN")
 url = f"https://api.telegram.org/bot{TOKEN}/getUpdates"
 
 try:
-    response = requests.get(url, timeout=10)
+    response = http_session.get(url, timeout=10)
     data = response.json()
     if data.get("ok"):
         updates = data.get("result", [])
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+공유 HTTP 세션 (keep-alive 커넥션 풀 + 재시도/백오프 + 압축 협상)
+
+모든 모듈이 requests.get/post 대신 이 모듈을 쓰면 같은 호스트(youtube.com,
+api.telegram.org 등)로의 TCP/TLS 연결을 재사용합니다.
+
+config.json / 환경 변수로 조정:
+    HTTP_POOL_CONNECTIONS  호스트별 풀 개수 (기본 10)
+    HTTP_POOL_MAXSIZE      호스트당 최대 연결 수 (기본 10)
+    HTTP_RETRIES           GET/HEAD 재시도 횟수 (기본 3)
+    HTTP_BACKOFF           재시도 백오프 계수 초 (기본 0.5 → 0.5, 1, 2초)
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app_config import get_float, get_int, load_config
+
+DEFAULT_TIMEOUT = 10
+RETRY_STATUS = (500, 502, 503, 504)
+
+_session = None
+_lock = threading.Lock()
+
+
+def _accept_encoding() -> str:
+    # urllib3는 brotli 패키지가 설치되어 있을 때만 br 응답을 풀 수 있다
+    try:
+        import brotli  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+            return "gzip, deflate, br"
+        except ImportError:
+            return "gzip, deflate"
+
+
+def _build_session() -> requests.Session:
+    load_config()
+    retry = Retry(
+        total=get_int("HTTP_RETRIES", 3),
+        backoff_factor=get_float("HTTP_BACKOFF", 0.5),
+        status_forcelist=RETRY_STATUS,
+        # POST(텔레그램 전송 등)는 중복 전송 위험이 있어 호출하는 쪽에서 재시도
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=get_int("HTTP_POOL_CONNECTIONS", 10),
+        pool_maxsize=get_int("HTTP_POOL_MAXSIZE", 10),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": _accept_encoding()})
+    return session
+
+
+def get_session() -> requests.Session:
+    """프로세스 공용 세션 반환 (최초 호출 시 생성)"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def reset_session():
+    """설정 변경 후 세션을 다시 만들 때 사용 (열린 연결은 닫음)"""
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    return get_session().get(url, timeout=timeout, **kwargs)
+
+
+def post(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    return get_session().post(url, timeout=timeout, **kwargs)
+
+
+def head(url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    return get_session().head(url, timeout=timeout, **kwargs)
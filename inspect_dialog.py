@@ -18,6 +18,9 @@ sys.path.insert(0, str(SKILLS_DIR))
 from patchright.sync_api import sync_playwright
 from browser_utils import BrowserFactory
 
+sys.path.insert(0, str(Path(__file__).parent))
+import selector_registry
+
 NOTEBOOK_URL = "https://notebooklm.google.com/notebook/2f776ab3-2acc-4925-98ac-2d8997b1bea3"
 
 def js_click(page, locator):
@@ -39,8 +42,7 @@ with sync_playwright() as p:
     page.wait_for_timeout(7000)
     
     print("소스 추가 버튼 클릭...")
-    btn = page.locator('button[aria-label="업로드 소스 대화상자 열기"]')
-    js_click(page, btn.first)
+    selector_registry.attempt(page, "open_add_source", lambda btn: js_click(page, btn))
     page.wait_for_timeout(3000)
     
     # 다이얼로그 스크린샷 (더 큰 뷰포트)
@@ -93,6 +95,15 @@ with sync_playwright() as p:
     """)
     print(f"\n=== 드롭존 HTML ===")
     print(dropzone_html)
+
+    # 다이얼로그가 열린 화면 HTML 저장 → 셀렉터 레지스트리 후보 확인
+    with open("notebooklm_dialog_debug.html", "w", encoding="utf-8") as f:
+        f.write(page.content())
+    print("\n=== 셀렉터 레지스트리 (notebooklm_dialog_debug.html) ===")
+    for action, found in selector_registry.refresh_from_html("notebooklm_dialog_debug.html").items():
+        hits = [name for name, present in found.items() if present]
+        if hits:
+            print(f"  {action}: {', '.join(hits)}")
     
     context.close()
     print("\n분석 완료!")
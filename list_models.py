@@ -1,13 +1,35 @@
+import json
 import os
+import sys
 import google.generativeai as genai
 
+from app_config import load_config
+import model_router
+
+load_config()
 API_KEY = os.getenv("GOOGLE_API_KEY")
 genai.configure(api_key=API_KEY)
 
+# --save: 발견한 모델 목록을 data/gemini_models.json 에 저장 (model_router 후보 목록 필터에 사용)
+save = "--save" in sys.argv
+
 print("Listing available models:")
+models = []
 try:
     for m in genai.list_models():
         if 'generateContent' in m.supported_generation_methods:
             print(f"- {m.name} ({m.display_name})")
+            models.append({
+                "name": m.name.split("/", 1)[-1],
+                "display_name": m.display_name,
+                "input_token_limit": getattr(m, "input_token_limit", None),
+            })
 except Exception as e:
     print(f"Error listing models: {e}")
+
+if save and models:
+    os.makedirs(os.path.dirname(model_router.DISCOVERED_FILE), exist_ok=True)
+    with open(model_router.DISCOVERED_FILE, "w", encoding="utf-8") as f:
+        json.dump(models, f, ensure_ascii=False, indent=2)
+    print(f"\nSaved {len(models)} model(s) to {model_router.DISCOVERED_FILE}")
+    print(f"Router candidates: {model_router.candidates()}")
@@ -4,25 +4,26 @@
 BWS_Invest 파이프라인 오케스트레이터
 Agent B -> Agent W -> Agent S 순서로 실행
 
+단일 실행은 단계(재생목록 → 자막 → 분석 → 렌더링 → 전송 / 업로드)별 체크포인트를
+data/runs/<날짜>_<AM|PM>/ 에 남기고, 다시 실행하면 처음 미완료 단계부터 이어서 실행합니다 (pipeline_dag.py).
+
 실행:
     python main.py AM    # 오전 파이프라인
     python main.py PM    # 오후 파이프라인
+    python main.py AM --restart                         # 체크포인트를 지우고 처음부터
+    python main.py --all                                # AM+PM 동시 실행
+    python main.py --all --date 20260302 --date 20260303  # 여러 날짜 백필
 """
 
 import sys
 import io
 import json
 import os
+import asyncio
+import threading
 from datetime import datetime
 
-def load_config():
-    if os.path.exists("config.json"):
-        with open("config.json", "r") as f:
-            config = json.load(f)
-            for key, value in config.items():
-                os.environ[key] = value
-    else:
-        print("Warning: config.json not found. Using environment variables.")
+from app_config import load_config
 
 # Load config BEFORE importing agents that use environment variables at module level
 load_config()
@@ -32,7 +33,10 @@ import agent_w
 import agent_s
 
 
-import requests
+import delivery_ledger
+import http_session
+import pipeline_dag
+from pathlib import Path
 
 def check_server_completed(timeframe: str) -> bool:
     """AWS 서버에서 당일 보고서가 이미 생성/발송되었는지 확인"""
@@ -44,7 +48,7 @@ def check_server_completed(timeframe: str) -> bool:
     
     try:
         # 헤더만 요청하여 파일 존재 여부만 빠르게 확인
-        response = requests.head(url, timeout=5)
+        response = http_session.head(url, timeout=5)
         if response.status_code == 200:
             print(f"[Check] 서버에서 이미 [{timeframe}] 보고서가 완료되었습니다. ({url})")
             return True
@@ -54,48 +58,236 @@ def check_server_completed(timeframe: str) -> bool:
     return False
 
 
-def run_pipeline(timeframe: str, skip_agent_b: bool = False, skip_agent_s: bool = False, force: bool = False, use_description: bool = False):
+# 다중 실행 모드에서 외부 서비스별 동시 요청 한도
+SERVICE_LIMITS = {
+    "youtube": 2,   # 재생목록 조회 + 자막
+    "gemini": 2,    # 보고서 분석
+}
+
+
+def stream_enabled() -> bool:
+    return os.getenv("GEMINI_STREAM", "off").strip().lower() in ("on", "1", "true", "yes")
+
+
+def run_id_for(timeframe: str, target_date: datetime | None = None) -> str:
+    return f"{(target_date or datetime.now()).strftime('%Y%m%d')}_{timeframe}"
+
+
+def _read(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _report_output(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    return {"report_path": os.path.abspath(path),
+            "content_hash": delivery_ledger.content_hash(_read(path))}
+
+
+def _same_report(output: dict) -> bool:
+    """저장된 단계 결과가 지금의 보고서 파일과 같은지 (수정/삭제되면 다시 실행)"""
+    current = _report_output(output["report_path"])
+    return current is not None and current["content_hash"] == output["content_hash"]
+
+
+def pipeline_stages(state: pipeline_dag.RunState, timeframe: str, target_date: datetime | None = None,
+                    skip_agent_b: bool = False, skip_agent_s: bool = False, use_description: bool = False,
+                    stream: bool = False) -> list:
+    """재생목록 → 자막 → 분석 → 렌더링 → (텔레그램 전송 ∥ NotebookLM 업로드)"""
+    report_file = agent_b.report_path(timeframe, target_date)
+    streaming = {"enabled": stream}
+
+    def playlist(inputs):
+        print("[Agent B] YouTube 재생목록 확인...")
+        video_id, title = agent_b.get_latest_video_id(agent_b.PLAYLISTS.get(timeframe), timeframe,
+                                                      target_date=target_date)
+        if not video_id:
+            return None
+        return {"video_id": video_id, "title": title,
+                "matched": agent_b.title_has_date(title, target_date or datetime.now())}
+
+    def transcript(inputs):
+        video_id = inputs["playlist"]["video_id"]
+        agent_b.log(f"Found video ID: {video_id} | Title: {inputs['playlist']['title']}")
+        text = agent_b.get_transcript(video_id, use_description=use_description)
+        if not text:
+            agent_b.log(f"Failed to extract transcript for {video_id}.")
+            return None
+        path = state.artifact_path("transcript.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return {"video_id": video_id, "path": path, "chars": len(text)}
+
+    def analyze(inputs):
+        print("[Agent B] 보고서 분석 시작...")
+        on_section = None
+        if streaming["enabled"]:
+            on_section = streaming["delivery"] = agent_w.StreamingDelivery(os.path.basename(report_file))
+            # 분석이 실패하면 이미 넘긴 섹션과 섞이지 않도록 재시도는 일반 모드로
+            streaming["enabled"] = False
+        report, doc = agent_b.analyze_report_structured(_read(inputs["transcript"]["path"]), timeframe,
+                                                        target_date=target_date, on_section=on_section)
+        if report:
+            agent_b.save_report(report, timeframe, target_date, doc=doc)
+        delivery = streaming.get("delivery")
+        if delivery:
+            # 이미 보낸 조각을 원장에 기록 → 전송 단계는 남은 조각·실패한 채팅방만 보냄.
+            # 스트리밍이 도중에 실패했으면 큐만 닫고, 재시도로 만든 보고서와 맞춰 기록
+            if report:
+                delivery.finish(report_file)
+                streaming["delivery"] = None
+            else:
+                delivery.abort()
+        return _report_output(report_file) if report else None
+
+    def existing_report(inputs):
+        print("\n[Agent B] --skip-agent-b 옵션으로 건너뜁니다 (저장된 보고서 사용).")
+        return _report_output(report_file)
+
+    def render(inputs):
+        path = inputs["analyze"]["report_path"]
+        content = _read(path)
+        messages_path = state.artifact_path("telegram_messages.json")
+        with open(messages_path, "w", encoding="utf-8") as f:
+            json.dump(agent_w.build_messages(path, content), f, ensure_ascii=False)
+        source = agent_s.notebooklm_source(Path(path))
+        return dict(inputs["analyze"], messages_path=messages_path, notebooklm_path=str(source))
+
+    def deliver(inputs):
+        print("\n[Agent W] 텔레그램 전송 시작...")
+        chat_ids = agent_w.parse_chat_ids()
+        if not chat_ids:
+            agent_w.log("Error: No TELEGRAM_CHAT_ID specified.")
+            return None
+        path = inputs["render"]["report_path"]
+        with open(inputs["render"]["messages_path"], "r", encoding="utf-8") as f:
+            messages = json.load(f)
+        remaining = agent_w.deliver_report(os.path.basename(path), _read(path), messages, chat_ids)
+        # 일부 채팅방이 실패하면 단계 실패 → 다음 실행에서 원장 기준으로 그 채팅방만 이어서 전송
+        return {"chats": len(chat_ids)} if remaining == 0 else None
+
+    def upload(inputs):
+        print("\n[Agent S] NotebookLM 업로드 시작...")
+        date_str = (target_date or datetime.now()).strftime("%Y%m%d")
+        if not agent_s.upload_with_instruction(inputs["render"]["notebooklm_path"], date_str):
+            return None
+        return {"uploaded_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+
+    def artifacts_exist(output):
+        return _same_report(output) and all(os.path.exists(output[k]) for k in ("messages_path", "notebooklm_path"))
+
+    retry = {"attempts": agent_b.MAX_ATTEMPTS, "retry_delay": agent_b.RETRY_DELAY_SECONDS}
+    if skip_agent_b:
+        stages = [pipeline_dag.Stage("analyze", existing_report, validate=_same_report)]
+    else:
+        stages = [
+            # 날짜가 맞지 않는 최신 영상 대체 결과는 재사용하지 않음 → 다시 실행하면 그날 영상을 다시 찾음
+            pipeline_dag.Stage("playlist", playlist, **retry, validate=lambda o: o.get("matched", False)),
+            pipeline_dag.Stage("transcript", transcript, deps=["playlist"], **retry,
+                               validate=lambda o: os.path.exists(o["path"])),
+            pipeline_dag.Stage("analyze", analyze, deps=["transcript"], attempts=2,
+                               retry_delay=agent_b.RETRY_DELAY_SECONDS, validate=_same_report),
+        ]
+    stages += [
+        pipeline_dag.Stage("render", render, deps=["analyze"], validate=artifacts_exist),
+        pipeline_dag.Stage("deliver", deliver, deps=["render"]),
+    ]
+    if skip_agent_s:
+        print("\n[Agent S] --skip-agent-s 옵션으로 건너뜁니다.")
+    else:
+        stages.append(pipeline_dag.Stage("upload", upload, deps=["render"]))
+    return stages
+
+
+def run_pipeline(timeframe: str, skip_agent_b: bool = False, skip_agent_s: bool = False,
+                 use_description: bool = False, target_date: datetime | None = None, stream: bool | None = None,
+                 restart: bool = False):
+    """
+    stream: 보고서 생성 중 완성된 섹션부터 텔레그램 전송 (None 이면 config 의 GEMINI_STREAM)
+    restart: 이 실행(날짜·AM/PM)의 체크포인트를 지우고 처음부터
+    """
+    run_id = run_id_for(timeframe, target_date)
     print(f"\n{'='*50}")
-    print(f"[START] BWS Invest Pipeline [{timeframe}] - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"[START] BWS Invest Pipeline [{timeframe}] run {run_id} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*50}\n")
 
-    # 로컬 실행 전용 (서버 체크 비화성화)
+    pipeline_dag.prune()
+    state = pipeline_dag.RunState(run_id)
+    if restart:
+        state.reset()
+    if stream is None:
+        stream = stream_enabled()
+    stages = pipeline_stages(state, timeframe, target_date, skip_agent_b=skip_agent_b, skip_agent_s=skip_agent_s,
+                             use_description=use_description, stream=stream)
+    statuses = pipeline_dag.execute(stages, state)
+
+    if statuses.get("analyze") in (pipeline_dag.FAILED, pipeline_dag.BLOCKED):
+        print(f"[Agent B] {timeframe} 분석 실패(자막 없음) 또는 새 영상 없음. 파이프라인 중단.")
+        agent_b.log(f"당일 [{timeframe}] 업데이트 없음")
+    summary = ", ".join(f"{name}: {status}" for name, status in statuses.items())
+    print(f"\n{'='*50}")
+    print(f"[DONE] <우석에 닿기를> 투자 동향 분석 완료: [{timeframe}] ({summary})")
+    print(f"{'='*50}\n")
+    return statuses
+
+
+async def _run_agent_b_batch(jobs: list, use_description: bool) -> dict:
+    """agent_b.run_agent_b 를 작업마다 스레드에서 실행 (재생목록·자막·분석 호출은 서비스별 한도 공유)"""
+    limits = {name: threading.BoundedSemaphore(n) for name, n in SERVICE_LIMITS.items()}
+    results = await asyncio.gather(
+        *(asyncio.to_thread(agent_b.run_agent_b, tf, use_description, d, limits=limits) for d, tf in jobs),
+        return_exceptions=True)
+    return dict(zip(jobs, results))
+
+
+def run_pipelines(timeframes: list, dates: list | None = None, skip_agent_b: bool = False,
+                  skip_agent_s: bool = False, use_description: bool = False) -> dict:
     """
-    if not force:
-        if check_server_completed(timeframe):
-            print(f">>> 서버(Priority 1)에서 이미 완료되었습니다. 로컬 실행을 중단합니다.")
-            return
+    여러 시간대/날짜의 Agent B 단계를 asyncio로 동시에 실행한 뒤,
+    Agent W / Agent S 는 (날짜, AM→PM) 순서대로 하나씩 실행합니다.
     """
+    dates = dates or [datetime.now()]
+    jobs = sorted((d, tf) for d in dates for tf in timeframes)
+    labels = ", ".join(f"{d.strftime('%Y%m%d')} {tf}" for d, tf in jobs)
+
+    print(f"\n{'='*50}")
+    print(f"[START] BWS Invest Pipeline [{labels}] - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"{'='*50}\n")
 
-    # 1. Agent B: YouTube 분석 및 보고서 생성
     if skip_agent_b:
         print("\n[Agent B] --skip-agent-b 옵션으로 건너뜁니다.")
-        success = True
+        results = {job: True for job in jobs}
     else:
-        print("[Agent B] YouTube 분석 시작...")
-        success = agent_b.run_agent_b(timeframe, use_description=use_description)
-        
-    if not success:
-        print(f"[Agent B] {timeframe} 분석 실패(자막 없음) 또는 새 영상 없음. 파이프라인 중단.")
-        return
+        print(f"[Agent B] YouTube 분석 동시 시작 ({len(jobs)}건, 한도 {SERVICE_LIMITS})...")
+        results = asyncio.run(_run_agent_b_batch(jobs, use_description))
 
-    # 2. Agent W: 텔레그램 전송
-    print("\n[Agent W] 텔레그램 전송 시작...")
-    agent_w.run_agent_w()
+    for d, tf in jobs:
+        date_str = d.strftime("%Y%m%d")
+        result = results[(d, tf)]
+        if isinstance(result, Exception):
+            print(f"[Agent B] {date_str} {tf} 실행 중 오류 발생: {result}")
+            continue
+        if not result:
+            print(f"[Agent B] {date_str} {tf} 분석 실패(자막 없음) 또는 새 영상 없음. 건너뜁니다.")
+            continue
 
-    # 3. Agent S: NotebookLM 업로드 및 영상 기획 생성
-    if skip_agent_s:
-        print("\n[Agent S] --skip-agent-s 옵션으로 건너뜁니다.")
-    else:
-        print("\n[Agent S] NotebookLM 업로드 및 영상 기획 시작...")
+        print(f"\n[Agent W] {date_str} {tf} 텔레그램 전송 시작...")
+        agent_w.run_agent_w(date_prefix=date_str, timeframe=tf)
+
+        if skip_agent_s:
+            print(f"\n[Agent S] --skip-agent-s 옵션으로 건너뜁니다.")
+            continue
+        print(f"\n[Agent S] {date_str} {tf} NotebookLM 업로드 시작...")
         try:
-            agent_s.run_agent_s(timeframe)
+            agent_s.run_agent_s(tf, date_str=date_str)
         except Exception as e:
             print(f"[Agent S] 실행 중 오류 발생: {e}")
 
     print(f"\n{'='*50}")
-    print(f"[DONE] <우석에 닿기를> 투자 동향 분석 완료: [{timeframe}]")
+    print(f"[DONE] <우석에 닿기를> 투자 동향 분석 완료: [{labels}]")
     print(f"{'='*50}\n")
+    return results
 
 
 if __name__ == "__main__":
@@ -107,12 +299,42 @@ if __name__ == "__main__":
                         help="Agent B(YouTube 분석) 건너뜀")
     parser.add_argument("--skip-agent-s", action="store_true",
                         help="Agent S(NotebookLM) 건너뜀")
-    parser.add_argument("--force", action="store_true",
-                        help="서버 완료 여부와 관계없이 강제 실행")
     parser.add_argument("--use-description", action="store_true",
                         help="자막 부재 시 영상 설명(Description)을 대신 사용")
+    parser.add_argument("--all", action="store_true",
+                        help="AM/PM 파이프라인을 동시에 실행")
+    parser.add_argument("--date", action="append", default=[],
+                        type=lambda s: datetime.strptime(s, "%Y%m%d"),
+                        help="대상 날짜 YYYYMMDD (여러 번 지정 가능, 기본: 오늘)")
+    parser.add_argument("--stream", action="store_true", default=None,
+                        help="보고서 생성 중 완성된 섹션부터 텔레그램 전송 (단일 실행만)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Gemini 응답 캐시를 쓰지 않고 항상 새로 분석")
+    parser.add_argument("--restart", action="store_true",
+                        help="체크포인트를 지우고 처음 단계부터 다시 실행 (단일 실행만)")
+    parser.add_argument("--force", action="store_true",
+                        help="(사용 중단) --restart 와 같음")
     args = parser.parse_args()
+    multi = args.all or len(args.date) > 1
+    if multi:
+        # 다중 실행은 체크포인트·스트리밍 없이 Agent B 를 묶어서 실행 (run_pipelines)
+        single_only = [flag for flag, on in (("--stream", args.stream), ("--restart", args.restart),
+                                             ("--force", args.force)) if on]
+        if single_only:
+            parser.error(f"{', '.join(single_only)} 옵션은 단일 실행(AM/PM 한 건)에서만 사용할 수 있습니다")
+    if args.force:
+        print("[경고] --force 는 더 이상 쓰지 않습니다. --restart 로 처리합니다.")
+        args.restart = True
+    if args.no_cache:
+        os.environ["GEMINI_CACHE"] = "off"
     
-    run_pipeline(args.mode, skip_agent_b=args.skip_agent_b, skip_agent_s=args.skip_agent_s, 
-                 force=args.force, use_description=args.use_description)
+    if multi:
+        timeframes = ["AM", "PM"] if args.all else [args.mode]
+        run_pipelines(timeframes, dates=args.date, skip_agent_b=args.skip_agent_b,
+                      skip_agent_s=args.skip_agent_s, use_description=args.use_description)
+    else:
+        run_pipeline(args.mode, skip_agent_b=args.skip_agent_b, skip_agent_s=args.skip_agent_s, 
+                     use_description=args.use_description,
+                     target_date=args.date[0] if args.date else None, stream=args.stream,
+                     restart=args.restart)
 
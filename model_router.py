@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gemini 모델 라우터 (대체 모델 목록 + 지연 예산 + 헤지 요청)
+
+- 후보 모델을 순서대로 두고, 모델별 지연/오류율 EWMA 로 매 호출마다 순위를 정함
+- 할당량 초과(429 / ResourceExhausted)나 모델 없음(404)은 일정 시간 그 모델을 쉬게 함
+- 헤지: 첫 모델이 hedge_after 초 안에 답하지 않으면 다음 모델을 동시에 호출, 먼저 온 답을 사용
+- deadline 초가 지나도록 답이 없으면 실패로 처리 (늦게 끝난 호출은 통계에만 반영)
+- 스트리밍은 첫 조각이 오기 전까지만 다음 모델로 넘어감
+통계는 data/model_stats.json 에 저장되어 다음 실행에도 이어집니다.
+
+후보 목록: config 의 GEMINI_MODELS(쉼표 구분) → 기본 목록 순.
+data/gemini_models.json(python list_models.py --save)이 있으면 실제로 쓸 수 있는 모델만 남깁니다.
+
+config.json / 환경 변수:
+    GEMINI_MODELS           후보 모델 (기본 gemini-flash-latest,gemini-2.5-flash,gemini-flash-lite-latest)
+    GEMINI_HEDGE_SECONDS    헤지 요청까지 기다리는 시간 (기본 60)
+    GEMINI_DEADLINE_SECONDS 호출 하나에 허용하는 최대 시간 (기본 240)
+
+실행:
+    python model_router.py      # 후보 순위와 모델별 통계 출력
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+import gemini_client
+from app_config import get_float, load_config
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATS_FILE = os.path.join(BASE_DIR, "data", "model_stats.json")
+DISCOVERED_FILE = os.path.join(BASE_DIR, "data", "gemini_models.json")
+
+DEFAULT_MODELS = ["gemini-flash-latest", "gemini-2.5-flash", "gemini-flash-lite-latest"]
+DEFAULT_HEDGE_SECONDS = 60
+DEFAULT_DEADLINE_SECONDS = 240
+EWMA_ALPHA = 0.3
+UNKNOWN_LATENCY = 20.0        # 기록 없는 모델의 예상 지연 (초)
+PRIORITY_PENALTY = 5.0        # 목록 순서 한 칸당 가산 (초), 비슷하면 앞 모델 우선
+QUOTA_COOLDOWN = 15 * 60      # 할당량 초과 모델 휴식 시간
+MISSING_COOLDOWN = 24 * 3600  # 존재하지 않는 모델 휴식 시간
+MAX_IN_FLIGHT = 2
+
+_lock = threading.Lock()
+_stats = None
+_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="gemini")
+
+
+class RouterError(Exception):
+    """모든 후보 모델이 실패했거나 deadline 을 넘김"""
+
+
+def log(message):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] [ModelRouter] {message}")
+
+
+def _load_stats() -> dict:
+    global _stats
+    if _stats is None:
+        try:
+            with open(STATS_FILE, "r", encoding="utf-8") as f:
+                _stats = json.load(f)
+        except (OSError, ValueError):
+            _stats = {}
+    return _stats
+
+
+def _save_stats():
+    try:
+        os.makedirs(os.path.dirname(STATS_FILE), exist_ok=True)
+        tmp_path = STATS_FILE + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_stats, f, indent=2)
+        os.replace(tmp_path, STATS_FILE)
+    except OSError as e:
+        log(f"Stats write failed: {e}")
+
+
+def _discovered() -> set | None:
+    try:
+        with open(DISCOVERED_FILE, "r", encoding="utf-8") as f:
+            return {m["name"] for m in json.load(f)}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def candidates() -> list:
+    """설정 순서대로의 후보 모델 (발견 목록이 있으면 그 안에 있는 것만)"""
+    load_config()
+    configured = [m.strip() for m in os.getenv("GEMINI_MODELS", "").split(",") if m.strip()]
+    models = configured or list(DEFAULT_MODELS)
+    available = _discovered()
+    if available:
+        # -latest 별칭은 목록에 안 나올 수 있어 그대로 둔다
+        filtered = [m for m in models if m in available or m.endswith("-latest")]
+        models = filtered or models
+    return models
+
+
+def _classify(error: Exception) -> str:
+    """
+    예외 형식(google.api_core ResourceExhausted / NotFound) 또는 HTTP 상태 code 로만 판단.
+    메시지 속 숫자(토큰 수, ID 등)에 429/404 가 들어 있어도 멀쩡한 모델을 쉬게 하지 않도록
+    """
+    try:
+        from google.api_core import exceptions as api_exceptions
+    except ImportError:
+        api_exceptions = None
+    if api_exceptions is not None:
+        if isinstance(error, api_exceptions.ResourceExhausted):
+            return "quota"
+        if isinstance(error, api_exceptions.NotFound):
+            return "missing"
+    code = getattr(error, "code", None)
+    code = getattr(code, "value", code)  # HTTPStatus
+    if code == 429:
+        return "quota"
+    if code == 404:
+        return "missing"
+    return "error"
+
+
+def _record(name: str, elapsed: float, error: Exception | None = None):
+    with _lock:
+        entry = _load_stats().setdefault(name, {"latency": None, "error_rate": 0.0, "calls": 0, "errors": 0})
+        entry["calls"] += 1
+        failed = 1.0 if error else 0.0
+        entry["error_rate"] = (1 - EWMA_ALPHA) * entry["error_rate"] + EWMA_ALPHA * failed
+        if error:
+            entry["errors"] += 1
+            kind = _classify(error)
+            entry["last_error"] = f"{kind}: {str(error)[:200]}"
+            if kind in ("quota", "missing"):
+                cooldown = QUOTA_COOLDOWN if kind == "quota" else MISSING_COOLDOWN
+                entry["cooldown_until"] = time.time() + cooldown
+        else:
+            previous = entry["latency"]
+            entry["latency"] = elapsed if previous is None else (1 - EWMA_ALPHA) * previous + EWMA_ALPHA * elapsed
+            entry.pop("cooldown_until", None)
+        entry["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        _save_stats()
+
+
+def ranked() -> list:
+    """쉬는 중이 아닌 후보를 예상 비용(지연 ÷ 성공률 + 순서 가산) 순으로"""
+    now = time.time()
+    scored = []
+    with _lock:
+        stats = _load_stats()
+        for index, name in enumerate(candidates()):
+            entry = stats.get(name, {})
+            if entry.get("cooldown_until", 0) > now:
+                continue
+            latency = entry.get("latency") or UNKNOWN_LATENCY
+            success = max(1.0 - entry.get("error_rate", 0.0), 0.05)
+            scored.append((latency / success + index * PRIORITY_PENALTY, name))
+    return [name for _, name in sorted(scored)]
+
+
+def _settings(hedge_after, deadline):
+    load_config()
+    if hedge_after is None:
+        hedge_after = get_float("GEMINI_HEDGE_SECONDS", DEFAULT_HEDGE_SECONDS)
+    if deadline is None:
+        deadline = get_float("GEMINI_DEADLINE_SECONDS", DEFAULT_DEADLINE_SECONDS)
+    return hedge_after, deadline
+
+
+def _call(name: str, prompt: str) -> str:
+    model = gemini_client.get_model(name)
+    start = time.monotonic()
+    try:
+        text = model.generate_content(prompt).text
+    except Exception as e:
+        _record(name, time.monotonic() - start, e)
+        raise
+    _record(name, time.monotonic() - start)
+    return text
+
+
+def generate(prompt: str, purpose: str = "", hedge_after: float | None = None,
+             deadline: float | None = None) -> tuple:
+    """(응답 텍스트, 응답한 모델 이름). 모두 실패하면 RouterError"""
+    hedge_after, deadline = _settings(hedge_after, deadline)
+    order = ranked()
+    if not order:
+        raise RouterError("no Gemini model available (all cooling down)")
+
+    pending, errors = {}, []
+    next_index = 0
+    started = time.monotonic()
+
+    def launch():
+        nonlocal next_index
+        name = order[next_index]
+        next_index += 1
+        pending[_pool.submit(_call, name, prompt)] = name
+        return name
+
+    launch()
+    while pending:
+        remaining = deadline - (time.monotonic() - started)
+        if remaining <= 0:
+            break
+        can_hedge = next_index < len(order) and len(pending) < MAX_IN_FLIGHT
+        done, _ = wait(pending, timeout=min(remaining, hedge_after) if can_hedge else remaining,
+                       return_when=FIRST_COMPLETED)
+        if not done:
+            if can_hedge:
+                slow = ", ".join(pending.values())
+                log(f"[{purpose}] {slow} slower than {hedge_after:g}s; hedging with {launch()}")
+            continue
+        for future in done:
+            name = pending.pop(future)
+            try:
+                text = future.result()
+            except Exception as e:
+                errors.append(f"{name}: {e}")
+                log(f"[{purpose}] {name} failed: {str(e)[:200]}")
+                continue
+            if name != order[0]:
+                log(f"[{purpose}] answered by fallback model {name}")
+            return text, name
+        if next_index < len(order) and len(pending) < MAX_IN_FLIGHT:
+            log(f"[{purpose}] falling back to {launch()}")
+
+    if pending:
+        errors.append(f"deadline {deadline:.0f}s exceeded ({', '.join(pending.values())})")
+    raise RouterError("; ".join(errors) or "no response")
+
+
+def stream_text(prompt: str, purpose: str = ""):
+    """
+    스트리밍 응답 텍스트 조각을 yield. 첫 조각이 오기 전에 실패하면 다음 모델로 넘어갑니다.
+    (이미 조각을 넘긴 뒤의 실패는 그대로 예외)
+    """
+    errors = []
+    for name in ranked():
+        model = gemini_client.get_model(name)
+        start = time.monotonic()
+        try:
+            chunks = iter(model.generate_content(prompt, stream=True))
+            first = next(chunks)
+        except StopIteration:
+            _record(name, time.monotonic() - start)
+            return
+        except Exception as e:
+            _record(name, time.monotonic() - start, e)
+            errors.append(f"{name}: {e}")
+            log(f"[{purpose}] {name} stream failed before first chunk: {str(e)[:200]}")
+            continue
+        try:
+            yield first.text
+            for chunk in chunks:
+                yield chunk.text
+        except Exception as e:
+            _record(name, time.monotonic() - start, e)
+            raise
+        _record(name, time.monotonic() - start)
+        return
+    raise RouterError("; ".join(errors) or "no Gemini model available (all cooling down)")
+
+
+class _Response:
+    def __init__(self, text, model_name=None):
+        self.text = text
+        self.model_name = model_name
+
+
+class RoutedModel:
+    """GenerativeModel 처럼 generate_content(prompt, stream=False) 를 제공하는 라우터 래퍼"""
+
+    def __init__(self, purpose: str = "", hedge_after: float | None = None, deadline: float | None = None):
+        self.purpose = purpose
+        self.hedge_after = hedge_after
+        self.deadline = deadline
+
+    def generate_content(self, prompt, stream=False):
+        if stream:
+            return (_Response(text) for text in stream_text(prompt, self.purpose))
+        text, name = generate(prompt, self.purpose, self.hedge_after, self.deadline)
+        return _Response(text, name)
+
+
+def routed_model(purpose: str = "", hedge_after: float | None = None, deadline: float | None = None):
+    """API 키가 없으면 None (gemini_client.get_model 과 같은 규칙)"""
+    if gemini_client.get_model() is None:
+        return None
+    return RoutedModel(purpose, hedge_after, deadline)
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    stats = _load_stats()
+    print(f"Candidates: {candidates()}")
+    print(f"Ranked:     {ranked()}")
+    for name in candidates():
+        entry = stats.get(name)
+        if not entry:
+            print(f"  {name}: no data")
+            continue
+        cooling = max(entry.get("cooldown_until", 0) - time.time(), 0)
+        latency = f"{entry['latency']:.1f}s" if entry.get("latency") is not None else "-"
+        print(f"  {name}: latency {latency}, error rate {entry['error_rate']:.0%}, "
+              f"{entry['calls']} call(s)" + (f", cooling down {cooling / 60:.0f} min" if cooling else ""))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NotebookLM 업로드 기록 (data/notebooklm_manifest.json)
+
+노트북 URL 별로 올린 파일의 이름과 내용 해시를 기록해 같은 파일을 두 번 올리지 않도록 합니다.
+- pending(): 기록된 (이름, 해시) 와 같은 파일은 빼고 반환 → 모두 빠지면 브라우저를 띄우지 않음
+- 기록에 없더라도 노트북 소스 목록에 같은 이름이 있으면 upload_source 가 건너뛰고 여기에 기록 (adopted)
+- 이름은 같은데 내용이 바뀐 파일은 노트북의 기존 소스를 지우고 새로 올림 (upload_source.replace_sources)
+표준 라이브러리만 사용 (agent_s 와 NotebookLM 스킬 가상환경 양쪽에서 import).
+
+실행:
+    python notebooklm_manifest.py list [노트북 URL]
+    python notebooklm_manifest.py forget 20260302_AM_분석보고서.md   # 노트북에서 지운 소스를 다시 올릴 수 있게
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(BASE_DIR, "data", "notebooklm_manifest.json")
+
+_lock = threading.Lock()
+
+
+def content_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load() -> dict:
+    try:
+        with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(data: dict):
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    tmp_path = f"{MANIFEST_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def _key(notebook_url: str) -> str:
+    return notebook_url.split("?")[0].rstrip("/")
+
+
+def entries(notebook_url: str) -> dict:
+    """{파일 이름: {"hash", "uploaded_at", "origin"}}"""
+    return _load().get(_key(notebook_url), {})
+
+
+def pending(notebook_url: str, paths) -> list:
+    """이 노트북에 같은 이름·같은 내용으로 기록되지 않은 파일만"""
+    known = entries(notebook_url)
+    result = []
+    for path in paths:
+        entry = known.get(os.path.basename(path))
+        if entry is None or entry["hash"] != content_hash(path):
+            result.append(path)
+    return result
+
+
+def record(notebook_url: str, paths, origin: str = "uploaded"):
+    """origin: uploaded(이번에 올림) / adopted(노트북에 이미 같은 이름이 있어 건너뜀)"""
+    if not paths:
+        return
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with _lock:
+        data = _load()
+        notebook = data.setdefault(_key(notebook_url), {})
+        for path in paths:
+            notebook[os.path.basename(path)] = {"hash": content_hash(path), "uploaded_at": now, "origin": origin}
+        _save(data)
+
+
+def forget(names, notebook_url: str | None = None) -> int:
+    """기록 삭제 (notebook_url 이 없으면 모든 노트북에서). 삭제한 항목 수"""
+    removed = 0
+    with _lock:
+        data = _load()
+        for url, notebook in data.items():
+            if notebook_url and url != _key(notebook_url):
+                continue
+            for name in names:
+                if notebook.pop(name, None) is not None:
+                    removed += 1
+        _save(data)
+    return removed
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    if len(sys.argv) < 2 or sys.argv[1] not in ("list", "forget") or (sys.argv[1] == "forget" and len(sys.argv) < 3):
+        print("사용법: python notebooklm_manifest.py list [노트북 URL]")
+        print("        python notebooklm_manifest.py forget <파일 이름> [...]")
+        sys.exit(1)
+
+    if sys.argv[1] == "list":
+        for url, notebook in _load().items():
+            if len(sys.argv) > 2 and url != _key(sys.argv[2]):
+                continue
+            print(f"{url} ({len(notebook)}개)")
+            for name, entry in sorted(notebook.items()):
+                print(f"  {entry['uploaded_at']} | {entry['origin']:<8} | {entry['hash'][:12]} | {name}")
+    else:
+        print(f"{forget(sys.argv[2:])}개 기록 삭제")
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NotebookLM 상주 브라우저 서비스
+
+업로드/질의/동영상 개요 생성/다운로드마다 새 Python + Chromium 을 띄우고 노트북 SPA 를 처음부터 불러오는 대신,
+인증된 브라우저 컨텍스트 하나를 띄워 두고 노트북 페이지를 열어 둔 채 명령을 받아 처리합니다.
+- 로컬 소켓(multiprocessing.connection, 127.0.0.1)으로 JSON 명령을 받고, 접속 정보(포트, 인증 키)는
+  data/notebooklm_service.json 에 기록 (서비스 종료 시 삭제)
+- 명령은 한 번에 하나씩 순서대로 처리 (Playwright sync API 는 한 스레드에서만 사용)
+- NOTEBOOKLM_SERVICE_IDLE 초(기본 12시간) 동안 명령이 없으면 종료
+- 서비스가 없거나 응답하지 않으면 호출하는 쪽(agent_s, upload_source 등)은 기존처럼 스크립트를 새로 실행
+
+서버는 patchright 가 설치된 NotebookLM 스킬 가상환경에서 실행합니다. 클라이언트(call)는 표준 라이브러리만 사용.
+
+실행:
+    <스킬 .venv>/bin/python notebooklm_service.py serve   # 상주 서비스 시작
+    python notebooklm_service.py status             # 실행 여부 확인
+    python notebooklm_service.py stop               # 종료
+"""
+
+import contextlib
+import io
+import json
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(BASE_DIR, "data", "notebooklm_service.json")
+LOG_FILE = os.path.join(BASE_DIR, "logs", "notebooklm_service.log")
+DEFAULT_IDLE_SECONDS = 12 * 3600
+START_TIMEOUT_SECONDS = 90
+
+# 질의 입력/답변 셀렉터 (NotebookLM 채팅 패널)
+QUERY_INPUT_SELECTORS = ["textarea.query-box-input", "textarea[aria-label*='쿼리']", "textarea[aria-label*='query' i]"]
+RESPONSE_SELECTORS = [".to-user-container .message-text-content", ".to-user-container"]
+
+
+class ServiceUnavailable(Exception):
+    """서비스가 실행 중이 아니거나 응답하지 않음 → 호출하는 쪽은 기존 방식으로 실행"""
+
+
+def log(message):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] [NotebookLM Service] {message}", flush=True)
+
+
+def _mode():
+    """NOTEBOOKLM_SERVICE: auto(기본, 없으면 띄워서 사용) / attach(이미 실행 중일 때만 사용) / off"""
+    return os.getenv("NOTEBOOKLM_SERVICE", "auto").strip().lower()
+
+
+def enabled() -> bool:
+    return _mode() not in ("off", "0", "false", "no")
+
+
+def autostart() -> bool:
+    return _mode() == "auto"
+
+
+# --- 클라이언트 ---
+
+def _read_state():
+    try:
+        with open(STATE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def call(command: str, timeout: float = 180, **args) -> dict:
+    """
+    명령 전송 → {"ok": bool, "result": ..., "log": 서비스 출력, "elapsed": 초}.
+    서비스가 없거나 접속(인증)에 실패하면 ServiceUnavailable → 호출하는 쪽은 새 브라우저로 실행해도 됨.
+    명령을 보낸 뒤의 시간 초과·연결 끊김은 서비스가 아직 처리 중일 수 있으므로 예외 대신 실패 응답
+    ({"ok": False, "busy": True, ...}) → 새 브라우저로 다시 실행하지 않음 (같은 프로필에 브라우저 두 개, 중복 업로드 방지)
+    """
+    state = _read_state()
+    if not state:
+        raise ServiceUnavailable("service is not running")
+    try:
+        conn = Client(("127.0.0.1", state["port"]), authkey=bytes.fromhex(state["authkey"]))
+    except (OSError, EOFError, AuthenticationError) as e:
+        raise ServiceUnavailable(f"cannot connect: {e}")
+    with conn:
+        try:
+            conn.send_bytes(json.dumps({"command": command, "args": args}, ensure_ascii=False).encode("utf-8"))
+            if conn.poll(timeout):
+                return json.loads(conn.recv_bytes().decode("utf-8"))
+            error = f"no reply within {timeout:.0f}s (the service may still be running it)"
+        except (OSError, EOFError) as e:
+            error = f"connection lost after sending: {e}"
+    return {"ok": False, "busy": True, "result": None, "error": error, "log": "", "elapsed": timeout}
+
+
+def is_running() -> bool:
+    """ping 은 접속을 받는 스레드에서 바로 응답하므로 긴 명령을 처리하는 중에도 대기하지 않음"""
+    try:
+        return call("ping", timeout=10).get("ok", False)
+    except ServiceUnavailable:
+        return False
+
+
+def run_or_fallback(command: str, fallback, timeout: float = 180, **args) -> bool:
+    """도우미 스크립트용: 서비스가 실행 중이면 명령을 보내고, 아니면 fallback()(새 브라우저)으로 실행"""
+    if enabled():
+        try:
+            reply = call(command, timeout=timeout, **args)
+        except ServiceUnavailable:
+            pass
+        else:
+            print(reply.get("log", ""), end="")
+            if reply.get("error"):
+                print(f"[오류] {reply['error']}")
+            return reply["ok"]
+    return fallback()
+
+
+def ensure_running(python_exe: str) -> bool:
+    """실행 중이 아니면 python_exe(스킬 가상환경)로 백그라운드 실행 후 응답할 때까지 대기"""
+    if is_running():
+        return True
+    os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    kwargs = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS} \
+        if sys.platform == "win32" else {"start_new_session": True}
+    with open(LOG_FILE, "a", encoding="utf-8") as out:
+        process = subprocess.Popen([python_exe, os.path.abspath(__file__), "serve"], cwd=BASE_DIR, env=env,
+                                   stdout=out, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL, **kwargs)
+    deadline = time.monotonic() + START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            log(f"service exited during startup (code {process.returncode}), see {LOG_FILE}")
+            return False
+        if is_running():
+            log(f"service started (pid {process.pid})")
+            return True
+        time.sleep(1)
+    # 띄운 서비스를 남겨 두면 호출하는 쪽이 새 브라우저로 대신 실행할 때 같은 프로필을 두 브라우저가 씀
+    log(f"service did not answer in {START_TIMEOUT_SECONDS}s, stopping it (pid {process.pid})")
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    return False
+
+
+# --- 서버 ---
+
+class BrowserWorker:
+    """인증된 컨텍스트 하나와 노트북 URL 별로 열어 둔 페이지"""
+
+    def __init__(self):
+        # 스킬 가상환경에서만 필요한 모듈 (클라이언트는 import 하지 않음)
+        from patchright.sync_api import sync_playwright
+        import upload_source
+        self.upload_source = upload_source
+        self._playwright = sync_playwright().start()
+        self.context = None
+        self.pages = {}
+
+    def _ensure_context(self):
+        if self.context is not None:
+            try:
+                self.context.pages
+                return
+            except Exception:
+                log("browser context lost, relaunching")
+        self.context = self.upload_source.BrowserFactory.launch_persistent_context(self._playwright, headless=True)
+        self.pages = {}
+
+    def page_for(self, notebook_url):
+        """열어 둔 노트북 페이지 (처음이거나 닫혔으면 새로 열고 SPA 로딩 대기)"""
+        self._ensure_context()
+        page = self.pages.get(notebook_url)
+        if page is not None and not page.is_closed() and page.url.startswith(notebook_url):
+            # 이전 명령이 남긴 대화상자/메뉴 닫기
+            page.keyboard.press("Escape")
+            return page
+        page = self.context.new_page()
+        if not self.upload_source.open_notebook(page, notebook_url):
+            page.close()
+            raise RuntimeError("NotebookLM login required")
+        self.pages[notebook_url] = page
+        return page
+
+    def discard(self, notebook_url):
+        """명령 실패 후 페이지 상태를 믿을 수 없으므로 다음 명령에서 새로 연다"""
+        page = self.pages.pop(notebook_url, None)
+        if page is not None:
+            with contextlib.suppress(Exception):
+                page.close()
+
+    def close(self):
+        if self.context is not None:
+            with contextlib.suppress(Exception):
+                self.context.close()
+        with contextlib.suppress(Exception):
+            self._playwright.stop()
+
+    # --- 명령 ---
+
+    def upload(self, notebook_url, paths, force=False):
+        return self.upload_source.upload_on_page(self.page_for(notebook_url), paths, notebook_url, force=force)
+
+    def trigger_overview(self, notebook_url):
+        import generate_podcast
+        return generate_podcast.trigger_on_page(self.page_for(notebook_url))
+
+    def download(self, notebook_url):
+        import download_notebooklm_content
+        download_notebooklm_content.OUT_DIR.mkdir(parents=True, exist_ok=True)
+        return download_notebooklm_content.download_on_page(self.page_for(notebook_url))
+
+    def ask(self, notebook_url, question, timeout=150):
+        """채팅 입력 → 새 답변이 나타나고 내용이 더 바뀌지 않을 때까지 대기 → 답변 텍스트"""
+        page = self.page_for(notebook_url)
+        box = next((page.locator(s).first for s in QUERY_INPUT_SELECTORS if page.locator(s).count() > 0), None)
+        if box is None:
+            raise RuntimeError("query input not found")
+        selector = next((s for s in RESPONSE_SELECTORS if page.locator(s).count() > 0), RESPONSE_SELECTORS[0])
+        before = page.locator(selector).count()
+        box.fill(question)
+        box.press("Enter")
+
+        deadline = time.monotonic() + timeout
+        last, stable = None, 0
+        while time.monotonic() < deadline:
+            page.wait_for_timeout(1000)
+            answers = page.locator(selector)
+            if answers.count() <= before:
+                continue
+            text = answers.last.inner_text().strip()
+            stable = stable + 1 if text and text == last else 0
+            last = text
+            if stable >= 3:
+                return text
+        raise RuntimeError(f"no stable answer within {timeout}s")
+
+
+def _handle(worker, request):
+    command, args = request.get("command"), request.get("args", {})
+    handler = {"upload": worker.upload, "ask": worker.ask,
+               "trigger_overview": worker.trigger_overview, "download": worker.download}.get(command)
+    if handler is None:
+        raise ValueError(f"unknown command: {command}")
+    try:
+        return handler(**args)
+    except Exception:
+        worker.discard(args.get("notebook_url"))
+        raise
+
+
+class _Tee(io.TextIOBase):
+    """명령 처리 중 출력 → 서비스 로그와 응답의 log 필드 양쪽으로"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = io.StringIO()
+
+    def write(self, text):
+        self.stream.write(text)
+        return self.buffer.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def serve(idle_seconds=None):
+    import upload_source  # noqa: F401  (스킬 경로를 sys.path 에 추가)
+    from auth_manager import AuthManager
+
+    if not AuthManager().is_authenticated():
+        log("NotebookLM authentication required (auth_manager.py setup)")
+        return 1
+    if idle_seconds is None:
+        idle_seconds = int(os.getenv("NOTEBOOKLM_SERVICE_IDLE", DEFAULT_IDLE_SECONDS))
+    authkey = secrets.token_bytes(32)
+    listener = Listener(("127.0.0.1", int(os.getenv("NOTEBOOKLM_SERVICE_PORT", "0"))), authkey=authkey)
+    worker = BrowserWorker()
+
+    # 접속 수락은 별도 스레드, 브라우저 조작은 메인 스레드에서만
+    connections = queue.Queue()
+
+    busy = {"command": None}
+
+    def accept_loop():
+        while True:
+            try:
+                conn = listener.accept()
+            except OSError:
+                return
+            except Exception as e:  # 인증 실패 등
+                log(f"rejected connection: {e}")
+                continue
+            try:
+                request = json.loads(conn.recv_bytes().decode("utf-8")) if conn.poll(10) else None
+            except (OSError, EOFError, ValueError):
+                request = None
+            if request is None:
+                conn.close()
+            elif request.get("command") == "ping":
+                # 브라우저를 쓰지 않으므로 처리 중인 명령을 기다리지 않고 바로 응답
+                with contextlib.suppress(OSError):
+                    conn.send_bytes(json.dumps({"ok": True, "result": {"busy": busy["command"]}, "log": "",
+                                                "elapsed": 0}).encode("utf-8"))
+                conn.close()
+            else:
+                connections.put((conn, request))
+
+    threading.Thread(target=accept_loop, name="notebooklm-accept", daemon=True).start()
+
+    os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+    tmp_path = STATE_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"port": listener.address[1], "authkey": authkey.hex(), "pid": os.getpid(),
+                   "started_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}, f)
+    os.chmod(tmp_path, 0o600)
+    os.replace(tmp_path, STATE_FILE)
+    log(f"listening on 127.0.0.1:{listener.address[1]} (idle timeout {idle_seconds}s)")
+
+    try:
+        while True:
+            try:
+                conn = connections.get(timeout=idle_seconds)
+            except queue.Empty:
+                log("idle timeout, shutting down")
+                break
+            conn, request = conn
+            with conn:
+                if conn.poll(0):
+                    # 기다리던 클라이언트가 이미 연결을 끊음 (시간 초과) → 늦게 실행하지 않음
+                    log(f"{request.get('command')} skipped: client gave up waiting")
+                    continue
+                if request.get("command") == "stop":
+                    conn.send_bytes(json.dumps({"ok": True, "result": None, "log": "", "elapsed": 0}).encode("utf-8"))
+                    log("stop requested")
+                    break
+                started = time.monotonic()
+                tee = _Tee(sys.stdout)
+                busy["command"] = request.get("command")
+                try:
+                    with contextlib.redirect_stdout(tee):
+                        result = _handle(worker, request)
+                    reply = {"ok": result is not False, "result": result}
+                except Exception as e:
+                    reply = {"ok": False, "result": None, "error": f"{type(e).__name__}: {e}"}
+                    log(f"{request.get('command')} failed: {reply['error']}")
+                finally:
+                    busy["command"] = None
+                reply.update(log=tee.buffer.getvalue(), elapsed=round(time.monotonic() - started, 2))
+                log(f"{request.get('command')} done in {reply['elapsed']:.1f}s (ok={reply['ok']})")
+                with contextlib.suppress(OSError):
+                    conn.send_bytes(json.dumps(reply, ensure_ascii=False).encode("utf-8"))
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(STATE_FILE)
+        listener.close()
+        worker.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    action = sys.argv[1] if len(sys.argv) > 1 else ""
+    if action == "serve":
+        sys.path.insert(0, BASE_DIR)
+        from app_config import load_config
+        load_config()
+        sys.exit(serve())
+    elif action == "status":
+        state = _read_state()
+        if state and is_running():
+            print(f"실행 중: pid {state['pid']}, port {state['port']}, 시작 {state['started_at']}")
+        else:
+            print("실행 중 아님")
+            sys.exit(1)
+    elif action == "stop":
+        try:
+            call("stop", timeout=10)
+            print("종료 요청 완료")
+        except ServiceUnavailable:
+            print("실행 중 아님")
+    else:
+        print("사용법: python notebooklm_service.py [serve|status|stop]")
+        sys.exit(1)
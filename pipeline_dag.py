@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+파이프라인 단계 실행기 (의존 관계 + 체크포인트 + 이어서 실행)
+
+main.run_pipeline 의 단계(재생목록 → 자막 → 분석 → 렌더링 → 전송 / 업로드)를 의존 관계대로 실행하고,
+단계별 결과를 data/runs/<run_id>/state.json 에 기록합니다.
+- 같은 run_id 로 다시 실행하면 완료된 단계는 저장된 결과를 그대로 쓰고, 처음 미완료 단계부터 이어서 실행
+- 앞 단계를 이번에 다시 실행했다면 뒤 단계도 다시 실행 (저장된 결과가 앞 단계와 맞지 않을 수 있으므로)
+- 선행 단계가 모두 끝난 단계들은 동시에 실행 (텔레그램 전송과 NotebookLM 업로드)
+- 단계 함수가 None 을 반환하거나 예외를 내면 실패. attempts 만큼 재시도
+
+단계 결과(output)는 JSON 으로 저장할 수 있는 dict 여야 합니다. 큰 결과(자막 등)는 artifact_path() 에 파일로 두고 경로만 반환.
+
+실행:
+    python pipeline_dag.py list                 # 최근 실행 목록
+    python pipeline_dag.py status 20260302_AM   # 단계별 상태
+"""
+
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNS_DIR = os.path.join(BASE_DIR, "data", "runs")
+KEEP_RUNS = 60
+
+DONE, FAILED, BLOCKED, REUSED = "done", "failed", "blocked", "reused"
+
+
+def log(message):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] [Pipeline] {message}")
+
+
+class Stage:
+    """
+    name: 단계 이름, func(inputs) → 결과 dict 또는 None(실패). inputs 는 {선행 단계 이름: 결과}
+    validate(output): 저장된 결과를 재사용해도 되는지 (예: 보고서 파일이 그대로 있는지)
+    """
+
+    def __init__(self, name, func, deps=(), attempts=1, retry_delay=0, validate=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.attempts = attempts
+        self.retry_delay = retry_delay
+        self.validate = validate
+
+
+class RunState:
+    """data/runs/<run_id>/state.json (단계별 status, output, error, 시각)"""
+
+    def __init__(self, run_id, runs_dir=RUNS_DIR):
+        self.run_id = run_id
+        self.dir = os.path.join(runs_dir, run_id)
+        self.path = os.path.join(self.dir, "state.json")
+        self._lock = threading.Lock()
+        self.data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"run_id": self.run_id, "created_at": _now(), "stages": {}}
+
+    def stage(self, name):
+        return self.data["stages"].get(name)
+
+    def record(self, name, status, output=None, error="", attempts=0, elapsed=0.0):
+        with self._lock:
+            self.data["stages"][name] = {
+                "status": status, "output": output, "error": error, "attempts": attempts,
+                "elapsed": round(elapsed, 2), "finished_at": _now(),
+            }
+            self.data["updated_at"] = _now()
+            self._save()
+
+    def _save(self):
+        os.makedirs(self.dir, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def reset(self):
+        """체크포인트 삭제 (처음부터 다시 실행)"""
+        shutil.rmtree(self.dir, ignore_errors=True)
+        self.data = {"run_id": self.run_id, "created_at": _now(), "stages": {}}
+
+    def artifact_path(self, file_name):
+        os.makedirs(self.dir, exist_ok=True)
+        return os.path.join(self.dir, file_name)
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _run_stage(stage, inputs):
+    """(결과, 오류 메시지, 시도 횟수)"""
+    error = ""
+    for attempt in range(1, stage.attempts + 1):
+        try:
+            output = stage.func(inputs)
+            if output is not None:
+                return output, "", attempt
+            error = "stage returned no result"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        log(f"[{stage.name}] attempt {attempt}/{stage.attempts} failed: {error}")
+        if attempt < stage.attempts and stage.retry_delay:
+            time.sleep(stage.retry_delay)
+    return None, error, stage.attempts
+
+
+def execute(stages, state: RunState, max_workers=2) -> dict:
+    """
+    단계 목록을 의존 관계대로 실행. {단계 이름: done/reused/failed/blocked} 반환.
+    실패한 단계 뒤의 단계는 blocked (체크포인트에는 기록하지 않음 → 다음 실행에서 이어서)
+    """
+    statuses, outputs, rerun = {}, {}, set()
+
+    def reusable(stage):
+        saved = state.stage(stage.name)
+        if not saved or saved["status"] != DONE or any(d in rerun for d in stage.deps):
+            return False
+        try:
+            return stage.validate is None or bool(stage.validate(saved["output"]))
+        except Exception:
+            return False
+
+    pending = list(stages)
+    running = {}
+
+    def schedule(pool):
+        """선행 단계가 끝난 단계를 재사용 처리하거나 실행 시작 (더 진행할 것이 없을 때까지 반복)"""
+        progressed = True
+        while progressed:
+            progressed = False
+            for stage in list(pending):
+                if any(statuses.get(d) in (FAILED, BLOCKED) for d in stage.deps):
+                    statuses[stage.name] = BLOCKED
+                elif not all(statuses.get(d) in (DONE, REUSED) for d in stage.deps):
+                    continue
+                elif reusable(stage):
+                    statuses[stage.name] = REUSED
+                    outputs[stage.name] = state.stage(stage.name)["output"]
+                    log(f"[{stage.name}] reusing checkpoint")
+                else:
+                    rerun.add(stage.name)
+                    inputs = {d: outputs[d] for d in stage.deps}
+                    log(f"[{stage.name}] start")
+                    running[pool.submit(_run_stage, stage, inputs)] = (stage, time.monotonic())
+                pending.remove(stage)
+                progressed = True
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage") as pool:
+        while pending or running:
+            schedule(pool)
+            if not running:
+                # 없는 단계에 의존하는 등 더 진행할 수 없는 단계
+                for stage in pending:
+                    statuses[stage.name] = BLOCKED
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, started = running.pop(future)
+                output, error, attempts = future.result()
+                elapsed = time.monotonic() - started
+                if output is None:
+                    statuses[stage.name] = FAILED
+                    state.record(stage.name, FAILED, None, error, attempts, elapsed)
+                    log(f"[{stage.name}] failed after {elapsed:.1f}s: {error}")
+                else:
+                    statuses[stage.name] = DONE
+                    outputs[stage.name] = output
+                    state.record(stage.name, DONE, output, "", attempts, elapsed)
+                    log(f"[{stage.name}] done in {elapsed:.1f}s")
+    return statuses
+
+
+def prune(keep=KEEP_RUNS, runs_dir=RUNS_DIR):
+    """오래된 실행 기록 정리 (최근 keep 개만 남김)"""
+    try:
+        runs = sorted(os.listdir(runs_dir))
+    except OSError:
+        return
+    for run_id in runs[:-keep] if keep else runs:
+        shutil.rmtree(os.path.join(runs_dir, run_id), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    if len(sys.argv) < 2 or sys.argv[1] not in ("list", "status") or (sys.argv[1] == "status" and len(sys.argv) < 3):
+        print("사용법: python pipeline_dag.py list")
+        print("        python pipeline_dag.py status <run_id>")
+        sys.exit(1)
+
+    if sys.argv[1] == "list":
+        runs = sorted(os.listdir(RUNS_DIR)) if os.path.isdir(RUNS_DIR) else []
+        for run_id in runs[-20:]:
+            stages = RunState(run_id).data["stages"]
+            summary = ", ".join(f"{name}:{info['status']}" for name, info in stages.items())
+            print(f"{run_id}: {summary or '-'}")
+    else:
+        state = RunState(sys.argv[2])
+        if not state.data["stages"]:
+            print(f"{sys.argv[2]}: 기록 없음")
+        for name, info in state.data["stages"].items():
+            print(f"{name:>10} | {info['status']:<6} | attempts {info['attempts']} | {info['elapsed']:>6.1f}s | "
+                  f"{info['finished_at']} | {info['error'] or ''}")
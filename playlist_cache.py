@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+재생목록 조회 캐시 (조건부 GET + 압축 스냅샷)
+
+재생목록 ID별로 data/playlist_cache/<ID>.json.gz 스냅샷을 보관합니다.
+- max_age 이내의 스냅샷은 네트워크 없이 그대로 반환
+- 그 외에는 ETag / Last-Modified 로 재검증, 304면 파싱된 목록을 캐시에서 반환
+- SNAPSHOT_TTL 이 지난 스냅샷과 MAX_SNAPSHOTS 초과분은 삭제
+적중/실패 횟수는 logs/cache_stats.json 의 "playlist" 항목에 기록됩니다.
+
+실행:
+    python playlist_cache.py <재생목록 URL>     # 조회 후 결과 출력
+    python playlist_cache.py --evict            # 만료 스냅샷 정리
+"""
+
+import gzip
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import parse_qs, urlparse
+
+import cache_stats
+import http_session
+import playlist_stream
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "playlist_cache")
+SNAPSHOT_TTL = 7 * 24 * 3600   # 일주일 지난 스냅샷은 재검증 가치가 없다
+MAX_SNAPSHOTS = 50
+DIAGNOSTIC_MAX_AGE = 300       # 진단 스크립트는 5분 이내 스냅샷이면 재요청하지 않음
+
+
+def log(message):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] [PlaylistCache] {message}")
+
+
+def playlist_id(playlist_url: str) -> str:
+    ids = parse_qs(urlparse(playlist_url).query).get("list")
+    if ids:
+        return ids[0]
+    # list 파라미터가 없으면 URL 자체를 파일명으로 쓸 수 있게 정리
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in playlist_url)[-80:]
+
+
+def _snapshot_path(pid: str) -> str:
+    return os.path.join(CACHE_DIR, f"{pid}.json.gz")
+
+
+def load_snapshot(playlist_url: str) -> dict | None:
+    path = _snapshot_path(playlist_id(playlist_url))
+    try:
+        if time.time() - os.path.getmtime(path) > SNAPSHOT_TTL:
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        snapshot["videos"] = [tuple(v) for v in snapshot.get("videos", [])]
+        return snapshot
+    except (OSError, ValueError, EOFError):
+        return None
+
+
+def _save_snapshot(snapshot: dict):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _snapshot_path(snapshot["playlist_id"])
+    # 다중 실행에서 같은 파일을 동시에 쓸 수 있어 쓰는 쪽마다 다른 임시 파일
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        log(f"Snapshot write failed: {e}")
+    evict()
+
+
+def evict(max_age: int = SNAPSHOT_TTL, max_entries: int = MAX_SNAPSHOTS) -> int:
+    """만료되었거나 개수 한도를 넘는 스냅샷 삭제. 삭제한 개수 반환"""
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith(".json.gz"):
+            path = os.path.join(CACHE_DIR, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+    entries.sort(reverse=True)
+
+    now = time.time()
+    removed = 0
+    for i, (mtime, path) in enumerate(entries):
+        if i >= max_entries or now - mtime > max_age:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+    if removed:
+        cache_stats.record("playlist", "evicted", removed)
+    return removed
+
+
+def _tee(chunks, sink: list):
+    for chunk in chunks:
+        sink.append(chunk)
+        yield chunk
+
+
+def fetch_snapshot(playlist_url: str, max_age: float = 0, timeout: int = 10) -> dict | None:
+    """
+    재생목록 스냅샷 반환: {"videos": [(videoId, title, publishedText), ...], "html": 읽은 페이지 앞부분, ...}
+    (페이지 전체가 필요한 값은 channel_id 처럼 따로 조회)
+    네트워크 오류 시에는 만료 전 스냅샷이 있으면 그것을 반환합니다.
+    """
+    cached = load_snapshot(playlist_url)
+    if cached and time.time() - cached.get("fetched_at", 0) < max_age:
+        cache_stats.record("playlist", "hit")
+        return cached
+
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        response = http_session.get(playlist_url, headers=headers, timeout=timeout, stream=True)
+    except Exception as e:
+        log(f"Playlist request failed: {e}")
+        cache_stats.record("playlist", "error")
+        return cached
+
+    if response.status_code == 304 and cached:
+        response.close()
+        cached["fetched_at"] = time.time()
+        _save_snapshot(cached)
+        cache_stats.record("playlist", "revalidated")
+        return cached
+
+    if response.status_code != 200:
+        response.close()
+        log(f"Playlist request returned {response.status_code}")
+        cache_stats.record("playlist", "error")
+        return cached
+
+    raw_chunks = []
+    chunks = _tee(response.iter_content(chunk_size=playlist_stream.CHUNK_SIZE), raw_chunks)
+    try:
+        videos = list(playlist_stream.iter_playlist_videos(chunks))
+    finally:
+        response.close()
+
+    snapshot = {
+        "playlist_id": playlist_id(playlist_url),
+        "url": playlist_url,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "fetched_at": time.time(),
+        "videos": videos,
+        "html": b"".join(raw_chunks).decode("utf-8", errors="replace"),
+    }
+    # 빈 목록은 저장하지 않는다 (다음 요청에서 멀쩡한 스냅샷을 덮어쓰지 않도록)
+    if videos:
+        _save_snapshot(snapshot)
+    cache_stats.record("playlist", "miss")
+    return snapshot
+
+
+def fetch_videos(playlist_url: str, max_age: float = 0, timeout: int = 10) -> list | None:
+    """[(videoId, title, publishedText), ...] 반환. 조회 실패 시 None"""
+    snapshot = fetch_snapshot(playlist_url, max_age=max_age, timeout=timeout)
+    return snapshot["videos"] if snapshot else None
+
+
+def _find_channel_id(text: str, keys=("channelId",)) -> str | None:
+    for key in keys:
+        match = re.search(rf'"{key}":"([^"]+)"', text)
+        if match:
+            return match.group(1)
+    return None
+
+
+def channel_id(playlist_url: str, max_age: float = DIAGNOSTIC_MAX_AGE, timeout: int = 10) -> str | None:
+    """
+    재생목록 채널 ID (진단 스크립트용). 스냅샷 "html" 은 영상 목록이 끝난 곳까지만 읽은 앞부분이라
+    거기서 못 찾으면 전체 페이지를 받아 찾고, 찾은 ID 는 스냅샷에 저장해 다음 조회에 재사용
+    """
+    snapshot = fetch_snapshot(playlist_url, max_age=max_age, timeout=timeout)
+    if snapshot and snapshot.get("channel_id"):
+        return snapshot["channel_id"]
+    found = _find_channel_id(snapshot.get("html", "")) if snapshot else None
+    if not found:
+        try:
+            response = http_session.get(playlist_url, timeout=timeout)
+        except Exception as e:
+            log(f"Playlist request failed: {e}")
+            return None
+        if response.status_code != 200:
+            log(f"Playlist request returned {response.status_code}")
+            return None
+        # 전체 페이지에도 channelId 가 없으면 browseId 로 대신
+        found = _find_channel_id(response.text, keys=("channelId", "browseId"))
+    if found and snapshot and snapshot.get("videos"):
+        snapshot["channel_id"] = found
+        _save_snapshot(snapshot)
+    return found
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    if len(sys.argv) > 1 and sys.argv[1] == "--evict":
+        print(f"Evicted {evict()} snapshot(s).")
+        sys.exit(0)
+    if len(sys.argv) < 2:
+        print("사용법: python playlist_cache.py <재생목록 URL> | --evict")
+        sys.exit(1)
+
+    videos = fetch_videos(sys.argv[1], max_age=DIAGNOSTIC_MAX_AGE)
+    if videos is None:
+        print("Failed to fetch playlist.")
+        sys.exit(1)
+    for vid, title, published in videos[:10]:
+        print(f"ID: {vid} | Title: {title} | {published}")
+    print(f"\nCache stats: {cache_stats.get('playlist')}")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+YouTube 재생목록 페이지 스트리밍 파서
+
+재생목록 HTML 전체를 받아 ytInitialData를 통째로 json.loads 하는 대신,
+응답을 청크 단위로 읽으면서 `playlistVideoRenderer` 객체만 잘라내 파싱합니다.
+마지막 항목이 끝나는 즉시 읽기를 멈추므로 페이지 나머지(수 MB)는 받지 않습니다.
+
+사용법:
+    for video_id, title, published in iter_response(http_session.get(url, stream=True)):
+        ...
+"""
+
+import codecs
+import json
+
+MARKER = '"playlistVideoRenderer":'
+NEXT_ITEM = '},{"playlistVideoRenderer":'
+CHUNK_SIZE = 64 * 1024
+
+# 렌더러 하나는 수 KB 수준. 이보다 길게 닫히지 않으면 페이지 구조가 바뀐 것으로 본다
+MAX_OBJECT_CHARS = 256 * 1024
+
+_DECODER = json.JSONDecoder()
+
+_SEEK, _OBJECT, _NEXT = range(3)
+
+
+def _run_text(node) -> str:
+    """{"runs": [...]} 또는 {"simpleText": ...} 형태에서 텍스트 추출"""
+    if not isinstance(node, dict):
+        return ""
+    if "simpleText" in node:
+        return node["simpleText"]
+    runs = node.get("runs") or []
+    return "".join(r.get("text", "") for r in runs)
+
+
+def _to_video(renderer: dict):
+    video_id = renderer.get("videoId")
+    if not video_id:
+        return None
+    title_node = renderer.get("title") or {}
+    runs = title_node.get("runs") or []
+    title = runs[0].get("text", "") if runs else _run_text(title_node)
+
+    published = _run_text(renderer.get("publishedTimeText"))
+    if not published:
+        # 재생목록 렌더러는 "조회수 … • 3시간 전" 형태의 videoInfo에 게시 시점을 담는다
+        info_runs = (renderer.get("videoInfo") or {}).get("runs") or []
+        if info_runs:
+            published = info_runs[-1].get("text", "").strip()
+    return video_id, title, published
+
+
+class PlaylistStreamParser:
+    """
+    텍스트 조각을 feed() 로 밀어 넣으면 완성된 (videoId, title, publishedText) 를 돌려줍니다.
+    재생목록 항목 배열이 끝나면 done 이 True 가 되고 이후 입력은 무시합니다.
+    """
+
+    def __init__(self, limit: int | None = None):
+        self.limit = limit
+        self.count = 0
+        self.done = False
+        self._buf = ""
+        self._state = _SEEK
+        self._start = 0
+        self._pos = 0
+
+    def feed(self, text: str) -> list:
+        if self.done:
+            return []
+        self._buf += text
+        return list(self._drain(final=False))
+
+    def close(self) -> list:
+        items = [] if self.done else list(self._drain(final=True))
+        self.done = True
+        self._buf = ""
+        return items
+
+    def _begin_object(self, start: int):
+        self._start = start
+        self._state = _OBJECT
+
+    def _drain(self, final: bool):
+        while not self.done:
+            if self._state == _SEEK:
+                idx = self._buf.find(MARKER, self._pos)
+                if idx < 0:
+                    if final:
+                        self.done = True
+                        return
+                    # 청크 경계에 걸친 마커를 놓치지 않도록 꼬리만 남긴다
+                    self._buf = self._buf[-(len(MARKER) - 1):]
+                    self._pos = 0
+                    return
+                self._buf = self._buf[idx + len(MARKER):]
+                self._begin_object(0)
+
+            elif self._state == _OBJECT:
+                try:
+                    renderer, end = _DECODER.raw_decode(self._buf, self._start)
+                except ValueError:
+                    # 객체가 청크 경계에서 잘렸다. 비정상적으로 길면 깨진 데이터로 보고 포기
+                    if final or len(self._buf) - self._start > MAX_OBJECT_CHARS:
+                        self.done = True
+                    return
+                video = _to_video(renderer) if isinstance(renderer, dict) else None
+                self._pos = end
+                self._state = _NEXT
+                if video:
+                    self.count += 1
+                    yield video
+                    if self.limit and self.count >= self.limit:
+                        self.done = True
+                        return
+
+            else:  # _NEXT
+                if len(self._buf) - self._pos < len(NEXT_ITEM) and not final:
+                    return
+                if self._buf.startswith(NEXT_ITEM, self._pos):
+                    self._buf = self._buf[self._pos + len(NEXT_ITEM):]
+                    self._begin_object(0)
+                else:
+                    # continuationItemRenderer 또는 배열 끝: 재생목록 항목은 모두 나왔다
+                    self.done = True
+
+
+def iter_playlist_videos(chunks, limit: int | None = None):
+    """bytes 또는 str 청크 이터러블에서 (videoId, title, publishedText) 를 순서대로 yield"""
+    parser = PlaylistStreamParser(limit=limit)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+    yield from parser.feed(decoder.decode(b"", final=True))
+    yield from parser.close()
+
+
+def iter_response(response, limit: int | None = None):
+    """requests 스트리밍 응답에서 재생목록 항목을 읽고, 다 읽으면 연결을 닫는다"""
+    try:
+        yield from iter_playlist_videos(response.iter_content(chunk_size=CHUNK_SIZE), limit=limit)
+    finally:
+        response.close()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+보고서 색인 (data/report_index.db, SQLite)
+
+output/reports/*_분석보고서.md 를 날짜·AM/PM·섹션·언급 종목(등락률 포함) 단위로 색인합니다.
+- 최신 보고서 / 특정 날짜 보고서 조회는 디렉터리를 훑지 않고 (date, timeframe) 인덱스 조회 한 번
+- 색인은 증분 갱신: Agent B 가 보고서를 저장할 때 add(), 그 밖의 변경은 조회 시
+  디렉터리 mtime 이 바뀐 경우에만 파일별 mtime/크기를 비교해 바뀐 것만 다시 색인
+- 본문 검색은 FTS5 (없는 SQLite 빌드에서는 LIKE 로 대체). 검색어는 접두어로 맞추므로
+  "엔비디아" 로 "엔비디아는", "엔비디아가" 도 찾습니다.
+- 구조화 사이드카(.json, report_schema)가 있으면 종목/등락률을 문서에서 그대로 가져오고,
+  없으면 Markdown 의 "종목명(+3.1%)" 표기에서 추출
+
+실행:
+    python report_index.py refresh                                   # 전체 재검사 (바뀐 파일만 다시 색인)
+    python report_index.py latest [AM|PM]
+    python report_index.py search 엔비디아 --timeframe PM --quarter 2026Q1
+    python report_index.py ticker 삼성전자 --since 2026-01-01
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+import sys
+from contextlib import closing
+from datetime import date, datetime
+
+import report_render
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_DB = os.path.join(BASE_DIR, "data", "report_index.db")
+REPORTS_DIR = os.path.join(BASE_DIR, "output", "reports")
+REPORT_SUFFIX = "_분석보고서.md"
+
+_NAME = re.compile(r"^(\d{8})_(AM|PM)_.*\.md$")
+_SECTION_KEYS = (("국내", "kr"), ("미국", "us"), ("코인", "crypto"), ("인사이트", "insight"))
+# "**삼성전자(+3.1%)**", "엔비디아 (-2%)" 같은 종목 등락 표기
+_TICKER_MOVE = re.compile(r"([0-9A-Za-z가-힣&.\- ]{1,30}?)\s*\(\s*([+\-−]?\d+(?:\.\d+)?)\s*%\s*\)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    name         TEXT PRIMARY KEY,
+    path         TEXT NOT NULL,
+    date         TEXT NOT NULL,
+    timeframe    TEXT NOT NULL,
+    size         INTEGER NOT NULL,
+    mtime        REAL NOT NULL,
+    structured   INTEGER NOT NULL DEFAULT 0,
+    indexed_at   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reports_by_date ON reports (date, timeframe);
+CREATE TABLE IF NOT EXISTS sections (
+    report   TEXT NOT NULL,
+    section  TEXT NOT NULL,
+    body     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sections_by_report ON sections (report);
+CREATE TABLE IF NOT EXISTS tickers (
+    report      TEXT NOT NULL,
+    section     TEXT NOT NULL,
+    name        TEXT NOT NULL,
+    change_pct  REAL
+);
+CREATE INDEX IF NOT EXISTS tickers_by_name ON tickers (name);
+CREATE INDEX IF NOT EXISTS tickers_by_report ON tickers (report);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+_FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5(report UNINDEXED, section UNINDEXED, body)"
+
+_fts = None
+
+
+def log(message):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] [ReportIndex] {message}")
+
+
+def _connect(db_path: str = INDEX_DB) -> sqlite3.Connection:
+    global _fts
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    if _fts is None:
+        try:
+            conn.execute(_FTS_SCHEMA)
+            _fts = True
+        except sqlite3.OperationalError:
+            log("SQLite FTS5 not available; full-text search falls back to LIKE")
+            _fts = False
+    elif _fts:
+        conn.execute(_FTS_SCHEMA)
+    return conn
+
+
+def parse_name(name: str):
+    """20260302_AM_분석보고서.md → ("2026-03-02", "AM"). 형식이 다르면 None"""
+    m = _NAME.match(name)
+    if not m:
+        return None
+    d = m.group(1)
+    return f"{d[:4]}-{d[4:6]}-{d[6:]}", m.group(2)
+
+
+def _section_key(title: str) -> str:
+    for word, key in _SECTION_KEYS:
+        if word in title:
+            return key
+    return "other"
+
+
+def _markdown_sections(content: str) -> list:
+    """━━━ 구분선 기준 [(섹션 키, 본문)], 첫 구분선 앞(제목)은 'intro'"""
+    sections, key, lines = [], "intro", []
+    for line in content.splitlines():
+        if line.strip().startswith("━━━"):
+            sections.append((key, lines))
+            key, lines = None, []
+            continue
+        if key is None and line.strip().startswith("■"):
+            key = _section_key(line)
+        lines.append(line)
+    sections.append((key or "other", lines))
+    return [(k, "\n".join(ls).replace("**", "").strip()) for k, ls in sections if "".join(ls).strip()]
+
+
+def _markdown_tickers(sections: list) -> list:
+    tickers = []
+    for key, body in sections:
+        for m in _TICKER_MOVE.finditer(body):
+            name = m.group(1).strip(" -:·")
+            # "2,650.12 (-1.2%)" 처럼 이름 없이 수치만 있는 경우는 건너뜀
+            if re.search(r"[A-Za-z가-힣]", name):
+                tickers.append((key, name, float(m.group(2).replace("−", "-"))))
+    return tickers
+
+
+def _doc_entries(doc: dict):
+    """구조화 문서 → (섹션 목록, 종목 목록)"""
+    sections, tickers = [], []
+    for section in doc["sections"]:
+        key = section["key"]
+        sections.append((key, report_render.script_input(dict(doc, sections=[section])).split("\n", 1)[-1]))
+        for item in section["indices"] + section["tickers"]:
+            tickers.append((key, item["name"], item.get("change_pct")))
+    return sections, tickers
+
+
+def add(path: str, conn: sqlite3.Connection | None = None) -> bool:
+    """보고서 하나를 (다시) 색인. 이름 형식이 다르거나 파일이 없으면 False"""
+    name = os.path.basename(path)
+    parsed = parse_name(name)
+    if not parsed or not os.path.exists(path):
+        return False
+    if conn is None:
+        with closing(_connect()) as own:
+            return add(path, own)
+
+    stat = os.stat(path)
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    doc = report_render.matching_doc(path, content)
+    if doc:
+        sections, tickers = _doc_entries(doc)
+    else:
+        sections = _markdown_sections(content)
+        tickers = _markdown_tickers(sections)
+
+    with conn:
+        _delete(conn, name)
+        conn.execute(
+            "INSERT INTO reports (name, path, date, timeframe, size, mtime, structured, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (name, os.path.abspath(path), parsed[0], parsed[1], stat.st_size, stat.st_mtime, int(bool(doc)),
+             datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        conn.executemany("INSERT INTO sections (report, section, body) VALUES (?, ?, ?)",
+                         [(name, key, body) for key, body in sections])
+        if _fts:
+            conn.executemany("INSERT INTO sections_fts (report, section, body) VALUES (?, ?, ?)",
+                             [(name, key, body) for key, body in sections])
+        conn.executemany("INSERT INTO tickers (report, section, name, change_pct) VALUES (?, ?, ?, ?)",
+                         [(name, key, ticker, change) for key, ticker, change in tickers])
+    return True
+
+
+def _delete(conn: sqlite3.Connection, name: str):
+    conn.execute("DELETE FROM reports WHERE name = ?", (name,))
+    conn.execute("DELETE FROM sections WHERE report = ?", (name,))
+    conn.execute("DELETE FROM tickers WHERE report = ?", (name,))
+    if _fts:
+        conn.execute("DELETE FROM sections_fts WHERE report = ?", (name,))
+
+
+def refresh(reports_dir: str = REPORTS_DIR, conn: sqlite3.Connection | None = None) -> tuple:
+    """디렉터리와 색인 비교: 새 파일/바뀐 파일은 색인, 사라진 파일은 삭제. (색인 수, 삭제 수)"""
+    if conn is None:
+        with closing(_connect()) as own:
+            return refresh(reports_dir, own)
+    known = {row["name"]: row for row in conn.execute("SELECT name, size, mtime FROM reports")}
+    seen, indexed = set(), 0
+    try:
+        entries = list(os.scandir(reports_dir))
+    except OSError:
+        entries = []
+    for entry in entries:
+        if not entry.name.endswith(REPORT_SUFFIX) or not parse_name(entry.name):
+            continue
+        seen.add(entry.name)
+        stat = entry.stat()
+        row = known.get(entry.name)
+        if row and row["size"] == stat.st_size and row["mtime"] == stat.st_mtime:
+            continue
+        indexed += add(entry.path, conn)
+    removed = [name for name in known if name not in seen]
+    with conn:
+        for name in removed:
+            _delete(conn, name)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dir_mtime', ?)", (str(_dir_mtime(reports_dir)),))
+    return indexed, len(removed)
+
+
+def _dir_mtime(reports_dir: str) -> float:
+    try:
+        return os.stat(reports_dir).st_mtime
+    except OSError:
+        return 0.0
+
+
+def _sync(conn: sqlite3.Connection, reports_dir: str = REPORTS_DIR):
+    """디렉터리 mtime 이 마지막 갱신 이후 바뀐 경우에만 refresh (파일 추가/삭제/교체 감지)"""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'dir_mtime'").fetchone()
+    if row is None or float(row["value"]) != _dir_mtime(reports_dir):
+        refresh(reports_dir, conn)
+
+
+def latest(timeframe: str | None = None) -> dict | None:
+    """가장 최근 보고서 (날짜 → PM → AM 순)"""
+    with closing(_connect()) as conn:
+        _sync(conn)
+        if timeframe:
+            row = conn.execute("SELECT * FROM reports WHERE timeframe = ? ORDER BY date DESC LIMIT 1",
+                               (timeframe,)).fetchone()
+        else:
+            row = conn.execute("SELECT * FROM reports ORDER BY date DESC, timeframe DESC LIMIT 1").fetchone()
+    return dict(row) if row else None
+
+
+def for_date(day, timeframe: str | None = None) -> list:
+    """day(date 또는 YYYYMMDD / YYYY-MM-DD) 의 보고서 목록 (AM → PM)"""
+    day = _iso(day)
+    with closing(_connect()) as conn:
+        _sync(conn)
+        if timeframe:
+            rows = conn.execute("SELECT * FROM reports WHERE date = ? AND timeframe = ?", (day, timeframe)).fetchall()
+        else:
+            rows = conn.execute("SELECT * FROM reports WHERE date = ? ORDER BY timeframe", (day,)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def reports(since=None, until=None, timeframe: str | None = None) -> list:
+    """기간 내 보고서 목록 (날짜, AM → PM 순)"""
+    clauses, params = _filters(timeframe, since, until, None)
+    sql = "SELECT * FROM reports r" + (" WHERE " + " AND ".join(clauses) if clauses else "") + " ORDER BY r.date, r.timeframe"
+    with closing(_connect()) as conn:
+        _sync(conn)
+        rows = conn.execute(sql, params).fetchall()
+    return [dict(row) for row in rows]
+
+
+def _iso(day) -> str:
+    if isinstance(day, (date, datetime)):
+        return day.strftime("%Y-%m-%d")
+    day = str(day)
+    return f"{day[:4]}-{day[4:6]}-{day[6:8]}" if len(day) == 8 and day.isdigit() else day
+
+
+def quarter_range(quarter: str) -> tuple:
+    """"2026Q1" → ("2026-01-01", "2026-03-31")"""
+    m = re.fullmatch(r"(\d{4})\s*[Qq]([1-4])", quarter.strip())
+    if not m:
+        raise ValueError(f"quarter must look like 2026Q1, got {quarter!r}")
+    year, q = int(m.group(1)), int(m.group(2))
+    last_day = {1: "03-31", 2: "06-30", 3: "09-30", 4: "12-31"}[q]
+    return f"{year}-{3 * q - 2:02d}-01", f"{year}-{last_day}"
+
+
+def _filters(timeframe, since, until, section, alias="r", section_column="s.section"):
+    clauses, params = [], []
+    if timeframe:
+        clauses.append(f"{alias}.timeframe = ?")
+        params.append(timeframe)
+    if since:
+        clauses.append(f"{alias}.date >= ?")
+        params.append(_iso(since))
+    if until:
+        clauses.append(f"{alias}.date <= ?")
+        params.append(_iso(until))
+    if section:
+        clauses.append(f"{section_column} = ?")
+        params.append(section)
+    return clauses, params
+
+
+def _fts_query(text: str) -> str:
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in text.split())
+
+
+def _snippet(body: str, terms: list, width: int = 40) -> str:
+    positions = [body.find(t) for t in terms if body.find(t) != -1]
+    if not positions:
+        return body[:width * 2].replace("\n", " ")
+    start = max(min(positions) - width, 0)
+    return ("…" if start else "") + body[start:start + width * 2].replace("\n", " ") + "…"
+
+
+def search(text: str, timeframe: str | None = None, since=None, until=None,
+           section: str | None = None, limit: int = 50) -> list:
+    """본문 검색 (모든 검색어 포함). [{name, date, timeframe, section, snippet}] 최신순"""
+    terms = text.split()
+    if not terms:
+        return []
+    with closing(_connect()) as conn:
+        _sync(conn)
+        if _fts:
+            clauses, params = _filters(timeframe, since, until, section, section_column="f.section")
+            sql = ("SELECT r.name, r.date, r.timeframe, f.section, "
+                   "snippet(sections_fts, 2, '[', ']', '…', 12) AS snippet "
+                   "FROM sections_fts f JOIN reports r ON r.name = f.report "
+                   "WHERE sections_fts MATCH ?" + "".join(f" AND {c}" for c in clauses) +
+                   " ORDER BY r.date DESC, r.timeframe DESC LIMIT ?")
+            rows = conn.execute(sql, (_fts_query(text), *params, limit)).fetchall()
+            return [dict(row) for row in rows]
+        clauses, params = _filters(timeframe, since, until, section)
+        clauses += ["s.body LIKE ?"] * len(terms)
+        params += [f"%{t}%" for t in terms]
+        sql = ("SELECT r.name, r.date, r.timeframe, s.section, s.body FROM sections s "
+               "JOIN reports r ON r.name = s.report WHERE " + " AND ".join(clauses) +
+               " ORDER BY r.date DESC, r.timeframe DESC LIMIT ?")
+        rows = conn.execute(sql, (*params, limit)).fetchall()
+    return [dict(name=row["name"], date=row["date"], timeframe=row["timeframe"], section=row["section"],
+                 snippet=_snippet(row["body"], terms)) for row in rows]
+
+
+def ticker_moves(name: str, timeframe: str | None = None, since=None, until=None, limit: int = 200) -> list:
+    """종목명(부분 일치)의 보고서별 등락률 [{report, date, timeframe, section, name, change_pct}] 최신순"""
+    clauses, params = _filters(timeframe, since, until, None)
+    sql = ("SELECT t.report, r.date, r.timeframe, t.section, t.name, t.change_pct FROM tickers t "
+           "JOIN reports r ON r.name = t.report WHERE t.name LIKE ?" + "".join(f" AND {c}" for c in clauses) +
+           " ORDER BY r.date DESC, r.timeframe DESC LIMIT ?")
+    with closing(_connect()) as conn:
+        _sync(conn)
+        rows = conn.execute(sql, (f"%{name}%", *params, limit)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def _range_args(args):
+    since, until = args.since, args.until
+    if args.quarter:
+        since, until = quarter_range(args.quarter)
+    return since, until
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="보고서 색인 / 검색")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("refresh", help="디렉터리 재검사 (바뀐 파일만 다시 색인)")
+    p_latest = sub.add_parser("latest", help="최신 보고서")
+    p_latest.add_argument("timeframe", nargs="?", choices=["AM", "PM"])
+    for command in ("search", "ticker"):
+        p = sub.add_parser(command, help="본문 검색" if command == "search" else "종목 등락률 이력")
+        p.add_argument("query")
+        p.add_argument("--timeframe", choices=["AM", "PM"])
+        p.add_argument("--since", help="YYYY-MM-DD 또는 YYYYMMDD")
+        p.add_argument("--until", help="YYYY-MM-DD 또는 YYYYMMDD")
+        p.add_argument("--quarter", help="예: 2026Q1 (--since/--until 대신)")
+        p.add_argument("--limit", type=int, default=50)
+        if command == "search":
+            p.add_argument("--section", choices=["intro", "kr", "us", "crypto", "insight", "other"])
+    args = parser.parse_args()
+
+    if args.command == "refresh":
+        indexed, removed = refresh()
+        print(f"Indexed {indexed} report(s), removed {removed}")
+    elif args.command == "latest":
+        row = latest(args.timeframe)
+        print(row["path"] if row else "보고서 없음")
+    elif args.command == "search":
+        since, until = _range_args(args)
+        rows = search(args.query, args.timeframe, since, until, args.section, args.limit)
+        for row in rows:
+            snippet = " ".join(row["snippet"].split())
+            print(f"{row['date']} {row['timeframe']} [{row['section']}] {snippet}")
+        print(f"{len(rows)} match(es)")
+    else:
+        since, until = _range_args(args)
+        rows = ticker_moves(args.query, args.timeframe, since, until, args.limit)
+        for row in rows:
+            change = f"{row['change_pct']:+.2f}%" if row["change_pct"] is not None else "-"
+            print(f"{row['date']} {row['timeframe']} [{row['section']}] {row['name']}: {change}")
+        print(f"{len(rows)} row(s)")
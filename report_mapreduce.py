@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+긴 자막용 map-reduce 분석
+
+자막이 MAPREDUCE_THRESHOLD_TOKENS 를 넘으면 한 번에 보내지 않고
+1. map: 겹치는 구간(window)으로 나눠 구간별로 국내/미국/코인/정책 사실만 추출 (워커 풀에서 동시 실행)
+2. reduce: 추출한 사실을 모아 기존 보고서 프롬프트(agent_b.REPORT_PROMPT)에 자막 대신 넣어 보고서 작성
+짧은 자막은 기존처럼 한 번에 분석합니다 (agent_b.analyze_report).
+
+config.json / 환경 변수:
+    MAPREDUCE_THRESHOLD_TOKENS   이 토큰 수를 넘으면 map-reduce (기본 10000)
+    MAPREDUCE_WINDOW_TOKENS      구간 크기 (기본 4000)
+    MAPREDUCE_OVERLAP_TOKENS     구간 겹침 (기본 300)
+    MAPREDUCE_WORKERS            동시 추출 수 (기본 3)
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import transcript_compact
+from app_config import get_int, load_config
+
+DEFAULT_THRESHOLD_TOKENS = 10000
+DEFAULT_WINDOW_TOKENS = 4000
+DEFAULT_OVERLAP_TOKENS = 300
+DEFAULT_WORKERS = 3
+MAP_ATTEMPTS = 2
+
+MAP_PROMPT = """
+    다음은 증시 시황 YouTube 영상 자막의 일부({index}/{total} 구간)입니다.
+    이 구간에 나온 사실만 아래 4개 항목으로 나눠 개조식(`- `)으로 추출하세요.
+    수치(지수, 등락률, 환율, 가격)와 종목명은 자막 그대로 옮기고, 해석이나 추측은 덧붙이지 마세요.
+    해당 내용이 없는 항목은 `- 없음` 으로 적으세요.
+
+    [국내]
+    [미국]
+    [코인]
+    [정책/거시]
+
+    [자막 구간]
+    {window}
+    """
+
+
+def settings() -> dict:
+    load_config()
+    return {
+        "threshold": get_int("MAPREDUCE_THRESHOLD_TOKENS", DEFAULT_THRESHOLD_TOKENS),
+        "window": get_int("MAPREDUCE_WINDOW_TOKENS", DEFAULT_WINDOW_TOKENS),
+        "overlap": get_int("MAPREDUCE_OVERLAP_TOKENS", DEFAULT_OVERLAP_TOKENS),
+        "workers": get_int("MAPREDUCE_WORKERS", DEFAULT_WORKERS),
+    }
+
+
+def should_use(transcript: str) -> bool:
+    return transcript_compact.estimate_tokens(transcript) > settings()["threshold"]
+
+
+def windows(text: str, window_tokens: int, overlap_tokens: int) -> list:
+    """토큰 추정치 기준으로 겹치는 구간 분할 (공백에서 자름)"""
+    tokens = transcript_compact.estimate_tokens(text)
+    if tokens <= window_tokens:
+        return [text]
+    chars_per_token = len(text) / tokens
+    size = max(int(window_tokens * chars_per_token), 1)
+    overlap = min(int(overlap_tokens * chars_per_token), size // 2)
+
+    parts, start = [], 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            space = text.rfind(" ", start + size // 2, end)
+            end = space if space != -1 else end
+        parts.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        next_start = text.find(" ", max(end - overlap, start + 1))
+        start = next_start + 1 if next_start != -1 and next_start < end else end
+    return [p for p in parts if p]
+
+
+def _extract(model, window: str, index: int, total: int, log_fn):
+    prompt = MAP_PROMPT.format(index=index, total=total, window=window)
+    for attempt in range(1, MAP_ATTEMPTS + 1):
+        try:
+            start = time.time()
+            text = model.generate_content(prompt).text
+            log_fn(f"Map window {index}/{total} done in {time.time() - start:.1f}s")
+            return text
+        except Exception as e:
+            log_fn(f"Map window {index}/{total} failed (attempt {attempt}): {e}")
+    return None
+
+
+def extract_facts(model, transcript: str, log_fn=print) -> str | None:
+    """
+    map 단계: 구간별 추출 결과를 순서대로 합친 텍스트 반환.
+    구간 절반 이상이 실패하면 None (호출하는 쪽에서 한 번에 분석으로 대체)
+    """
+    cfg = settings()
+    parts = windows(transcript, cfg["window"], cfg["overlap"])
+    total = len(parts)
+    log_fn(f"Map-reduce: {total} window(s), {cfg['workers']} worker(s)")
+    with ThreadPoolExecutor(max_workers=max(cfg["workers"], 1), thread_name_prefix="map") as pool:
+        results = list(pool.map(lambda item: _extract(model, item[1], item[0], total, log_fn),
+                                enumerate(parts, start=1)))
+
+    failed = sum(1 for r in results if not r)
+    if failed * 2 > total:
+        log_fn(f"Map-reduce: {failed}/{total} window(s) failed")
+        return None
+    return "\n\n".join(f"[구간 {i}/{total}]\n{r.strip()}" for i, r in enumerate(results, start=1) if r)
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+구조화 보고서(report_schema) → 출력 형식별 렌더러
+
+- markdown(doc):        output/reports 에 저장하는 보고서 (기존 형식 그대로, ━━━ 섹션 구분)
+- telegram_html(doc):   텔레그램 HTML 본문 (필드별로 escape, 정규식 변환 없음)
+- notebooklm_markdown(doc): NotebookLM 소스용 Markdown (제목/표, HTML 없음)
+- script_input(doc):    영상 기획안 프롬프트에 넣는 요약 (한 줄에 한 사실)
+
+섹션 단위로 렌더링하고 결과를 (렌더러, 렌더러 버전, 섹션 내용) 기준으로 메모리에 캐시하므로
+같은 문서를 여러 단계에서 다시 그리거나, 일부 섹션만 바뀐 문서를 그릴 때 나머지 섹션은 재사용합니다.
+렌더러 출력 형식을 바꾸면 RENDER_VERSIONS 의 해당 값을 올릴 것.
+
+실행:
+    python report_render.py output/reports/20260302_AM_분석보고서.json [markdown|telegram|notebooklm|script]
+"""
+
+import hashlib
+import html
+import json
+import sys
+import threading
+from collections import OrderedDict
+
+import report_schema
+
+RENDER_VERSIONS = {"markdown": 1, "telegram": 1, "notebooklm": 1, "script": 1}
+MAX_CACHED_SECTIONS = 256
+
+SECTION_RULE = "━━━━━━━━━━━━━━━━━━━━━━━━━"
+BLOCK_RULE = "-------------"
+DISCLAIMER = "⚠️ 본 보고서는 참고용으로만 제공되며, 투자 결정에 대한 모든 책임은 투자자 본인에게 있습니다."
+
+SECTION_TITLES = {
+    "kr": ("🇰🇷", "국내 시장 요약"),
+    "us": ("🇺🇸", "미국 시장 요약"),
+    "crypto": ("🪙", "코인 시장 동향"),
+    "insight": ("💡", "BWS 투자 인사이트"),
+}
+COMMENT_HEADINGS = {"crypto": "시장 심리 및 영향 요인", "insight": "핵심 코멘트 및 전략"}
+SCRIPT_LABELS = {"kr": "국내", "us": "미국", "crypto": "코인", "insight": "전략"}
+
+_lock = threading.Lock()
+_cache = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+
+
+def display_timeframe(doc: dict) -> str:
+    return "AM Brief" if doc.get("timeframe") == "AM" else "PM Brief"
+
+
+def _pct(change) -> str:
+    return "" if change is None else f"{change:+.2f}".rstrip("0").rstrip(".") + "%"
+
+
+def _cached(renderer: str, section: dict, render):
+    key = (renderer, RENDER_VERSIONS[renderer],
+           hashlib.sha256(json.dumps(section, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest())
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return _cache[key]
+        _stats["misses"] += 1
+    text = render(section)
+    with _lock:
+        _cache[key] = text
+        while len(_cache) > MAX_CACHED_SECTIONS:
+            _cache.popitem(last=False)
+    return text
+
+
+def stats() -> dict:
+    with _lock:
+        return dict(_stats, entries=len(_cache))
+
+
+# --- 섹션 내용 → (소제목, 항목 목록) 블록 ---
+
+def _index_line(item: dict, strong) -> str:
+    head = strong(item["name"])
+    value, change = item.get("value"), _pct(item.get("change_pct"))
+    detail = f"{value} ({change})" if value and change else value or change
+    note = item.get("note")
+    return f"{head}: " + ", ".join(p for p in (detail, note) if p) if detail or note else head
+
+
+def _blocks(section: dict, strong, escape) -> list:
+    """[(소제목, [항목 텍스트, ...]), ...] — strong/escape 로 출력 형식별 강조와 escape 처리"""
+    blocks = []
+    index_items = [_index_line({k: (escape(v) if isinstance(v, str) else v) for k, v in item.items()}, strong)
+                   for item in section["indices"]]
+    index_items += [escape(text) for text in section["flows"]]
+    if index_items:
+        blocks.append(("지수 동향", index_items))
+    if section["policies"]:
+        blocks.append(("주요 정책", [
+            f"{strong(escape(p['title']))}: {escape(p['detail'])}" if p.get("detail") else strong(escape(p["title"]))
+            for p in section["policies"]]))
+    if section["tickers"]:
+        items = []
+        for t in section["tickers"]:
+            name = escape(t["name"]) + (f"({_pct(t['change_pct'])})" if t.get("change_pct") is not None else "")
+            items.append(f"{strong(name)}: {escape(t['reason'])}" if t.get("reason") else strong(name))
+        blocks.append(("주요 섹터 및 종목", items))
+    if section["comments"]:
+        blocks.append((COMMENT_HEADINGS.get(section["key"], "주요 코멘트"), [escape(c) for c in section["comments"]]))
+    return blocks
+
+
+def _rule_section(section: dict, strong, escape) -> str:
+    """기존 보고서 형식: ━━━ / ■ 이모지 제목 / **[소제목]** / 빈 줄로 나눈 개조식 항목"""
+    emoji, title = SECTION_TITLES[section["key"]]
+    lines = [SECTION_RULE, f"■ {emoji} {title}", ""]
+    for i, (heading, items) in enumerate(_blocks(section, strong, escape)):
+        if i:
+            lines.append(BLOCK_RULE)
+        lines += [strong(f"[{heading}]")]
+        for item in items:
+            lines += [f"  - {item}", ""]
+    return "\n".join(lines).rstrip("\n") + "\n"
+
+
+def _md_strong(text):
+    return f"**{text}**"
+
+
+def _html_strong(text):
+    return f"<b>{text}</b>"
+
+
+def _same(text):
+    return text
+
+
+def _markdown_section(section):
+    return _rule_section(section, _md_strong, _same)
+
+
+def _telegram_section(section):
+    return _rule_section(section, _html_strong, html.escape)
+
+
+def _notebooklm_section(section):
+    emoji, title = SECTION_TITLES[section["key"]]
+    lines = [f"## {emoji} {title}", ""]
+    if section["indices"]:
+        lines += ["| 지수 | 수준 | 등락률 | 비고 |", "|---|---|---|---|"]
+        for item in section["indices"]:
+            cells = [item["name"], item.get("value") or "", _pct(item.get("change_pct")), item.get("note") or ""]
+            lines.append("| " + " | ".join(c.replace("|", "/") for c in cells) + " |")
+        lines.append("")
+    trimmed = dict(section, indices=[])
+    for heading, items in _blocks(trimmed, _md_strong, _same):
+        lines += [f"### {heading}", ""] + [f"- {item}" for item in items] + [""]
+    return "\n".join(lines)
+
+
+def _script_section(section):
+    label = SCRIPT_LABELS[section["key"]]
+    lines = []
+    for item in section["indices"]:
+        lines.append(f"[{label}] " + _index_line(item, _same))
+    lines += [f"[{label}] {text}" for text in section["flows"]]
+    lines += [f"[{label}/정책] {p['title']}" + (f": {p['detail']}" if p.get("detail") else "") for p in section["policies"]]
+    for t in section["tickers"]:
+        change = f"({_pct(t['change_pct'])})" if t.get("change_pct") is not None else ""
+        lines.append(f"[{label}/종목] {t['name']}{change}" + (f": {t['reason']}" if t.get("reason") else ""))
+    lines += [f"[{label}] {text}" for text in section["comments"]]
+    return "\n".join(lines)
+
+
+# --- 문서 렌더러 ---
+
+def markdown(doc: dict) -> str:
+    """output/reports 에 저장하는 보고서 (report_stream / telegram_format 이 쓰는 ━━━ 구분 유지)"""
+    parts = [f"☀️ **{display_timeframe(doc)} 투자 동향 요약**\n"]
+    parts += [_cached("markdown", s, _markdown_section) for s in doc["sections"]]
+    parts.append(DISCLAIMER + "\n")
+    return "\n".join(parts)
+
+
+def telegram_html(doc: dict) -> str:
+    """텔레그램 HTML 본문 (제목 줄/링크는 telegram_format.build_html_messages 가 붙임)"""
+    parts = [f"☀️ <b>{display_timeframe(doc)} 투자 동향 요약</b>\n"]
+    parts += [_cached("telegram", s, _telegram_section) for s in doc["sections"]]
+    parts.append(html.escape(DISCLAIMER))
+    return "\n".join(parts)
+
+
+def notebooklm_markdown(doc: dict) -> str:
+    parts = [f"# {doc['date']} {display_timeframe(doc)} 투자 동향 요약", ""]
+    parts += [_cached("notebooklm", s, _notebooklm_section) for s in doc["sections"]]
+    parts.append(f"> {DISCLAIMER}\n")
+    return "\n".join(parts)
+
+
+def script_input(doc: dict) -> str:
+    parts = [f"{doc['date']} {display_timeframe(doc)}"]
+    parts += [_cached("script", s, _script_section) for s in doc["sections"]]
+    return "\n".join(p for p in parts if p)
+
+
+RENDERERS = {
+    "markdown": markdown,
+    "telegram": telegram_html,
+    "notebooklm": notebooklm_markdown,
+    "script": script_input,
+}
+
+
+def matching_doc(report_path: str, content: str) -> dict | None:
+    """
+    보고서 사이드카 문서. 저장된 Markdown 이 문서에서 그린 결과와 다르면(직접 수정 등) None
+    → 호출하는 쪽은 Markdown 파일 기준의 기존 경로를 사용
+    """
+    doc = report_schema.load(report_path)
+    if doc is None or markdown(doc).strip() != content.strip():
+        return None
+    return doc
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    if len(sys.argv) < 2:
+        print(f"사용법: python report_render.py <보고서.json> [{'|'.join(RENDERERS)}]")
+        sys.exit(1)
+    with open(sys.argv[1], "r", encoding="utf-8") as f:
+        document = report_schema.normalize(json.load(f))
+    problems = report_schema.validate(document)
+    if problems:
+        print("\n".join(problems))
+        sys.exit(1)
+    print(RENDERERS[sys.argv[2] if len(sys.argv) > 2 else "markdown"](document))
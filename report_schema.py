@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+구조화 보고서 형식 (JSON) 과 검증
+
+Agent B 가 모델에 Markdown 대신 이 형식의 JSON 을 요청하고, 검증을 통과한 문서를
+보고서 옆에 같은 이름의 .json (사이드카) 으로 저장합니다.
+텔레그램 HTML / NotebookLM Markdown / 영상 기획 입력은 모두 이 문서에서 만들어집니다 (report_render.py).
+
+문서 구조:
+    {
+      "timeframe": "AM" | "PM",
+      "date": "YYYY-MM-DD",
+      "sections": [
+        {
+          "key": "kr" | "us" | "crypto" | "insight",
+          "indices":  [{"name", "value", "change_pct", "note"}],   # 지수 동향
+          "flows":    ["수급/거래대금 등 지수 동향 보충 설명", ...],
+          "policies": [{"title", "detail"}],                       # 주요 정책
+          "tickers":  [{"name", "change_pct", "reason"}],          # 주요 섹터 및 종목
+          "comments": ["시장 심리, 투자 코멘트 등", ...]
+        }
+      ]
+    }
+change_pct 는 숫자(%) 또는 null. 비어 있는 항목은 빈 목록.
+
+실행:
+    python report_schema.py output/reports/20260302_AM_분석보고서.json   # 사이드카 검증
+"""
+
+import json
+import os
+import re
+import sys
+
+SCHEMA_VERSION = 1
+SECTION_KEYS = ("kr", "us", "crypto", "insight")
+
+# 항목별 필드와 허용 타입 (None 은 null 허용)
+ITEM_FIELDS = {
+    "indices": {"name": (str,), "value": (str, None), "change_pct": (float, None), "note": (str, None)},
+    "policies": {"title": (str,), "detail": (str, None)},
+    "tickers": {"name": (str,), "change_pct": (float, None), "reason": (str, None)},
+}
+TEXT_LISTS = ("flows", "comments")
+
+# 프롬프트에 넣는 예시 (형식 안내용)
+EXAMPLE = {
+    "timeframe": "AM",
+    "date": "2026-03-02",
+    "sections": [
+        {
+            "key": "kr",
+            "indices": [{"name": "코스피(KOSPI)", "value": "2,650.12", "change_pct": -1.2,
+                         "note": "외국인 매도에 하락 마감"}],
+            "flows": ["외국인 3,200억 순매도, 기관 순매수"],
+            "policies": [{"title": "밸류업 후속 조치", "detail": "세제 지원안 발표"}],
+            "tickers": [{"name": "삼성전자", "change_pct": 3.1, "reason": "HBM 공급 기대"}],
+            "comments": [],
+        },
+        {"key": "us", "indices": [], "flows": [], "policies": [], "tickers": [], "comments": []},
+        {"key": "crypto", "indices": [], "flows": [], "policies": [], "tickers": [],
+         "comments": ["위험자산 선호 회복으로 비트코인 반등"]},
+        {"key": "insight", "indices": [], "flows": [], "policies": [], "tickers": [],
+         "comments": ["실적이 확인되는 반도체 중심 분할 매수"]},
+    ],
+}
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+_NUMBER = re.compile(r"[-+]?\d+(?:\.\d+)?")
+
+
+class ReportSchemaError(ValueError):
+    """모델 출력이 JSON 이 아니거나 형식 검증에 실패"""
+
+    def __init__(self, errors):
+        self.errors = errors if isinstance(errors, list) else [errors]
+        super().__init__("; ".join(self.errors[:5]))
+
+
+def sidecar_path(report_path: str) -> str:
+    """output/reports/20260302_AM_분석보고서.md → ...분석보고서.json"""
+    return os.path.splitext(report_path)[0] + ".json"
+
+
+def _percent(value):
+    """"+1.2%", "−0.5" 같은 문자열도 숫자로. "N/A", "보합" 처럼 숫자가 없는 문자열은 null (문서 전체를 버리지 않음)"""
+    if isinstance(value, str):
+        match = _NUMBER.search(value.replace("−", "-").replace(",", ""))
+        return float(match.group(0)) if match else None
+    if isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    return value
+
+
+def normalize(doc: dict) -> dict:
+    """모델 출력의 사소한 차이 보정: 빠진 목록은 빈 목록, change_pct 문자열은 숫자"""
+    for section in doc.get("sections") or []:
+        if not isinstance(section, dict):
+            continue
+        if isinstance(section.get("key"), str):
+            section["key"] = section["key"].strip().lower()
+        for field in list(ITEM_FIELDS) + list(TEXT_LISTS):
+            if section.get(field) is None:
+                section[field] = []
+        for field in ("indices", "tickers"):
+            for item in section[field]:
+                if isinstance(item, dict):
+                    item["change_pct"] = _percent(item.get("change_pct"))
+    return doc
+
+
+def _check_type(value, allowed) -> bool:
+    if value is None:
+        return None in allowed
+    return any(t is not None and isinstance(value, t) and not isinstance(value, bool) for t in allowed)
+
+
+def validate(doc) -> list:
+    """오류 메시지 목록 (빈 목록이면 통과)"""
+    if not isinstance(doc, dict):
+        return ["document is not an object"]
+    errors = []
+    if doc.get("timeframe") not in ("AM", "PM"):
+        errors.append(f"timeframe: expected AM/PM, got {doc.get('timeframe')!r}")
+    if not isinstance(doc.get("date"), str) or not re.fullmatch(r"\d{4}-\d{2}-\d{2}", doc["date"]):
+        errors.append(f"date: expected YYYY-MM-DD, got {doc.get('date')!r}")
+    sections = doc.get("sections")
+    if not isinstance(sections, list) or not sections:
+        return errors + ["sections: expected a non-empty list"]
+
+    seen = set()
+    for i, section in enumerate(sections):
+        where = f"sections[{i}]"
+        if not isinstance(section, dict):
+            errors.append(f"{where}: not an object")
+            continue
+        key = section.get("key")
+        if key not in SECTION_KEYS:
+            errors.append(f"{where}.key: unknown section {key!r}")
+        elif key in seen:
+            errors.append(f"{where}.key: duplicate section {key!r}")
+        seen.add(key)
+        for field, spec in ITEM_FIELDS.items():
+            items = section.get(field)
+            if not isinstance(items, list):
+                errors.append(f"{where}.{field}: expected a list")
+                continue
+            for j, item in enumerate(items):
+                if not isinstance(item, dict):
+                    errors.append(f"{where}.{field}[{j}]: not an object")
+                    continue
+                for name, allowed in spec.items():
+                    if not _check_type(item.get(name), allowed):
+                        errors.append(f"{where}.{field}[{j}].{name}: bad value {item.get(name)!r}")
+        for field in TEXT_LISTS:
+            items = section.get(field)
+            if not isinstance(items, list) or not all(isinstance(t, str) for t in items):
+                errors.append(f"{where}.{field}: expected a list of strings")
+    if not any(sum(len(s.get(f) or []) for f in list(ITEM_FIELDS) + list(TEXT_LISTS))
+               for s in sections if isinstance(s, dict)):
+        errors.append("sections: every section is empty")
+    return errors
+
+
+def parse(text: str, timeframe: str | None = None, date: str | None = None) -> dict:
+    """
+    모델 응답 텍스트 → 검증된 문서. 코드 블록(```json)이나 앞뒤 설명이 붙어 있어도 처리.
+    timeframe/date 를 주면 응답 값 대신 사용. 실패하면 ReportSchemaError
+    """
+    body = _FENCE.sub("", (text or "").strip())
+    start, end = body.find("{"), body.rfind("}")
+    if start == -1 or end <= start:
+        raise ReportSchemaError("response does not contain a JSON object")
+    try:
+        doc = json.loads(body[start:end + 1])
+    except ValueError as e:
+        raise ReportSchemaError(f"invalid JSON: {e}")
+    if not isinstance(doc, dict):
+        raise ReportSchemaError("document is not an object")
+    if timeframe:
+        doc["timeframe"] = timeframe
+    if date:
+        doc["date"] = date
+    doc = normalize(doc)
+    errors = validate(doc)
+    if errors:
+        raise ReportSchemaError(errors)
+    # 섹션 순서는 항상 국내 → 미국 → 코인 → 인사이트
+    doc["sections"].sort(key=lambda s: SECTION_KEYS.index(s["key"]))
+    return doc
+
+
+def save(doc: dict, report_path: str) -> str:
+    path = sidecar_path(report_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(dict(doc, schema_version=SCHEMA_VERSION), f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load(report_path: str) -> dict | None:
+    """보고서의 사이드카 문서 (없거나 형식이 다르면 None)"""
+    try:
+        with open(sidecar_path(report_path), "r", encoding="utf-8") as f:
+            doc = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(doc, dict) or doc.get("schema_version") != SCHEMA_VERSION or validate(doc):
+        return None
+    return doc
+
+
+def remove(report_path: str):
+    """Markdown 프롬프트로 다시 만든 보고서 옆에 이전 사이드카가 남지 않도록 삭제"""
+    try:
+        os.remove(sidecar_path(report_path))
+    except OSError:
+        pass
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    if len(sys.argv) < 2:
+        print("사용법: python report_schema.py <보고서.json> [...]")
+        sys.exit(1)
+    ok = True
+    for path in sys.argv[1:]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                errors = validate(normalize(json.load(f)))
+        except (OSError, ValueError) as e:
+            errors = [str(e)]
+        ok &= not errors
+        print(f"{path}: {'OK' if not errors else 'INVALID'}")
+        for error in errors:
+            print(f"  - {error}")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+스트리밍 보고서 섹션 분리
+
+Gemini 스트리밍 응답 조각을 받아 `━━━` 구분선 단위로 완성된 섹션을 바로 내보냅니다.
+구분선이 나오면 그 앞까지가 한 섹션으로 확정되고, 구분선은 다음 섹션의 머리에 붙습니다
+(telegram_format._section_blocks 와 같은 규칙).
+"""
+
+SECTION_RULE = "━━━"
+
+
+class SectionStream:
+    """feed() 로 텍스트 조각을 넣으면 완성된 섹션 목록을 반환. 마지막 섹션은 close() 로 받는다"""
+
+    def __init__(self):
+        self._section = ""   # 진행 중인 섹션 (완성된 줄만)
+        self._line = ""      # 아직 줄바꿈이 오지 않은 줄
+
+    def feed(self, text: str) -> list:
+        done = []
+        lines = (self._line + text).split("\n")
+        self._line = lines.pop()
+        for line in lines:
+            if line.strip().startswith(SECTION_RULE) and self._section.strip():
+                done.append(self._section)
+                self._section = ""
+            self._section += line + "\n"
+        return done
+
+    def close(self) -> list:
+        done = self.feed("\n") if self._line else []
+        if self._section.strip():
+            done.append(self._section.rstrip("\n"))
+        self._section = ""
+        return done
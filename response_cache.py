@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gemini 응답 캐시 (내용 주소 기반, data/gemini_cache/<키>.txt.gz)
+
+키 = sha256(모델, 프롬프트 버전, 자막 다이제스트, 날짜, 구분 AM/PM).
+같은 자막으로 다시 실행하면(--restart 재실행, Agent W 실패 후 재시도 등) 모델을 호출하지 않고
+저장된 보고서를 바로 반환합니다.
+- 적중 시 파일 mtime 을 갱신하고, 전체 크기가 한도를 넘으면 오래 안 쓴 항목부터 삭제 (LRU)
+- 우회: 환경 변수 GEMINI_CACHE=off (main.py --no-cache)
+- 적중/실패 횟수는 logs/cache_stats.json 의 "gemini" 항목에 기록
+
+config.json / 환경 변수:
+    GEMINI_CACHE           off 이면 캐시 사용 안 함 (기본 on)
+    GEMINI_CACHE_MAX_MB    캐시 최대 크기 MB (기본 20)
+
+실행:
+    python response_cache.py            # 항목 수, 크기, 적중률 출력
+    python response_cache.py --clear    # 전체 삭제
+"""
+
+import gzip
+import hashlib
+import os
+import sys
+import threading
+from datetime import datetime
+
+import cache_stats
+from app_config import get_int, load_config
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "gemini_cache")
+DEFAULT_MAX_MB = 20
+
+
+def log(message):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] [GeminiCache] {message}")
+
+
+def enabled() -> bool:
+    load_config()
+    return os.getenv("GEMINI_CACHE", "on").strip().lower() not in ("off", "0", "false", "no")
+
+
+def digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def make_key(model: str, prompt_version, transcript: str, date_str: str, variant: str = "") -> str:
+    parts = [model, str(prompt_version), digest(transcript), date_str, variant]
+    return digest("\x1f".join(parts))
+
+
+def _path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.txt.gz")
+
+
+def _read(key: str) -> str | None:
+    path = _path(key)
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            text = f.read()
+        os.utime(path)  # LRU: 최근 사용 표시
+    except (OSError, EOFError):
+        return None
+    return text
+
+
+def get(key: str) -> str | None:
+    return get_any([key])[1]
+
+
+def get_any(keys: list, accept=None) -> tuple:
+    """
+    keys 를 차례로 찾아 처음 적중한 (키, 텍스트). 없으면 (None, None).
+    accept(키, 텍스트) 가 False 인 항목(검증 실패 등)은 건너뜀.
+    여러 키를 봐도 통계는 조회 한 번으로 기록 (적중률 왜곡 방지)
+    """
+    if not enabled():
+        cache_stats.record("gemini", "bypass")
+        return None, None
+    for key in keys:
+        text = _read(key)
+        if text is not None and (accept is None or accept(key, text)):
+            cache_stats.record("gemini", "hit")
+            return key, text
+    cache_stats.record("gemini", "miss")
+    return None, None
+
+
+def put(key: str, text: str):
+    if not enabled() or not text:
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _path(key)
+    # 다중 실행에서 같은 파일을 동시에 쓸 수 있어 쓰는 쪽마다 다른 임시 파일
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        log(f"Cache write failed: {e}")
+        return
+    evict()
+
+
+def _entries() -> list:
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith(".txt.gz"):
+            path = os.path.join(CACHE_DIR, name)
+            try:
+                st = os.stat(path)
+                entries.append((st.st_mtime, st.st_size, path))
+            except OSError:
+                pass
+    return entries
+
+
+def evict(max_bytes: int | None = None) -> int:
+    """전체 크기가 max_bytes 이하가 될 때까지 오래 안 쓴 항목부터 삭제. 삭제한 개수 반환"""
+    if max_bytes is None:
+        load_config()
+        max_bytes = get_int("GEMINI_CACHE_MAX_MB", DEFAULT_MAX_MB) * 1024 * 1024
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    if removed:
+        cache_stats.record("gemini", "evicted", removed)
+    return removed
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    if len(sys.argv) > 1 and sys.argv[1] == "--clear":
+        print(f"Removed {evict(max_bytes=0)} entr(ies).")
+        sys.exit(0)
+    entries = _entries()
+    size_kb = sum(size for _, size, _ in entries) / 1024
+    print(f"Entries: {len(entries)} | Size: {size_kb:.1f} KB | Enabled: {enabled()}")
+    print(f"Hit rate: {cache_stats.hit_rate('gemini'):.1%} | {cache_stats.get('gemini')}")
@@ -1,38 +1,328 @@
-import time
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BWS_Invest 로컬 스케줄러
+
+- cron 형식 스케줄 (분 시 일 월 요일)
+- 다음 실행 시각까지 계산해서 대기 (30초 폴링 없음)
+- data/scheduler_state.json 에 마지막 실행 시각을 기록, 절전/종료로 놓친 실행은
+  CATCHUP_WINDOW 이내라면 재시작 시 한 번 따라잡아 실행 (해당 날짜로 --date 전달)
+- 작업은 워커 풀에서 실행되며, 같은 작업이 겹쳐 실행되지 않도록 작업별 잠금
+- PREFETCH_JOBS: 파이프라인 실행 전 5분 간격으로 당일 영상 자막을 미리 받아 둠 (transcript_cache.py)
+- --daemon: main.py 를 매번 새 프로세스로 띄우지 않고 한 번 import 해 둔 파이프라인을
+  직접 호출 (실행마다 타임아웃/예외 격리)
+
+실행:
+    python scheduler.py           # 스케줄러 시작
+    python scheduler.py --daemon  # 상주 모드 (파이프라인 in-process 실행)
+    python scheduler.py --next    # 다음 실행 예정 시각만 출력
+"""
+
+import json
+import os
 import subprocess
-from datetime import datetime
+import sys
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
 # --- Configuration ---
-AM_TIME = "09:20"
-PM_TIME = "18:20"
+JOBS = {
+    "AM": "20 9 * * *",
+    "PM": "20 18 * * *",
+}
+# 자막 선행 수집 (실행 시각 20분 전부터 5분 간격)
+PREFETCH_JOBS = {
+    "AM": "0-15/5 9 * * *",
+    "PM": "0-15/5 18 * * *",
+}
+PREFETCH_PREFIX = "prefetch-"
+PREFETCH_TIMEOUT = 300
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = os.path.join(BASE_DIR, "data", "scheduler_state.json")
+CATCHUP_WINDOW = timedelta(hours=6)   # 이보다 오래 전에 놓친 실행은 건너뜀
+MAX_WORKERS = 2
+# 데몬 모드에서 한 번의 파이프라인 실행에 허용하는 최대 시간
+PIPELINE_TIMEOUT = timedelta(minutes=40)
+# 절전에서 깨어난 뒤 벽시계 시각을 다시 확인하기 위한 최대 대기 (초)
+MAX_SLEEP_SECONDS = 900
+
 
 def log(message):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     print(f"[{timestamp}] {message}")
 
-def run_main(mode):
+
+class CronSchedule:
+    """5필드 cron 표현식 (*, a-b, */n, a-b/n, a,b 지원). 요일은 0/7=일요일."""
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 표현식은 5개 필드가 필요합니다: {expr!r}")
+        self.expr = expr
+        parsed = [self._parse(f, lo, hi) for f, (lo, hi) in zip(fields, self.RANGES)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        self.weekdays = {d % 7 for d in weekdays}
+        self.day_restricted = fields[2] != "*"
+        self.weekday_restricted = fields[4] != "*"
+
+    @staticmethod
+    def _parse(field: str, lo: int, hi: int) -> set:
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_str = part.split("/", 1)
+                step = int(step_str)
+            if part == "*":
+                start, end = lo, hi
+            elif "-" in part:
+                start, end = (int(x) for x in part.split("-", 1))
+            else:
+                start = int(part)
+                end = hi if step > 1 else start
+            if start < lo or end > hi or start > end or step < 1:
+                raise ValueError(f"cron 필드 범위 오류: {field!r}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+        # cron 규칙: 일/요일이 둘 다 제한되면 OR, 아니면 제한된 쪽만 본다
+        if self.day_restricted and self.weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """after 보다 늦은 첫 실행 시각"""
+        dt = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 4)
+        while dt < limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+            elif dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                return dt
+        raise ValueError(f"실행 시각을 찾을 수 없습니다: {self.expr!r}")
+
+
+def run_main(mode, fire_time=None):
     log(f"Running main pipeline with mode: {mode}")
+    cmd = [sys.executable, "main.py", mode]
+    if fire_time and fire_time.date() != datetime.now().date():
+        cmd += ["--date", fire_time.strftime("%Y%m%d")]
     try:
         # Run main.py with the specified mode
-        subprocess.run(["python", "main.py", mode], check=True)
+        subprocess.run(cmd, check=True, cwd=BASE_DIR)
     except Exception as e:
         log(f"Error running pipeline: {e}")
 
-def start_scheduler():
-    log("BWS_Invest Scheduler started.")
-    log(f"Scheduled times - AM: {AM_TIME}, PM: {PM_TIME}")
-    
-    while True:
-        now = datetime.now().strftime("%H:%M")
-        
-        if now == AM_TIME:
-            run_main("AM")
-            time.sleep(60) # Prevent multiple runs within the same minute
-        elif now == PM_TIME:
-            run_main("PM")
-            time.sleep(60)
-            
-        time.sleep(30) # Check every 30 seconds
+
+def run_prefetch(mode, fire_time=None):
+    if fire_time and datetime.now() - fire_time > timedelta(minutes=30):
+        log(f"[{PREFETCH_PREFIX}{mode}] 지난 선행 수집은 건너뜁니다.")
+        return
+    cmd = [sys.executable, "transcript_cache.py", "--prefetch", mode]
+    try:
+        subprocess.run(cmd, cwd=BASE_DIR, timeout=PREFETCH_TIMEOUT)
+    except Exception as e:
+        log(f"Error running transcript prefetch: {e}")
+
+
+def all_jobs() -> dict:
+    return {**JOBS, **{f"{PREFETCH_PREFIX}{mode}": expr for mode, expr in PREFETCH_JOBS.items()}}
+
+
+class JobRouter:
+    """작업 이름으로 파이프라인 실행기 / 자막 선행 수집기를 골라 호출"""
+
+    def __init__(self, pipeline_runner=run_main, prefetch_runner=run_prefetch):
+        self.pipeline_runner = pipeline_runner
+        self.prefetch_runner = prefetch_runner
+
+    def __call__(self, name, fire_time=None):
+        if name.startswith(PREFETCH_PREFIX):
+            self.prefetch_runner(name[len(PREFETCH_PREFIX):], fire_time)
+        else:
+            self.pipeline_runner(name, fire_time)
+
+
+class InProcessRunner:
+    """
+    데몬 모드 실행기: 파이프라인을 한 번만 import 하고 main.run_pipeline 을 직접 호출합니다.
+    실행은 별도 스레드에서 하며, 예외(SystemExit 포함)는 여기서 막고 타임아웃을 넘기면 기다리지 않습니다.
+    타임아웃된 실행이 끝나기 전에는 같은 작업을 다시 시작하지 않습니다.
+    """
+
+    def __init__(self, timeout: timedelta = PIPELINE_TIMEOUT):
+        # 파이프라인 모듈은 상대 경로(output/, data/)를 쓰므로 프로젝트 폴더 기준으로 실행
+        os.chdir(BASE_DIR)
+        sys.path.insert(0, BASE_DIR)
+        log("Loading pipeline modules (one-time)...")
+        import main
+        import gemini_client
+        import transcript_cache
+
+        self.main = main
+        self.transcript_cache = transcript_cache
+        self.timeout = timeout.total_seconds()
+        self._threads = {}
+        try:
+            gemini_client.get_model()
+        except Exception as e:
+            log(f"Gemini client warm-up failed: {e}")
+
+    def _target(self, mode, target_date):
+        try:
+            self.main.run_pipeline(mode, target_date=target_date)
+        except BaseException as e:
+            log(f"[{mode}] 파이프라인 예외: {e!r}")
+            log(traceback.format_exc())
+
+    def prefetch(self, mode, fire_time=None):
+        if fire_time and datetime.now() - fire_time > timedelta(minutes=30):
+            log(f"[{PREFETCH_PREFIX}{mode}] 지난 선행 수집은 건너뜁니다.")
+            return
+        try:
+            self.transcript_cache.prefetch(mode)
+        except Exception as e:
+            log(f"[{PREFETCH_PREFIX}{mode}] 선행 수집 예외: {e!r}")
+
+    def __call__(self, mode, fire_time=None):
+        previous = self._threads.get(mode)
+        if previous and previous.is_alive():
+            log(f"[{mode}] 타임아웃된 이전 실행이 아직 끝나지 않아 건너뜁니다.")
+            return
+        target_date = fire_time if fire_time and fire_time.date() != datetime.now().date() else None
+
+        log(f"Running pipeline in-process with mode: {mode}")
+        thread = threading.Thread(target=self._target, args=(mode, target_date),
+                                  name=f"pipeline-{mode}", daemon=True)
+        self._threads[mode] = thread
+        thread.start()
+        thread.join(self.timeout)
+        if thread.is_alive():
+            log(f"[{mode}] 파이프라인이 {self.timeout / 60:.0f}분 안에 끝나지 않았습니다. 완료될 때까지 같은 작업은 건너뜁니다.")
+
+
+class Scheduler:
+    def __init__(self, jobs: dict, state_file: str = STATE_FILE, max_workers: int = MAX_WORKERS, runner=run_main):
+        self.schedules = {name: CronSchedule(expr) for name, expr in jobs.items()}
+        self.state_file = state_file
+        self.runner = runner
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.locks = {name: threading.Lock() for name in jobs}
+        self.stop_event = threading.Event()
+        self._state_lock = threading.Lock()
+        self.started = datetime.now()
+        self.state = self._load_state()
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+            return {name: datetime.fromisoformat(ts) for name, ts in raw.get("last_fire", {}).items()}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        data = {"last_fire": {name: ts.isoformat() for name, ts in self.state.items()}}
+        tmp_path = self.state_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    def next_fire(self, name: str) -> datetime:
+        # 기록이 없으면 기동 시각부터 (첫 기동 시 과거 실행을 만들어내지 않도록)
+        return self.schedules[name].next_after(self.state.get(name, self.started))
+
+    def _latest_due(self, name: str, now: datetime):
+        """now 시점까지 도래한 가장 최근 실행 시각 (여러 번 놓쳤으면 마지막 한 번으로 합침)"""
+        schedule = self.schedules[name]
+        fire = self.next_fire(name)
+        if fire > now:
+            return None
+        following = schedule.next_after(fire)
+        while following <= now:
+            fire, following = following, schedule.next_after(following)
+        return fire
+
+    def _run_job(self, name: str, fire_time: datetime):
+        try:
+            self.runner(name, fire_time)
+        except Exception as e:
+            log(f"[{name}] 작업 실행 중 예외: {e}")
+        finally:
+            self.locks[name].release()
+            log(f"[{name}] 작업 종료 (예정 {fire_time.strftime('%Y-%m-%d %H:%M')})")
+
+    def dispatch_due(self, now: datetime):
+        for name in self.schedules:
+            fire = self._latest_due(name, now)
+            if fire is None:
+                continue
+            with self._state_lock:
+                self.state[name] = fire
+                self._save_state()
+
+            if now - fire > CATCHUP_WINDOW:
+                log(f"[{name}] {fire.strftime('%Y-%m-%d %H:%M')} 실행을 놓쳤지만 따라잡기 범위를 넘어 건너뜁니다.")
+                continue
+            if not self.locks[name].acquire(blocking=False):
+                log(f"[{name}] 이전 실행이 아직 진행 중이라 이번 실행은 건너뜁니다.")
+                continue
+            if now - fire >= timedelta(minutes=1):
+                log(f"[{name}] 놓친 실행 따라잡기: {fire.strftime('%Y-%m-%d %H:%M')}")
+            self.executor.submit(self._run_job, name, fire)
+
+    def run_forever(self):
+        log("BWS_Invest Scheduler started.")
+        for name, schedule in self.schedules.items():
+            log(f"Scheduled job {name}: '{schedule.expr}' (next: {self.next_fire(name).strftime('%Y-%m-%d %H:%M')})")
+
+        try:
+            while not self.stop_event.is_set():
+                now = datetime.now()
+                self.dispatch_due(now)
+                wake = min(self.next_fire(name) for name in self.schedules)
+                delay = min(max((wake - datetime.now()).total_seconds(), 0), MAX_SLEEP_SECONDS)
+                self.stop_event.wait(delay)
+        except KeyboardInterrupt:
+            log("Scheduler stopping...")
+        finally:
+            self.executor.shutdown(wait=True)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def start_scheduler(daemon: bool = False):
+    if daemon:
+        pipeline = InProcessRunner()
+        runner = JobRouter(pipeline, pipeline.prefetch)
+    else:
+        runner = JobRouter()
+    Scheduler(all_jobs(), runner=runner).run_forever()
+
 
 if __name__ == "__main__":
-    start_scheduler()
+    if "--next" in sys.argv:
+        jobs = all_jobs()
+        scheduler = Scheduler(jobs)
+        for job in jobs:
+            print(f"{job}: {scheduler.next_fire(job).strftime('%Y-%m-%d %H:%M')}")
+        scheduler.executor.shutdown()
+    else:
+        start_scheduler(daemon="--daemon" in sys.argv)
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NotebookLM 화면 자동화 셀렉터 레지스트리
+
+동작(action)별 셀렉터 후보(strategy)를 한곳에 두고, 지난번에 성공한 후보부터 시도합니다.
+- 1순위 후보가 이미 DOM 에 있으면 그것을 사용 (locator count 한 번)
+- 없으면 남은 후보 전체를 합친 locator(or_) 하나로 대기 → 브라우저가 모든 후보를 동시에 확인하므로
+  후보마다 timeout 을 기다리지 않음. 나타난 것 중 시도 순서(ordered)가 빠른 후보를 사용
+- 화면에 보이는지는 확인하지 않고 DOM 에 붙어 있는지(attached)만 봄: 마우스를 올려야 보이는
+  소스 메뉴 버튼처럼 숨은 요소도 호출하는 쪽이 JS 클릭 / force 클릭으로 누르기 때문
+- 성공/실패 횟수와 마지막 성공 후보는 data/selector_stats.json 에 저장 (다음 실행의 순서)
+- 저장해 둔 화면 HTML(notebooklm_debug.html 등)로 후보별 존재 여부를 갱신: 같은 화면 상태에서
+  다른 후보는 있는데 없는 후보는 뒤로 (find_selectors.py, inspect_dialog.py)
+
+Playwright 는 호출하는 쪽(upload_source 등)이 가져오고, 이 모듈은 표준 라이브러리만 사용합니다.
+
+실행:
+    python selector_registry.py                              # 동작별 후보 순서와 통계
+    python selector_registry.py refresh notebooklm_debug.html
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+from html.parser import HTMLParser
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATS_PATH = os.path.join(BASE_DIR, "data", "selector_stats.json")
+DEFAULT_TIMEOUT_MS = 5000
+
+# 동작 → [(후보 이름, Playwright 셀렉터)] (선언 순서 = 통계가 없을 때의 순서)
+ACTIONS = {
+    "open_add_source": [
+        ("aria_label", 'button[aria-label="업로드 소스 대화상자 열기"]'),
+        ("upload_icon", "button.upload-icon-button"),
+        ("text_add", 'text="소스 추가"'),
+        ("text_upload", 'text="소스 업로드"'),
+        ("text_start", 'text="시작하려면 소스 추가"'),
+    ],
+    "file_chooser": [
+        ("scotty_trigger", "button[xapscottyuploadertrigger]"),
+        ("upload_button_class", 'button[class*="upload-bu"]'),
+        ("text_file_upload", 'text="파일 업로드"'),
+    ],
+    # 소스 행(.single-source-container) 안에서 찾음
+    "source_menu": [
+        ("more_button", "button.source-item-more-button"),
+        ("more_icon", ".source-item-more-menu-icon"),
+    ],
+    "delete_source": [
+        ("menu_item_ko", "[role='menuitem']:has-text('삭제')"),
+        ("text_ko", "text='소스 삭제'"),
+        ("menu_item_en", "[role='menuitem']:has-text('Remove')"),
+        ("menu_item_en_delete", "[role='menuitem']:has-text('Delete')"),
+    ],
+    "confirm_delete": [
+        ("dialog_button_ko", "mat-dialog-container button:has-text('삭제')"),
+        ("dialog_button_en", "mat-dialog-container button:has-text('Delete')"),
+    ],
+    "notebook_guide": [
+        ("text_ko", "text='노트북 가이드'"),
+        ("text_en", "text='Notebook Guide'"),
+        ("aria_en", "[aria-label='Notebook Guide']"),
+    ],
+    "video_overview": [
+        ("text_ko", "text='동영상 개요'"),
+        ("text_en", "text='Video Overview'"),
+        ("studio_card", ".studio-card:has-text('동영상 개요')"),
+        ("mat_card", "mat-card:has-text('동영상 개요')"),
+    ],
+    "studio_tab": [
+        ("text_ko", "text='스튜디오'"),
+        ("text_en", "text='Studio'"),
+    ],
+    "audio_download": [
+        ("button_ko", "button:has-text('다운로드')"),
+        ("button_en", "button:has-text('Download')"),
+        ("aria_en", "[aria-label='Download']"),
+        ("aria_ko", "[aria-label='다운로드']"),
+    ],
+    "close_dialog": [
+        ("aria_en", "[aria-label='Close']"),
+        ("aria_ko", "[aria-label='닫기']"),
+        ("text_ko", "text='닫기'"),
+        ("button_ko", "button:has-text('닫기')"),
+    ],
+}
+
+_lock = threading.Lock()
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _load() -> dict:
+    try:
+        with open(STATS_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(data: dict):
+    os.makedirs(os.path.dirname(STATS_PATH), exist_ok=True)
+    tmp_path = f"{STATS_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, STATS_PATH)
+
+
+def ordered(action: str, stats: dict | None = None) -> list:
+    """
+    시도 순서: 마지막 성공 후보(이후 저장 HTML 에서 사라지지 않았다면) → 저장 HTML 에 있는 후보 → 성공 많은 순 → 선언 순
+    """
+    stats = (_load() if stats is None else stats).get(action, {})
+    winner = stats.get("_winner")
+    strategies = stats.get("strategies", {})
+
+    def key(item):
+        index, (name, _) = item
+        info = strategies.get(name, {})
+        absent = info.get("in_snapshot") is False
+        stale = absent and info.get("snapshot_at", "") > info.get("last_win", "")
+        return (not (name == winner and not stale), absent, -info.get("wins", 0), index)
+
+    return [strategy for _, strategy in sorted(enumerate(ACTIONS[action]), key=key)]
+
+
+def record(action: str, name: str, won: bool):
+    with _lock:
+        data = _load()
+        entry = data.setdefault(action, {})
+        info = entry.setdefault("strategies", {}).setdefault(name, {})
+        if won:
+            info["wins"] = info.get("wins", 0) + 1
+            info["last_win"] = _now()
+            entry["_winner"] = name
+        else:
+            info["misses"] = info.get("misses", 0) + 1
+            if entry.get("_winner") == name:
+                entry.pop("_winner")
+        _save(data)
+
+
+def find(page, action: str, timeout_ms: int = DEFAULT_TIMEOUT_MS, exclude=()):
+    """
+    (후보 이름, locator) 또는 None. 후보는 DOM 에 붙어 있으면(보이지 않아도) 사용.
+    1순위 후보를 바로 확인하고, 없으면 나머지를 합친 locator 로 한 번만 대기한 뒤 ordered 순서로 고름
+    """
+    candidates = [(name, selector) for name, selector in ordered(action) if name not in exclude]
+    if not candidates:
+        return None
+    name, selector = candidates[0]
+    locator = page.locator(selector)
+    if locator.count() > 0:
+        return name, locator.first
+    if timeout_ms:
+        union = page.locator(candidates[0][1])
+        for _, other in candidates[1:]:
+            union = union.or_(page.locator(other))
+        try:
+            union.first.wait_for(state="attached", timeout=timeout_ms)
+        except Exception:
+            return None
+    for name, selector in candidates:
+        locator = page.locator(selector)
+        if locator.count() > 0:
+            return name, locator.first
+    return None
+
+
+def attempt(page, action: str, perform, timeout_ms: int = DEFAULT_TIMEOUT_MS):
+    """
+    후보를 찾아 perform(locator) 실행. 예외나 False 면 그 후보를 실패로 기록하고 다음 후보로.
+    성공한 후보 이름 (모두 실패하면 None)
+    """
+    tried = set()
+    while True:
+        found = find(page, action, timeout_ms, exclude=tried)
+        if found is None:
+            return None
+        name, locator = found
+        tried.add(name)
+        try:
+            if perform(locator) is not False:
+                record(action, name, True)
+                return name
+            print(f"  [{action}] '{name}' 후보 실패")
+        except Exception as e:
+            print(f"  [{action}] '{name}' 후보 실패: {e}")
+        record(action, name, False)
+
+
+# --- 저장한 HTML 로 후보 확인 (브라우저 없이) ---
+
+class _Snapshot(HTMLParser):
+    """요소별 (태그, 속성, 하위 텍스트)"""
+
+    VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.elements = []
+        self._open = []
+
+    def handle_starttag(self, tag, attrs):
+        element = {"tag": tag, "attrs": {k: v or "" for k, v in attrs}, "text": []}
+        self.elements.append(element)
+        if tag not in self.VOID:
+            self._open.append(element)
+
+    def handle_endtag(self, tag):
+        for i in range(len(self._open) - 1, -1, -1):
+            if self._open[i]["tag"] == tag:
+                del self._open[i:]
+                break
+
+    def handle_data(self, data):
+        if data.strip() and self._open and self._open[-1]["tag"] not in ("script", "style"):
+            for element in self._open:
+                element["text"].append(data.strip())
+
+
+_TEXT = re.compile(r"""^text=(["'])(.*)\1$""")
+_CSS = re.compile(r"""^([a-zA-Z][\w-]*)?((?:\.[\w-]+|\[[\w-]+(?:[*^]?=(["'])[^"']*\3)?\])*)"""
+                  r"""(?::has-text\((["'])(.*)\4\))?$""")
+_PART = re.compile(r"""\.([\w-]+)|\[([\w-]+)(?:([*^]?=)(["'])([^"']*)\4)?\]""")
+
+
+def _matches(element, tag, parts, has_text) -> bool:
+    if tag and element["tag"] != tag.lower():
+        return False
+    attrs = element["attrs"]
+    for class_name, attr, op, _, value in parts:
+        if class_name:
+            if class_name not in attrs.get("class", "").split():
+                return False
+        elif attr not in attrs:
+            return False
+        elif op == "=" and attrs[attr] != value:
+            return False
+        elif op == "*=" and value not in attrs[attr]:
+            return False
+        elif op == "^=" and not attrs[attr].startswith(value):
+            return False
+    return has_text is None or has_text in " ".join(element["text"])
+
+
+def snapshot_match(elements, selector: str):
+    """저장 HTML 에 selector 에 맞는 요소가 있는지. 지원하지 않는 셀렉터 형식이면 None"""
+    text = _TEXT.match(selector)
+    if text:
+        # 정확히 일치하는 텍스트를 가진 가장 안쪽 요소
+        return any(" ".join(e["text"]) == text.group(2) for e in elements)
+    css = _CSS.match(selector)
+    if not css or not (css.group(1) or css.group(2)):
+        return None
+    parts = _PART.findall(css.group(2) or "")
+    return any(_matches(e, css.group(1), parts, css.group(5)) for e in elements)
+
+
+def refresh_from_html(html_path: str) -> dict:
+    """
+    저장 HTML 에서 동작별 후보 존재 여부 갱신 → {동작: {후보: True/False/None}}.
+    그 화면에 다른 후보가 하나도 없으면(다른 화면 상태) 그 동작은 기록하지 않음
+    """
+    parser = _Snapshot()
+    with open(html_path, "r", encoding="utf-8", errors="replace") as f:
+        parser.feed(f.read())
+    results = {action: {name: snapshot_match(parser.elements, selector) for name, selector in strategies}
+               for action, strategies in ACTIONS.items()}
+    now = _now()
+    with _lock:
+        data = _load()
+        for action, found in results.items():
+            if not any(found.values()):
+                continue
+            strategies = data.setdefault(action, {}).setdefault("strategies", {})
+            for name, present in found.items():
+                if present is None:
+                    continue
+                info = strategies.setdefault(name, {})
+                info.update(in_snapshot=present, snapshot_at=now, snapshot=os.path.basename(html_path))
+        _save(data)
+    return results
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    if len(sys.argv) > 1 and sys.argv[1] == "refresh":
+        path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(BASE_DIR, "notebooklm_debug.html")
+        for action, found in refresh_from_html(path).items():
+            marks = ", ".join(f"{name}:{'O' if present else ('?' if present is None else 'X')}"
+                              for name, present in found.items())
+            print(f"{action:<16} {marks}")
+    elif len(sys.argv) == 1:
+        data = _load()
+        for action in ACTIONS:
+            strategies = data.get(action, {}).get("strategies", {})
+            print(f"{action} (마지막 성공: {data.get(action, {}).get('_winner', '-')})")
+            for name, selector in ordered(action, data):
+                info = strategies.get(name, {})
+                snapshot = {True: "O", False: "X"}.get(info.get("in_snapshot"), "-")
+                print(f"  {name:<20} wins {info.get('wins', 0):>3} misses {info.get('misses', 0):>3} "
+                      f"snapshot {snapshot} | {selector}")
+    else:
+        print("사용법: python selector_registry.py [refresh <저장한 HTML>]")
+        sys.exit(1)
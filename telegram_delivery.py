@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+텔레그램 동시 전송 엔진
+
+- 채팅방별로 병렬 전송 (공유 HTTP 세션으로 api.telegram.org 연결 재사용)
+- DeliveryQueue: 채팅방마다 전송 큐를 두어, 여러 조각으로 나뉜 메시지를 순서대로 파이프라인 전송
+- 토큰 버킷으로 텔레그램 한도 준수: 봇 전체 초당 30건, 개인 채팅 초당 1건, 그룹/채널 분당 20건
+- 429 응답의 retry_after 준수, 연결 실패/5xx 는 지터를 섞은 지수 백오프로 재시도
+  (응답 대기 중 시간 초과는 이미 전송됐을 수 있어 재시도하지 않고 실패로 기록)
+- 채팅방별 지연 시간과 결과를 logs/telegram_delivery.jsonl 에 기록
+"""
+
+import json
+import os
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import requests
+
+import http_session
+from app_config import load_config
+
+GLOBAL_RATE = 30.0            # 초당 메시지 (봇 전체)
+PRIVATE_CHAT_RATE = 1.0       # 초당 메시지 (개인 채팅)
+GROUP_CHAT_RATE = 20 / 60.0   # 초당 메시지 (그룹/채널, 분당 20건)
+MAX_ATTEMPTS = 4
+BACKOFF_BASE = 1.0            # 초, 재시도마다 2배
+REQUEST_TIMEOUT = 10
+DELIVERY_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "telegram_delivery.jsonl")
+
+
+def log(message):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] [Agent W] {message}")
+
+
+class TokenBucket:
+    """초당 rate 개씩 채워지는 토큰 버킷. acquire() 는 토큰이 생길 때까지 대기"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def block(self, seconds: float):
+        """retry_after 동안 이 버킷의 전송을 막는다"""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+@dataclass
+class DeliveryResult:
+    chat_id: str
+    ok: bool = False
+    status: int | None = None
+    attempts: int = 0
+    sent: int = 0
+    latency: float = 0.0
+    message_ids: list = field(default_factory=list)
+    error: str = ""
+
+
+_global_bucket = TokenBucket(GLOBAL_RATE, capacity=GLOBAL_RATE)
+_chat_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def _chat_bucket(chat_id: str) -> TokenBucket:
+    with _buckets_lock:
+        bucket = _chat_buckets.get(chat_id)
+        if bucket is None:
+            # 음수 ID는 그룹/채널
+            rate = GROUP_CHAT_RATE if str(chat_id).startswith("-") else PRIVATE_CHAT_RATE
+            bucket = _chat_buckets[chat_id] = TokenBucket(rate)
+        return bucket
+
+
+def _backoff(attempt: int) -> float:
+    return BACKOFF_BASE * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+
+
+def _record(result: DeliveryResult, label: str):
+    entry = {
+        "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "label": label,
+        "chat_id": result.chat_id,
+        "ok": result.ok,
+        "status": result.status,
+        "attempts": result.attempts,
+        "sent": result.sent,
+        "latency_ms": round(result.latency * 1000),
+        "message_ids": result.message_ids,
+        "error": result.error,
+    }
+    try:
+        os.makedirs(os.path.dirname(DELIVERY_LOG), exist_ok=True)
+        with open(DELIVERY_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError as e:
+        log(f"Delivery log write error: {e}")
+
+
+def send_message(chat_id: str, text: str, parse_mode: str = "HTML", result: DeliveryResult | None = None) -> DeliveryResult:
+    """한 채팅방에 메시지 1건 전송 (한도 대기 + 재시도 포함)"""
+    load_config()
+    token = os.getenv("TELEGRAM_BOT_TOKEN")
+    url = f"https://api.telegram.org/bot{token}/sendMessage"
+    payload = {"chat_id": chat_id, "text": text, "parse_mode": parse_mode}
+    result = result or DeliveryResult(chat_id=chat_id)
+    chat_bucket = _chat_bucket(chat_id)
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        result.attempts += 1
+        _global_bucket.acquire()
+        chat_bucket.acquire()
+        try:
+            response = http_session.post(url, json=payload, timeout=REQUEST_TIMEOUT)
+        except requests.exceptions.ConnectionError as e:
+            # 연결 실패(ConnectTimeout 포함): 요청이 전달되지 않았으므로 다시 보내도 중복이 아님
+            result.status, result.error = None, str(e)
+            if attempt < MAX_ATTEMPTS:
+                time.sleep(_backoff(attempt))
+            continue
+        except Exception as e:
+            # ReadTimeout 등: 텔레그램이 이미 받았을 수 있어 결과를 알 수 없음 → 중복 전송하지 않고 실패
+            result.status, result.error = None, f"unknown outcome, not retried: {e}"
+            log(f"Send outcome unknown (ID: {chat_id}): {e}")
+            break
+
+        result.status = response.status_code
+        if response.status_code == 200:
+            try:
+                result.message_ids.append(response.json()["result"]["message_id"])
+            except (ValueError, KeyError, TypeError):
+                pass
+            result.ok, result.error = True, ""
+            result.sent += 1
+            return result
+
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        result.error = body.get("description") or response.text[:200]
+
+        if response.status_code == 429:
+            retry_after = (body.get("parameters") or {}).get("retry_after", 1)
+            log(f"Rate limited (ID: {chat_id}), retry after {retry_after}s")
+            chat_bucket.block(retry_after)
+            continue
+        if response.status_code >= 500:
+            if attempt < MAX_ATTEMPTS:
+                time.sleep(_backoff(attempt))
+            continue
+        # 400/403 등은 재시도해도 결과가 같다 (잘못된 HTML, 봇 차단 등)
+        break
+
+    result.ok = False
+    return result
+
+
+class DeliveryQueue:
+    """
+    채팅방별 전송 큐. put() 으로 넣은 메시지는 채팅방마다 넣은 순서대로 전송되고,
+    채팅방끼리는 병렬로 진행됩니다. 앞 메시지가 전송되는 동안 다음 메시지를 계속 넣을 수 있습니다.
+    한 채팅방에서 전송이 실패하면 순서가 꼬이지 않도록 그 채팅방의 나머지 메시지는 보내지 않습니다.
+    offsets={chat_id: n} 이면 그 채팅방은 앞의 n개 메시지를 건너뜁니다 (이전 실행에서 이미 전송된 조각).
+    """
+
+    def __init__(self, chat_ids: list, label: str = "", offsets: dict | None = None):
+        self.label = label
+        self.chat_ids = list(chat_ids)
+        self.offsets = offsets or {}
+        self.results = {cid: DeliveryResult(chat_id=cid) for cid in self.chat_ids}
+        self._queues = {cid: queue.Queue() for cid in self.chat_ids}
+        self._start = time.monotonic()
+        self._threads = [threading.Thread(target=self._worker, args=(cid,), name=f"tg-{cid}", daemon=True)
+                         for cid in self.chat_ids]
+        for thread in self._threads:
+            thread.start()
+
+    def _worker(self, chat_id: str):
+        result = self.results[chat_id]
+        skip = self.offsets.get(chat_id, 0)
+        failed = False
+        while True:
+            text = self._queues[chat_id].get()
+            if text is None:
+                break
+            if skip:
+                skip -= 1
+                continue
+            if failed:
+                continue
+            send_message(chat_id, text, result=result)
+            failed = not result.ok
+            result.latency = time.monotonic() - self._start
+
+    def put(self, text: str):
+        for q in self._queues.values():
+            q.put(text)
+
+    def close(self) -> list:
+        """남은 메시지를 모두 보낸 뒤 채팅방별 DeliveryResult 목록을 chat_ids 순서로 반환"""
+        for q in self._queues.values():
+            q.put(None)
+        for thread in self._threads:
+            thread.join()
+
+        results = [self.results[cid] for cid in self.chat_ids]
+        for r in results:
+            # 보낼 조각이 남아 있지 않았던 채팅방은 성공으로 본다
+            if r.attempts == 0:
+                r.ok = True
+            _record(r, self.label)
+            if r.ok:
+                log(f"Successfully sent to Telegram Chat ID: {r.chat_id} "
+                    f"({r.sent} message(s), {r.latency * 1000:.0f} ms, {r.attempts} attempt(s))")
+            else:
+                log(f"Telegram API Error (ID: {r.chat_id}): {r.status} - {r.error} (sent {r.sent})")
+        return results
+
+
+def deliver(chat_ids: list, messages: list, label: str = "", offsets: dict | None = None) -> list:
+    """
+    chat_ids 각각에 messages 를 순서대로 전송 (채팅방끼리는 병렬).
+    offsets 로 채팅방별 이어 보낼 위치를 지정할 수 있습니다.
+    채팅방별 DeliveryResult 목록을 chat_ids 순서로 반환합니다.
+    """
+    if not chat_ids:
+        return []
+    delivery = DeliveryQueue(chat_ids, label=label, offsets=offsets)
+    for text in messages:
+        delivery.put(text)
+    return delivery.close()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+보고서 → 텔레그램 HTML 메시지 변환 및 분할
+
+텔레그램 메시지 한도(4096자)를 넘는 보고서를 잘라 버리지 않고,
+`━━━` 섹션 경계 → 빈 줄 → 줄 단위 순으로 나눠 여러 개의 유효한 HTML 메시지로 만듭니다.
+분할 지점에 열린 태그(<b> 등)가 있으면 앞 메시지에서 닫고 다음 메시지에서 다시 엽니다.
+
+실행 (실제 보고서로 분할 결과 점검):
+    python telegram_format.py output/reports/*_분석보고서.md
+테스트 (test_fixtures/reports 의 보고서로 길이·태그·섹션 확인):
+    python -m pytest test_telegram_format.py
+"""
+
+import html
+import re
+import sys
+
+MAX_MESSAGE_CHARS = 4000
+SECTION_RULE = "━━━"
+YOUTUBE_LINK = "https://www.youtube.com/@우석에닿기를"
+# 태그 보정(닫고 다시 열기)에 쓸 여유분
+TAG_MARGIN = 64
+
+_TAG = re.compile(r"<(/?)([a-zA-Z]+)([^>]*)>")
+
+
+def format_report_html(content: str) -> str:
+    """Markdown 보고서를 텔레그램 HTML 로 변환 (**굵게** → <b>)"""
+    safe_content = html.escape(content)
+    return re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', safe_content)
+
+
+def report_title(file_name: str) -> str:
+    brief = "AM Brief" if "_AM_" in file_name else "PM Brief"
+    return f"☀️ &lt;우석에 닿기를&gt; 투자 동향 분석 {brief}"
+
+
+def _section_blocks(text: str) -> list:
+    """━━━ 구분선이 나올 때마다 새 블록 시작 (구분선은 다음 블록 머리에 붙는다)"""
+    blocks, current = [], []
+    for line in text.splitlines(keepends=True):
+        if line.strip().startswith(SECTION_RULE) and current:
+            blocks.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        blocks.append("".join(current))
+    return blocks
+
+
+def _safe_cut(text: str, limit: int) -> int:
+    """태그(<...>)나 엔티티(&...;) 중간이 아닌 자르기 위치 (가능하면 공백에서)"""
+    cut = limit
+    space = text.rfind(" ", 0, cut)
+    if space > cut - 200:
+        cut = space + 1
+    lt, gt = text.rfind("<", 0, cut), text.rfind(">", 0, cut)
+    if lt > gt:
+        cut = lt
+    amp = text.rfind("&", 0, cut)
+    if amp != -1 and ";" not in text[amp:cut] and cut - amp < 10:
+        cut = amp
+    return cut if cut > 0 else limit
+
+
+def _pieces(text: str, limit: int, separators=("\n\n", "\n")) -> list:
+    """limit 이하 조각으로 분할. 큰 구분자부터 시도하고, 그래도 길면 글자 단위로 자른다"""
+    if len(text) <= limit:
+        return [text]
+    if not separators:
+        cut = _safe_cut(text, limit)
+        return [text[:cut]] + _pieces(text[cut:], limit, ())
+
+    sep, rest = separators[0], separators[1:]
+    units = [u + sep for u in text.split(sep)]
+    units[-1] = units[-1][:-len(sep)]
+    pieces = []
+    for unit in units:
+        pieces.extend(_pieces(unit, limit, rest) if len(unit) > limit else [unit])
+    return pieces
+
+
+def _open_tags(text: str, stack: list) -> list:
+    stack = list(stack)
+    for m in _TAG.finditer(text):
+        closing, name = m.group(1), m.group(2).lower()
+        if closing:
+            for i in range(len(stack) - 1, -1, -1):
+                if stack[i][0] == name:
+                    del stack[i:]
+                    break
+        else:
+            stack.append((name, m.group(0)))
+    return stack
+
+
+def _balance(parts: list) -> list:
+    """분할 경계에 걸린 태그를 닫고 다음 메시지에서 다시 연다"""
+    balanced, carried = [], []
+    for part in parts:
+        opened = _open_tags(part, carried)
+        prefix = "".join(tag for _, tag in carried)
+        suffix = "".join(f"</{name}>" for name, _ in reversed(opened))
+        balanced.append(prefix + part + suffix)
+        carried = opened
+    return balanced
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_CHARS) -> list:
+    """HTML 텍스트를 섹션 경계 우선으로 limit 이하의 메시지들로 분할"""
+    budget = max(limit - TAG_MARGIN, 1)
+    parts, current, pending = [], "", ""
+    for block in _section_blocks(text):
+        for piece in _pieces(block, budget):
+            # 구분선만 있는 조각은 다음 내용과 같은 메시지로 보낸다
+            piece, pending = pending + piece, ""
+            if piece.strip().startswith(SECTION_RULE) and piece.count("\n") <= 1 and len(piece) < budget:
+                pending = piece
+                continue
+            if current and len(current) + len(piece) > budget:
+                parts.append(current)
+                current = ""
+            current += piece
+    current += pending
+    if current:
+        parts.append(current)
+    parts = [p.strip("\n") for p in parts]
+    return [p for p in _balance(parts) if p.strip()]
+
+
+def build_html_messages(file_name: str, body_html: str, limit: int = MAX_MESSAGE_CHARS) -> list:
+    """이미 HTML 인 본문(report_render.telegram_html 등)에 제목과 링크를 붙여 분할"""
+    message = f"<b>{report_title(file_name)}</b>\n\n{body_html}\n\n{YOUTUBE_LINK}"
+    return split_message(message, limit)
+
+
+def build_report_messages(file_name: str, content: str, limit: int = MAX_MESSAGE_CHARS) -> list:
+    """보고서 파일 내용을 순서대로 보낼 텔레그램 메시지 목록으로 변환"""
+    return build_html_messages(file_name, format_report_html(content), limit)
+
+
+def stream_messages(file_name: str, streamed: str, limit: int = MAX_MESSAGE_CHARS) -> list:
+    """
+    스트리밍 중 지금까지 완성된 섹션(streamed)으로 더 이상 바뀌지 않는 메시지들.
+    이후 섹션이 붙어도 build_report_messages(전체 보고서) 결과의 앞부분과 같습니다
+    (마지막 메시지는 다음 섹션과 합쳐질 수 있어 빼고 반환).
+    """
+    message = f"<b>{report_title(file_name)}</b>\n\n{format_report_html(streamed)}"
+    return split_message(message, limit)[:-1]
+
+
+def check_html(text: str) -> bool:
+    """모든 태그가 올바르게 닫혔는지 확인"""
+    stack = []
+    for m in _TAG.finditer(text):
+        closing, name = m.group(1), m.group(2).lower()
+        if closing:
+            if not stack or stack.pop() != name:
+                return False
+        else:
+            stack.append(name)
+    return not stack
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    if len(sys.argv) < 2:
+        print("사용법: python telegram_format.py <보고서.md> [...]")
+        sys.exit(1)
+
+    ok = True
+    for path in sys.argv[1:]:
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        messages = build_report_messages(path, content)
+        sizes = [len(m) for m in messages]
+        valid = all(size <= MAX_MESSAGE_CHARS for size in sizes) and all(check_html(m) for m in messages)
+        sections = content.count(SECTION_RULE)
+        kept = sum(m.count(SECTION_RULE) for m in messages)
+        ok &= valid and kept == sections
+        print(f"{path}: {len(messages)} message(s) {sizes} | sections {kept}/{sections} | {'OK' if valid else 'INVALID'}")
+    sys.exit(0 if ok else 1)
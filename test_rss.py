@@ -1,10 +1,10 @@
-import requests
+import http_session
 from datetime import datetime, date
 import xml.etree.ElementTree as ET
 
 def check_playlist_rss(playlist_id):
     url = f"https://www.youtube.com/feeds/videos.xml?playlist_id={playlist_id}"
-    response = requests.get(url)
+    response = http_session.get(url)
     if response.status_code == 200:
         print(f"RSS works for {playlist_id}")
         return response.text
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+telegram_format 분할 점검 (python -m pytest test_telegram_format.py)
+
+test_fixtures/reports/ 의 보고서(짧은 보고서, 여러 메시지로 나뉘는 보고서,
+한 섹션이 한도보다 길고 굵은 문단이 분할 지점에 걸리는 보고서)로 확인합니다.
+"""
+
+import re
+from pathlib import Path
+
+import pytest
+
+import report_stream
+import telegram_format
+
+TELEGRAM_LIMIT = 4096
+FIXTURES = sorted((Path(__file__).parent / "test_fixtures" / "reports").glob("*_분석보고서.md"))
+
+
+def _plain(text: str) -> str:
+    """태그와 공백을 뺀 내용 (분할 때 닫고 다시 연 태그는 비교에서 제외)"""
+    return re.sub(r"\s+", "", re.sub(r"</?[a-zA-Z]+[^>]*>", "", text))
+
+
+@pytest.fixture(params=FIXTURES, ids=lambda p: p.name)
+def report(request):
+    path = request.param
+    content = path.read_text(encoding="utf-8")
+    return path.name, content, telegram_format.build_report_messages(path.name, content)
+
+
+def test_fixtures_present():
+    assert len(FIXTURES) >= 3
+
+
+def test_messages_fit_limit(report):
+    _, _, messages = report
+    assert messages
+    for message in messages:
+        assert len(message) <= telegram_format.MAX_MESSAGE_CHARS <= TELEGRAM_LIMIT
+
+
+def test_tags_balanced(report):
+    _, _, messages = report
+    for message in messages:
+        assert telegram_format.check_html(message), message[:200]
+
+
+def test_content_kept_in_order(report):
+    name, content, messages = report
+    expected = (f"<b>{telegram_format.report_title(name)}</b>"
+                f"{telegram_format.format_report_html(content)}{telegram_format.YOUTUBE_LINK}")
+    assert _plain("".join(messages)) == _plain(expected)
+
+
+def test_sections_kept(report):
+    _, content, messages = report
+    headings = [line.strip() for line in content.splitlines() if line.startswith("■")]
+    assert headings
+    # 섹션 제목 줄은 메시지 경계에서 잘리지 않고 순서대로 한 번씩
+    found = [line.strip() for message in messages for line in message.splitlines() if line.startswith("■")]
+    assert found == headings
+    rules = sum(line.strip().startswith(telegram_format.SECTION_RULE) for line in content.splitlines())
+    assert sum(line.strip().startswith(telegram_format.SECTION_RULE)
+               for message in messages for line in message.splitlines()) == rules
+
+
+def test_long_report_splits_at_section_rules():
+    path = max(FIXTURES, key=lambda p: p.stat().st_size)
+    messages = telegram_format.build_report_messages(path.name, path.read_text(encoding="utf-8"))
+    assert len(messages) > 1
+    # 섹션이 한도 안에 들어가면 구분선에서 나뉨
+    assert any(m.startswith(telegram_format.SECTION_RULE) for m in messages[1:])
+
+
+def test_stream_messages_are_prefix_of_final(report):
+    name, content, messages = report
+    stream = report_stream.SectionStream()
+    sections = []
+    for i in range(0, len(content), 101):
+        for section in stream.feed(content[i:i + 101]):
+            sections.append(section)
+            ready = telegram_format.stream_messages(name, "".join(sections))
+            assert ready == messages[:len(ready)]
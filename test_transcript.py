@@ -1,23 +1,22 @@
 import sys
-from youtube_transcript_api import YouTubeTranscriptApi
+import transcript_api
 
 video_id = "OxnIz02VlH4"
 print(f"Testing YouTubeTranscriptApi for video: {video_id}")
 
 try:
-    print(f"\nTrying with an instance: api = YouTubeTranscriptApi()...")
-    api = YouTubeTranscriptApi()
+    print(f"Detected call style: {transcript_api.style()}")
     
     try:
-        print(f"Trying api.list('{video_id}')...")
-        transcripts = api.list(video_id)
-        print("Success with api.list()!")
+        print(f"Listing transcripts for '{video_id}'...")
+        transcripts = transcript_api.list_transcripts(video_id)
+        print("Success!")
         
         try:
             print(f"Found transcript! fetching...")
             # Use 'ko' for this video specifically
-            transcript = transcripts.find_generated_transcript(['ko'])
-            data = transcript.fetch()
+            transcript = transcript_api.find_transcript(transcripts, ['ko'])
+            data = transcript_api.fetch(transcript)
             print(f"Success! Fetched {len(data)} segments.")
             print(f"Data type: {type(data)}")
             
@@ -52,7 +51,10 @@ try:
             print(f"Error within transcript processing: {e}")
             
     except Exception as e:
-        print(f"Error api.list(): {e}")
+        print(f"Error listing transcripts: {e}")
 
 except Exception as e:
-    print(f"Error creating instance: {e}")
+    print(f"Error detecting API style: {e}")
+
+for name, entry in transcript_api.stats().items():
+    print(f"{name}: {entry['calls']} call(s), last {entry['last_ms']:.0f} ms, total {entry['total_ms']:.0f} ms")
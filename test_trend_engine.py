@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+trend_engine 추출/계산 점검 (python -m pytest test_trend_engine.py)
+"""
+
+import random
+
+import pytest
+
+import trend_engine
+
+
+@pytest.mark.parametrize("line, expected", [
+    # 금액·날짜는 종가가 아님
+    ("코스피는 외국인 3,200억 순매도에 하락", {}),
+    ("나스닥 1.5% 상승, 2026.03.02 기준", {"NASDAQ.change": 1.5}),
+    ("코스피 2.5조 거래대금", {}),
+    ("비트코인 9,500만 원", {}),
+    ("2026년 3월 2일 코스피 2650.1 마감", {"KOSPI.close": 2650.1}),
+    # 이름(종가, 등락률) 형식
+    ("코스피(2,650.3, +1.2%)", {"KOSPI.close": 2650.3, "KOSPI.change": 1.2}),
+    ("- 코스피 2,650.3 (-0.8%)", {"KOSPI.close": 2650.3, "KOSPI.change": -0.8}),
+    ("원/달러 환율 1,350.5원 (+0.3%)", {"USDKRW.close": 1350.5, "USDKRW.change": 0.3}),
+    ("원/달러 환율은 1,350.5원으로 마감", {"USDKRW.close": 1350.5}),
+    ("S&P500 5,100.2 (+0.8%)", {"SP500.close": 5100.2, "SP500.change": 0.8}),
+    # 여러 지수가 섞인 줄은 건너뜀
+    ("코스피 2,650 (+1.0%), 코스닥 870 (-0.5%)", {}),
+])
+def test_index_values(line, expected):
+    assert trend_engine._index_values(line) == expected
+
+
+def test_extract_prefers_named_format(tmp_path):
+    report = tmp_path / "20260302_AM_분석보고서.md"
+    report.write_text("코스피는 외국인 순매도 속 2,610 부근까지 밀렸다가\n"
+                      "- **코스피** 2,650.3 (+1.2%)\n"
+                      "외국인 3,200억 원 순매도\n", encoding="utf-8")
+    values = trend_engine.extract(str(report))
+    assert values["KOSPI.close"] == 2650.3
+    assert values["KOSPI.change"] == 1.2
+    assert values["FOREIGN.flow"] == -3200
+
+
+def _random_store(rng, rows):
+    store = trend_engine._empty_store()
+    for i in range(rows):
+        store["names"].append(f"r{i}")
+        store["dates"].append(f"2026-01-{i // 2 + 1:02d}")
+        store["timeframes"].append("AM" if i % 2 == 0 else "PM")
+        store["mtimes"].append(0)
+    for column in trend_engine.COLUMNS:
+        values = []
+        for _ in range(rows):
+            roll = rng.random()
+            if roll < 0.25:
+                values.append(None)
+            elif roll < 0.4 and values:
+                values.append(values[-1])  # 직전 보고서 값 반복
+            else:
+                values.append(round(rng.uniform(-3, 3), 2) if column.endswith((".change", ".flow"))
+                              else round(rng.uniform(1000, 3000), 2))
+        store["columns"][column] = values
+    return store
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_numpy_and_python_paths_agree(seed, monkeypatch):
+    np = pytest.importorskip("numpy")
+    rng = random.Random(seed)
+    store = _random_store(rng, rng.randint(1, 24))
+    window = rng.randint(1, 7)
+    target = ("2026-02-01", "AM")
+
+    monkeypatch.setattr(trend_engine, "np", np)
+    vectorized = trend_engine.compute(store, *target, window=window)
+    monkeypatch.setattr(trend_engine, "np", None)
+    pure = trend_engine.compute(store, *target, window=window)
+
+    for key in pure["flow"]:
+        assert vectorized["flow"][key] == pytest.approx(pure["flow"][key]), key
+    for key in pure["index"]:
+        a, b = vectorized["index"][key], pure["index"][key]
+        assert a["changes"] == pytest.approx(b["changes"]), key
+        for field in ("n", "close_count", "first_close", "last_close", "compound", "vol"):
+            assert a[field] == pytest.approx(b[field]) if b[field] is not None else a[field] is None, (key, field)
+    assert trend_engine.summary(vectorized) == trend_engine.summary(pure)
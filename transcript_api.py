@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+YouTubeTranscriptApi 어댑터
+
+설치된 youtube-transcript-api 버전에 따라 자막 목록 조회 방식이 다릅니다.
+    - 0.x : YouTubeTranscriptApi.list_transcripts(video_id)   (정적 메서드)
+    - 1.x : YouTubeTranscriptApi().list(video_id)              (인스턴스 메서드)
+예전처럼 매번 세 가지를 차례로 시도(실패마다 요청 + 예외 로그)하지 않고,
+프로세스당 한 번 클래스 모양만 검사해서(네트워크 없음) 맞는 메서드를 묶어 둡니다.
+호출별 소요 시간은 stats() 로 확인할 수 있습니다.
+
+실행:
+    python transcript_api.py            # 감지된 호출 방식 출력
+    python transcript_api.py <videoId>  # 자막 조회 + 호출별 소요 시간
+"""
+
+import inspect
+import sys
+import threading
+import time
+
+_binding = None
+_lock = threading.Lock()
+_timings = {}
+
+
+def _probe():
+    """(방식 이름, list 함수) 반환. 클래스 속성만 보고 판단"""
+    from youtube_transcript_api import YouTubeTranscriptApi
+
+    for name in ("list_transcripts", "list"):
+        attr = inspect.getattr_static(YouTubeTranscriptApi, name, None)
+        if isinstance(attr, (staticmethod, classmethod)):
+            return f"static {name}()", getattr(YouTubeTranscriptApi, name)
+    if callable(getattr(YouTubeTranscriptApi, "list", None)):
+        api = YouTubeTranscriptApi()
+        return "instance list()", api.list
+    raise RuntimeError("Unsupported youtube-transcript-api: no list_transcripts()/list() found")
+
+
+def binding():
+    """감지된 (방식 이름, list 함수). 최초 호출 시 한 번만 검사"""
+    global _binding
+    if _binding is None:
+        with _lock:
+            if _binding is None:
+                _binding = _probe()
+    return _binding
+
+
+def style() -> str:
+    return binding()[0]
+
+
+def _timed(name, fn, *args):
+    start = time.perf_counter()
+    ok = False
+    try:
+        result = fn(*args)
+        ok = True
+        return result
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            entry = _timings.setdefault(name, {"calls": 0, "errors": 0, "total_ms": 0.0, "last_ms": 0.0})
+            entry["calls"] += 1
+            entry["errors"] += 0 if ok else 1
+            entry["total_ms"] += elapsed * 1000
+            entry["last_ms"] = elapsed * 1000
+
+
+def list_transcripts(video_id: str):
+    """영상의 자막 목록 (TranscriptList)"""
+    _, list_fn = binding()
+    return _timed("list", list_fn, video_id)
+
+
+def find_transcript(transcript_list, languages: list):
+    """자동 생성 자막 → 수동 자막 → 첫 번째 자막 순으로 선택"""
+    try:
+        return transcript_list.find_generated_transcript(languages)
+    except Exception:
+        try:
+            return transcript_list.find_transcript(languages)
+        except Exception:
+            return next(iter(transcript_list))
+
+
+def fetch(transcript):
+    """자막 세그먼트 조회 (버전에 따라 dict 또는 객체 목록)"""
+    return _timed("fetch", transcript.fetch)
+
+
+def is_unavailable(error: Exception) -> bool:
+    """영상에 자막이 없다는 확정 응답인지 (429·타임아웃 같은 일시적 오류는 False)"""
+    if isinstance(error, StopIteration):  # find_transcript: 자막 목록이 비어 있음
+        return True
+    try:
+        import youtube_transcript_api
+    except ImportError:
+        return False
+    names = ("NoTranscriptFound", "TranscriptsDisabled", "NoTranscriptAvailable")
+    types = tuple(t for t in (getattr(youtube_transcript_api, n, None) for n in names) if isinstance(t, type))
+    return bool(types) and isinstance(error, types)
+
+
+def stats() -> dict:
+    """호출별 {"calls", "errors", "total_ms", "last_ms"}"""
+    with _lock:
+        return {name: dict(entry) for name, entry in _timings.items()}
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    print(f"Detected call style: {style()}")
+    if len(sys.argv) > 1:
+        transcript = find_transcript(list_transcripts(sys.argv[1]), ["ko"])
+        data = fetch(transcript)
+        print(f"Fetched {len(data)} segments ({getattr(transcript, 'language_code', '?')})")
+        for name, entry in stats().items():
+            print(f"  {name}: {entry['last_ms']:.0f} ms")
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+자막 저장소 + 선행 수집(prefetch)
+
+- data/transcripts/<videoId>_<lang>.json.gz 에 자막 세그먼트(text, start, duration)를 보관
+- "아직 자막 없음" 확정 응답(자막 목록이 비었거나 NoTranscriptFound 등)은 NEGATIVE_TTL 동안 기억해서
+  같은 영상을 곧바로 다시 조회하지 않음. 429·타임아웃 같은 일시적 오류는 기억하지 않음
+- prefetch(mode): 실행 시각(09:20 / 18:20) 전에 재생목록에서 당일 영상을 찾아 자막을 미리 받아 둠
+  (scheduler.py 의 PREFETCH_JOBS 가 주기적으로 호출)
+적중/실패 횟수는 logs/cache_stats.json 의 "transcript" 항목에 기록됩니다.
+
+config.json / 환경 변수:
+    TRANSCRIPT_NEGATIVE_TTL   자막 없음 기억 시간 초 (기본 20, 재시도 간격 30초보다 짧게)
+
+실행:
+    python transcript_cache.py <videoId>        # 조회 (캐시 우선)
+    python transcript_cache.py --prefetch AM    # 당일 AM 영상 자막 선행 수집
+    python transcript_cache.py --evict          # 오래된 자막 정리
+"""
+
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+import cache_stats
+import transcript_api
+from app_config import get_int, load_config
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "transcripts")
+NEGATIVE_FILE = os.path.join(CACHE_DIR, "negative.json")
+PREFERRED_LANGS = ["ko"]
+NEGATIVE_TTL = 20                      # 초, run_agent_b 재시도 간격(30초)보다 짧게 → 재시도는 항상 다시 조회
+TRANSCRIPT_TTL = 14 * 24 * 3600        # 2주 지난 자막은 삭제
+MAX_TRANSCRIPTS = 200
+PREFETCH_PLAYLIST_MAX_AGE = 60
+
+_negative_lock = threading.Lock()
+
+
+def log(message):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] [TranscriptCache] {message}")
+
+
+def _path(video_id: str, lang: str) -> str:
+    return os.path.join(CACHE_DIR, f"{video_id}_{lang}.json.gz")
+
+
+def _read(path: str) -> dict | None:
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError, EOFError):
+        return None
+
+
+def load(video_id: str, langs=PREFERRED_LANGS) -> dict | None:
+    """저장된 자막 {"video_id", "lang", "segments", ...}. 선호 언어 → 그 외 언어 순"""
+    for lang in langs:
+        entry = _read(_path(video_id, lang))
+        if entry:
+            return entry
+    if os.path.isdir(CACHE_DIR):
+        for name in sorted(os.listdir(CACHE_DIR)):
+            if name.startswith(f"{video_id}_") and name.endswith(".json.gz"):
+                entry = _read(os.path.join(CACHE_DIR, name))
+                if entry:
+                    return entry
+    return None
+
+
+def save(video_id: str, lang: str, segments: list, is_generated: bool | None = None):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _path(video_id, lang)
+    entry = {
+        "video_id": video_id,
+        "lang": lang,
+        "is_generated": is_generated,
+        "fetched_at": time.time(),
+        "segments": segments,
+    }
+    tmp_path = path + ".tmp"
+    try:
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        log(f"Transcript write failed: {e}")
+    clear_negative(video_id)
+
+
+def _load_negative() -> dict:
+    try:
+        with open(NEGATIVE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_negative(entries: dict):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = NEGATIVE_FILE + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, NEGATIVE_FILE)
+    except OSError as e:
+        log(f"Negative cache write failed: {e}")
+
+
+def _negative_ttl() -> int:
+    load_config()
+    return get_int("TRANSCRIPT_NEGATIVE_TTL", NEGATIVE_TTL)
+
+
+def is_negative(video_id: str) -> bool:
+    """최근 NEGATIVE_TTL 안에 "자막 없음" 으로 확인된 영상인지"""
+    checked_at = _load_negative().get(video_id)
+    return checked_at is not None and time.time() - checked_at < _negative_ttl()
+
+
+def mark_negative(video_id: str):
+    with _negative_lock:
+        entries = _load_negative()
+        now = time.time()
+        ttl = _negative_ttl()
+        entries = {vid: ts for vid, ts in entries.items() if now - ts < ttl}
+        entries[video_id] = now
+        _save_negative(entries)
+
+
+def clear_negative(video_id: str):
+    with _negative_lock:
+        entries = _load_negative()
+        if entries.pop(video_id, None) is not None:
+            _save_negative(entries)
+
+
+def _segment(s) -> dict:
+    get = s.get if isinstance(s, dict) else lambda k, d=None: getattr(s, k, d)
+    return {"text": get("text", ""), "start": get("start", 0.0), "duration": get("duration", 0.0)}
+
+
+def _fetch_remote(video_id: str, log_fn=log):
+    """YouTubeTranscriptApi 로 자막 조회 → (lang, is_generated, segments) 또는 None"""
+    transcript_list = transcript_api.list_transcripts(video_id)
+    if not transcript_list:
+        return None
+    transcript = transcript_api.find_transcript(transcript_list, PREFERRED_LANGS)
+    segments = [_segment(s) for s in transcript_api.fetch(transcript)]
+    lang = getattr(transcript, "language_code", None) or PREFERRED_LANGS[0]
+    timings = transcript_api.stats()
+    log_fn(f"Transcript fetched via {transcript_api.style()} "
+           f"(list {timings['list']['last_ms']:.0f} ms, fetch {timings['fetch']['last_ms']:.0f} ms)")
+    return lang, getattr(transcript, "is_generated", None), segments
+
+
+def get_segments(video_id: str, log_fn=log) -> list | None:
+    """
+    자막 세그먼트 목록 반환 (저장소 → 원격 조회 순). 자막이 없으면 None.
+    최근에 "자막 없음" 으로 확인된 영상은 NEGATIVE_TTL 동안 원격 조회를 건너뜁니다 (조회 오류는 제외).
+    """
+    entry = load(video_id)
+    if entry:
+        cache_stats.record("transcript", "hit")
+        log_fn(f"Transcript cache hit for {video_id} ({entry['lang']}, {len(entry['segments'])} segments)")
+        return entry["segments"]
+    if is_negative(video_id):
+        cache_stats.record("transcript", "negative_hit")
+        log_fn(f"Transcript for {video_id} was unavailable less than {_negative_ttl()}s ago; skipping lookup")
+        return None
+
+    cache_stats.record("transcript", "miss")
+    try:
+        fetched = _fetch_remote(video_id, log_fn)
+    except Exception as e:
+        log_fn(f"Transcript API failed for {video_id}: {e}")
+        # 일시적 오류는 다음 시도에서 다시 조회
+        if transcript_api.is_unavailable(e):
+            mark_negative(video_id)
+        return None
+    if not fetched or not fetched[2]:
+        mark_negative(video_id)
+        return None
+    lang, is_generated, segments = fetched
+    save(video_id, lang, segments, is_generated)
+    return segments
+
+
+def segments_text(segments: list) -> str:
+    return " ".join(s.get("text", "") for s in segments)
+
+
+def evict(max_age: int = TRANSCRIPT_TTL, max_entries: int = MAX_TRANSCRIPTS) -> int:
+    """오래되었거나 개수 한도를 넘는 자막 삭제. 삭제한 개수 반환"""
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith(".json.gz"):
+            path = os.path.join(CACHE_DIR, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+    entries.sort(reverse=True)
+
+    now = time.time()
+    removed = 0
+    for i, (mtime, path) in enumerate(entries):
+        if i >= max_entries or now - mtime > max_age:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+    if removed:
+        cache_stats.record("transcript", "evicted", removed)
+    return removed
+
+
+def prefetch(mode: str) -> bool:
+    """당일 mode(AM/PM) 영상이 올라왔으면 자막을 미리 받아 둔다. 자막이 준비되면 True"""
+    import agent_b
+    import playlist_cache
+
+    videos = playlist_cache.fetch_videos(agent_b.PLAYLISTS[mode], max_age=PREFETCH_PLAYLIST_MAX_AGE)
+    video_id, title = agent_b.find_dated_video(videos or [], datetime.now())
+    if not video_id:
+        log(f"[{mode}] Today's video is not in the playlist yet")
+        return False
+    if load(video_id):
+        log(f"[{mode}] Transcript already cached: {title} ({video_id})")
+        return True
+    segments = get_segments(video_id)
+    log(f"[{mode}] Prefetch {'done' if segments else 'pending (no transcript yet)'}: {title} ({video_id})")
+    evict()
+    return bool(segments)
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    if len(sys.argv) > 1 and sys.argv[1] == "--evict":
+        print(f"Evicted {evict()} transcript(s).")
+        sys.exit(0)
+    if len(sys.argv) > 2 and sys.argv[1] == "--prefetch":
+        sys.exit(0 if prefetch(sys.argv[2]) else 1)
+    if len(sys.argv) < 2:
+        print("사용법: python transcript_cache.py <videoId> | --prefetch AM|PM | --evict")
+        sys.exit(1)
+
+    segments = get_segments(sys.argv[1])
+    if segments is None:
+        print("No transcript available.")
+        sys.exit(1)
+    print(f"{len(segments)} segments")
+    print(segments_text(segments)[:500])
+    print(f"\nCache stats: {cache_stats.get('transcript')}")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+자막 압축 (Gemini 프롬프트에 넣기 전 전처리)
+
+자동 생성 한국어 자막의 군더더기를 걷어 내 프롬프트 토큰을 줄입니다.
+1. [음악] / [박수] 같은 효과음 표기, >> 화자 표시 제거 → 내용이 없는 세그먼트(무음 구간)는 버림
+2. "어", "음" 같은 추임새 제거, 연속으로 반복된 단어 하나로 합치기
+3. 자동 자막의 롤링 중복(앞 세그먼트 끝이 다음 세그먼트 앞에 다시 나오는 경우)과 반복 세그먼트 제거
+4. start/duration 으로 DEAD_AIR_SECONDS 이상 말이 없던 지점에서 문단을 나눔
+5. 토큰 예산을 넘으면 문단별로 길이에 비례해 잘라 영상 전체(국내/미국/코인 파트)를 고르게 남김
+
+토큰 수는 추정치입니다 (estimate_tokens 참고).
+
+config.json / 환경 변수:
+    TRANSCRIPT_COMPACT        off 이면 압축하지 않음 (기본 on)
+    TRANSCRIPT_TOKEN_BUDGET   자막에 허용할 최대 토큰 수 (기본 8000, 0 이면 자르지 않음).
+                              MAPREDUCE_THRESHOLD_TOKENS 를 넘는 자막은 자르지 않고 map-reduce 로 분석
+"""
+
+import os
+import re
+
+from app_config import get_int, load_config
+
+# map-reduce 기준(report_mapreduce, 기본 10000)보다 작아야 예산이 실제로 적용됨
+DEFAULT_TOKEN_BUDGET = 8000
+DEAD_AIR_SECONDS = 4.0
+# 직전 몇 개 세그먼트와 같은 문장이면 반복으로 보고 버린다
+DUPLICATE_WINDOW = 4
+# fit_text 에서 세그먼트 대신 자를 단어 묶음 크기
+FIT_CHUNK_WORDS = 20
+
+FILLERS = {"어", "음", "아", "에", "으", "흠", "엄", "어어", "음음", "아아", "에에", "어우", "뭐랄까"}
+_SOUND_TAG = re.compile(r"\[[^\]]{0,20}\]|>>+|♪+")
+_WORD_SPLIT = re.compile(r"\s+")
+_HANGUL = re.compile(r"[가-힣]")
+
+
+def enabled() -> bool:
+    load_config()
+    return os.getenv("TRANSCRIPT_COMPACT", "on").strip().lower() not in ("off", "0", "false", "no")
+
+
+def token_budget() -> int:
+    load_config()
+    return get_int("TRANSCRIPT_TOKEN_BUDGET", DEFAULT_TOKEN_BUDGET)
+
+
+def estimate_tokens(text: str) -> int:
+    """토큰 수 추정: 한글은 음절 2개당 약 1.5 토큰, 그 외는 4글자당 1 토큰"""
+    hangul = len(_HANGUL.findall(text))
+    return int(hangul * 0.75 + (len(text) - hangul) / 4) + 1
+
+
+def _clean_words(text: str) -> list:
+    words = []
+    for word in _WORD_SPLIT.split(_SOUND_TAG.sub(" ", text)):
+        if not word or word.strip(",.?!…") in FILLERS:
+            continue
+        # "삼성 삼성 삼성" → "삼성"
+        if words and words[-1] == word:
+            continue
+        words.append(word)
+    return words
+
+
+def _strip_overlap(previous: list, words: list) -> list:
+    """앞 세그먼트 끝과 겹치는 앞부분 제거 (롤링 자막)"""
+    for size in range(min(len(previous), len(words)), 0, -1):
+        if previous[-size:] == words[:size]:
+            return words[size:]
+    return words
+
+
+def _paragraphs(segments: list, stats: dict) -> list:
+    """세그먼트 → 문단 목록 (문단 = 단어 목록들의 목록)"""
+    paragraphs, current = [], []
+    recent = []
+    previous_words = []
+    last_end = None
+    for seg in segments:
+        text = seg.get("text", "") if isinstance(seg, dict) else str(seg)
+        start = float(seg.get("start") or 0.0) if isinstance(seg, dict) else 0.0
+        duration = float(seg.get("duration") or 0.0) if isinstance(seg, dict) else 0.0
+
+        words = _clean_words(text)
+        stats["words_removed"] += len(_WORD_SPLIT.split(text.strip())) - len(words) if text.strip() else 0
+        if not words:
+            stats["dead_air_dropped"] += 1
+            continue
+        full_key = " ".join(words)
+        words = _strip_overlap(previous_words, words)
+        key = " ".join(words)
+        if not words or key in recent or full_key in recent:
+            stats["duplicates_dropped"] += 1
+            continue
+        recent = (recent + [full_key, key])[-DUPLICATE_WINDOW * 2:]
+        previous_words = words
+
+        if last_end is not None and start - last_end >= DEAD_AIR_SECONDS and current:
+            paragraphs.append(current)
+            current = []
+        current.append(words)
+        if start or duration:
+            last_end = start + duration
+    if current:
+        paragraphs.append(current)
+    return paragraphs
+
+
+def _fit_budget(paragraphs: list, budget: int) -> list:
+    """
+    문단 길이에 비례해 예산을 나누고 각 문단 앞부분부터 세그먼트 단위로 채운다
+    (한 문단에서 남은 예산은 다음 문단으로 넘김)
+    """
+    texts = [[" ".join(words) for words in para] for para in paragraphs]
+    sizes = [sum(estimate_tokens(t) for t in para) for para in texts]
+    total = sum(sizes)
+    if budget <= 0 or total <= budget:
+        return texts
+    fitted = []
+    allowance = 0.0
+    for para, size in zip(texts, sizes):
+        allowance += budget * size / total
+        kept = []
+        for t in para:
+            cost = estimate_tokens(t)
+            if cost > allowance:
+                break
+            kept.append(t)
+            allowance -= cost
+        fitted.append(kept)
+    return fitted
+
+
+def compact(segments: list, budget: int | None = None) -> tuple:
+    """
+    자막 세그먼트 [{"text", "start", "duration"}, ...] → (압축된 텍스트, 통계 dict).
+    통계: tokens_before, tokens_after, segments_before, segments_after, duplicates_dropped, ...
+    """
+    budget = token_budget() if budget is None else budget
+    original = " ".join((s.get("text", "") if isinstance(s, dict) else str(s)) for s in segments)
+    stats = {
+        "segments_before": len(segments),
+        "tokens_before": estimate_tokens(original),
+        "words_removed": 0,
+        "duplicates_dropped": 0,
+        "dead_air_dropped": 0,
+    }
+    paragraphs = _paragraphs(segments, stats)
+    kept = sum(len(para) for para in paragraphs)
+    paragraphs = _fit_budget(paragraphs, budget)
+    text = "\n\n".join(" ".join(para) for para in paragraphs if para)
+    stats["segments_after"] = sum(len(para) for para in paragraphs)
+    stats["paragraphs"] = len([p for p in paragraphs if p])
+    stats["tokens_after"] = estimate_tokens(text)
+    stats["truncated"] = stats["segments_after"] < kept
+    return text, stats
+
+
+def fit_text(text: str, budget: int | None = None) -> str:
+    """이미 압축된 텍스트에 예산만 적용 (문단은 빈 줄, 세그먼트 대신 단어 묶음 단위로 자름)"""
+    budget = token_budget() if budget is None else budget
+    paragraphs = []
+    for para in text.split("\n\n"):
+        words = para.split()
+        paragraphs.append([words[i:i + FIT_CHUNK_WORDS] for i in range(0, len(words), FIT_CHUNK_WORDS)])
+    return "\n\n".join(" ".join(para) for para in _fit_budget(paragraphs, budget) if para)
+
+
+def summary(stats: dict) -> str:
+    saved = 1 - stats["tokens_after"] / max(stats["tokens_before"], 1)
+    return (f"~{stats['tokens_before']} → ~{stats['tokens_after']} tokens ({saved:.0%} saved), "
+            f"segments {stats['segments_before']} → {stats['segments_after']}, "
+            f"duplicates {stats['duplicates_dropped']}, dead air {stats['dead_air_dropped']}, "
+            f"filler/repeated words {stats['words_removed']}" + (" [budget truncated]" if stats["truncated"] else ""))
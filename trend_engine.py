@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+지난 보고서 기반 추세 요약 (분석 프롬프트에 넣는 짧은 참고 자료)
+
+1. 추출: 보고서 색인(report_index)의 보고서마다 지수 종가/등락률, 외국인·기관 순매수 금액을 뽑아
+   data/trend_store.json.gz 에 열(column) 단위로 저장 (보고서 mtime 이 바뀐 것만 다시 추출)
+2. 계산: 시리즈별 최근 TREND_WINDOW 회 관측치의 구간 등락, 상승/하락 횟수, 연속 방향, 변동성, 수급 합계
+   (NumPy 가 있으면 전체 행렬을 한 번에 계산, 없으면 같은 결과를 순수 파이썬으로)
+3. 요약: 시리즈당 한 줄, 전체 10줄 이내 → agent_b 가 보고서 프롬프트의 {trend_context} 에 넣음
+
+AM 보고서가 직전 PM 보고서와 같은 종가를 다시 언급하는 경우가 많아, 직전 관측치와 값이 같으면 한 번만 셉니다.
+대상 보고서 자신과 그 이후 보고서는 쓰지 않으므로 같은 날 다시 실행해도 요약이 바뀌지 않습니다.
+
+config.json / 환경 변수:
+    TREND_CONTEXT   off 이면 프롬프트에 추세 요약을 넣지 않음 (기본 on)
+    TREND_WINDOW    시리즈별 최근 관측치 수 (기본 5)
+
+실행:
+    python trend_engine.py                          # 오늘 다음 보고서 기준 요약 출력
+    python trend_engine.py --date 20260302 --timeframe AM
+    python trend_engine.py --rebuild                # 저장소를 처음부터 다시 추출
+"""
+
+import argparse
+import gzip
+import json
+import math
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+
+import report_index
+import report_render
+from app_config import get_int, load_config
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 없이도 동작 (순수 파이썬 계산)
+    np = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_FILE = os.path.join(BASE_DIR, "data", "trend_store.json.gz")
+STORE_VERSION = 2
+DEFAULT_WINDOW = 5
+MAX_SUMMARY_LINES = 10
+_lock = threading.Lock()
+
+# (시리즈 키, 표시 이름, 본문에서 찾을 이름들)
+INDEX_SERIES = [
+    ("KOSPI", "코스피", ("코스피", "KOSPI")),
+    ("KOSDAQ", "코스닥", ("코스닥", "KOSDAQ")),
+    ("DOW", "다우", ("다우", "Dow")),
+    ("NASDAQ", "나스닥", ("나스닥", "NASDAQ", "Nasdaq")),
+    ("SP500", "S&P500", ("S&P", "에스앤피")),
+    ("BTC", "비트코인", ("비트코인", "BTC")),
+    ("USDKRW", "원/달러 환율", ("환율", "원/달러", "원·달러", "달러/원")),
+]
+FLOW_SERIES = [
+    ("FOREIGN", "외국인 순매수", "외국인"),
+    ("INSTITUTION", "기관 순매수", "기관"),
+]
+COLUMNS = [f"{key}.{field}" for key, _, _ in INDEX_SERIES for field in ("close", "change")] + \
+          [f"{key}.flow" for key, _, _ in FLOW_SERIES]
+
+_PERCENT = re.compile(r"\(?\s*([+\-−]?\d+(?:\.\d+)?)\s*%\s*\)?")
+_NUMBER = r"(\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+\.\d+|\d{4,}(?:\.\d+)?)"
+_CLOSE = re.compile(r"(?<![\d.,])" + _NUMBER + r"(?![\d%.,])(?!\s*(?:억|조|만|원|달러|명|주|건|개|배))")
+# 환율은 '1,350.5원' 처럼 원 단위로 적음 (억 원/조 원 금액은 여전히 제외)
+_CLOSE_KRW = re.compile(r"(?<![\d.,])" + _NUMBER + r"(?![\d%.,])(?!\s*(?:억|조|만|달러|명|주|건|개|배))")
+# (지수 이름 뒤) '(2,650.3, +1.2%)' / ' 2,650.3 (+1.2%)' 처럼 종가와 등락률이 붙은 형식을 우선
+_NAMED = (r"[^\n\d%]{0,8}?" + _NUMBER +
+          r"\s*(?:pt|p|포인트|원)?\s*[(,]\s*([+\-−]?\d+(?:\.\d+)?)\s*%")
+_DATE = re.compile(r"\d{4}\s*[./\-년]\s*\d{1,2}\s*[./\-월]\s*\d{1,2}\s*일?|\d{4}년|\d{1,2}월\s*\d{1,2}일|\d{1,2}:\d{2}")
+_FLOW = r"{who}[^\n\d]{{0,12}}?([\d,]+(?:\.\d+)?)\s*(조|억)[^\n\d]{{0,8}}?(순매수|순매도|매수|매도)"
+
+
+def log(message):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] [Trend] {message}")
+
+
+def enabled() -> bool:
+    load_config()
+    return os.getenv("TREND_CONTEXT", "on").strip().lower() not in ("off", "0", "false", "no")
+
+
+# --- 추출 ---
+
+def _number(text: str) -> float:
+    return float(text.replace(",", "").replace("−", "-"))
+
+
+def _flows(text: str) -> dict:
+    values = {}
+    for key, _, who in FLOW_SERIES:
+        m = re.search(_FLOW.format(who=who), text)
+        if m:
+            amount = _number(m.group(1)) * (10000 if m.group(2) == "조" else 1)  # 억 원 단위
+            values[f"{key}.flow"] = -amount if "매도" in m.group(3) else amount
+    return values
+
+
+def _index_values(line: str, loose: bool = True) -> dict:
+    """
+    한 줄에 지수 하나만 나올 때 그 종가/등락률 (여러 지수가 섞인 줄은 어느 값인지 알 수 없어 건너뜀).
+    '이름(종가, 등락률%)' 형식을 우선하고, loose 면 날짜와 금액(억/조/만/원 등)을 뺀 숫자를 종가로 봄
+    """
+    keys = [(key, aliases) for key, _, aliases in INDEX_SERIES if any(a in line for a in aliases)]
+    if len(keys) != 1:
+        return {}
+    key, aliases = keys[0]
+    for alias in aliases:
+        named = re.search(re.escape(alias) + _NAMED, line)
+        if named:
+            return {f"{key}.close": _number(named.group(1)), f"{key}.change": _number(named.group(2))}
+    if not loose:
+        return {}
+    values = {}
+    text = _DATE.sub(" ", line)
+    percent = _PERCENT.search(text)
+    if percent:
+        values[f"{key}.change"] = _number(percent.group(1))
+    close = (_CLOSE_KRW if key == "USDKRW" else _CLOSE).search(_PERCENT.sub(" ", text))
+    if close:
+        values[f"{key}.close"] = _number(close.group(1))
+    return values
+
+
+def extract(path: str) -> dict:
+    """보고서 하나 → {열 이름: 값}. 구조화 사이드카가 있으면 문서의 지수 항목을 그대로 사용"""
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    doc = report_render.matching_doc(path, content)
+    values = {}
+    if doc:
+        for section in doc["sections"]:
+            for item in section["indices"]:
+                line = " ".join(str(v) for v in (item["name"], item.get("value") or "") if v)
+                found = _index_values(line)
+                if item.get("change_pct") is not None and found:
+                    key = next(iter(found)).split(".")[0]
+                    found[f"{key}.change"] = item["change_pct"]
+                values.update({k: v for k, v in found.items() if k not in values})
+            for text in section["flows"]:
+                values.update({k: v for k, v in _flows(text).items() if k not in values})
+        return values
+    lines = content.replace("**", "").splitlines()
+    # '이름 종가 (등락률%)' 형식의 줄을 먼저, 그 다음 나머지 줄에서 빈 값만 채움
+    for loose in (False, True):
+        for line in lines:
+            for k, v in _index_values(line, loose=loose).items():
+                values.setdefault(k, v)
+    for line in lines:
+        for k, v in _flows(line).items():
+            values.setdefault(k, v)
+    return values
+
+
+# --- 열 저장소 ---
+
+def _empty_store() -> dict:
+    return {"version": STORE_VERSION, "names": [], "dates": [], "timeframes": [], "mtimes": [],
+            "columns": {c: [] for c in COLUMNS}}
+
+
+def load_store() -> dict:
+    try:
+        with gzip.open(STORE_FILE, "rt", encoding="utf-8") as f:
+            store = json.load(f)
+        if store.get("version") == STORE_VERSION and set(store.get("columns", {})) == set(COLUMNS):
+            return store
+    except (OSError, ValueError, EOFError):
+        pass
+    return _empty_store()
+
+
+def _save_store(store: dict):
+    os.makedirs(os.path.dirname(STORE_FILE), exist_ok=True)
+    tmp_path = f"{STORE_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(store, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, STORE_FILE)
+
+
+def update(rebuild: bool = False) -> dict:
+    """색인된 보고서와 저장소 비교: 새/바뀐 보고서만 추출해 날짜·AM→PM 순의 열로 다시 저장"""
+    # 다중 실행에서 분석 작업들이 동시에 부르므로 읽기-추출-저장을 한 번에 하나씩
+    with _lock:
+        return _update(rebuild)
+
+
+def _update(rebuild: bool) -> dict:
+    store = _empty_store() if rebuild else load_store()
+    previous = {name: i for i, name in enumerate(store["names"])}
+    rows, changed = [], False
+    for report in report_index.reports():
+        i = previous.pop(report["name"], None)
+        if i is not None and store["mtimes"][i] == report["mtime"]:
+            values = {c: store["columns"][c][i] for c in COLUMNS}
+        else:
+            try:
+                values = extract(report["path"])
+            except OSError as e:
+                log(f"Skipping {report['name']}: {e}")
+                continue
+            changed = True
+        rows.append((report, values))
+    if previous:
+        changed = True
+    if not changed:
+        return store
+
+    store = _empty_store()
+    for report, values in rows:
+        store["names"].append(report["name"])
+        store["dates"].append(report["date"])
+        store["timeframes"].append(report["timeframe"])
+        store["mtimes"].append(report["mtime"])
+        for c in COLUMNS:
+            store["columns"][c].append(values.get(c))
+    _save_store(store)
+    log(f"Trend store updated: {len(rows)} report(s)")
+    return store
+
+
+# --- 계산 ---
+
+def _window_rows(store: dict, report_date: str, timeframe: str) -> int:
+    """대상 보고서보다 앞선 행의 수 (행은 날짜, AM → PM 순)"""
+    cutoff = (report_date, timeframe)
+    return sum(1 for d, tf in zip(store["dates"], store["timeframes"]) if (d, tf) < cutoff)
+
+
+def _series_stats_python(closes: list, changes: list, window: int) -> dict:
+    obs, last = [], None
+    for close, change in zip(closes, changes):
+        if close is None and change is None:
+            continue
+        if last is not None and (close, change) == last:
+            continue  # AM 보고서가 직전 보고서 값을 다시 언급
+        obs.append((close, change))
+        last = (close, change)
+    obs = obs[-window:]
+    closes_w = [c for c, _ in obs if c is not None]
+    changes_w = [p for _, p in obs if p is not None]
+    mean = sum(changes_w) / len(changes_w) if changes_w else None
+    return {
+        "n": len(obs),
+        "first_close": closes_w[0] if closes_w else None,
+        "last_close": closes_w[-1] if closes_w else None,
+        "close_count": len(closes_w),
+        "changes": changes_w,
+        "compound": (math.prod(1 + p / 100 for p in changes_w) - 1) * 100 if changes_w else None,
+        "vol": math.sqrt(sum((p - mean) ** 2 for p in changes_w) / len(changes_w)) if changes_w else None,
+    }
+
+
+def _series_stats_numpy(closes: list, changes: list, window: int) -> list:
+    """
+    여러 시리즈를 한 번에: closes/changes 는 (행, 시리즈) 행렬로 변환.
+    시리즈마다 직전 관측치와 같은 값은 빼고, 끝에서 window 개 관측치로 통계 계산
+    """
+    C = np.array(closes, dtype=float)
+    P = np.array(changes, dtype=float)
+    rows = np.arange(C.shape[0])[:, None]
+    valid = ~np.isnan(C) | ~np.isnan(P)
+    # 각 행에서 (자신 이전) 마지막 관측 행 번호 — 전진 채우기
+    last_seen = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+    prev = np.vstack([np.full((1, C.shape[1]), -1), last_seen[:-1]])
+    cols = np.arange(C.shape[1])[None, :]
+    safe = np.clip(prev, 0, None)
+    same = (prev >= 0) & _nan_equal(C, C[safe, cols]) & _nan_equal(P, P[safe, cols])
+    obs = valid & ~same
+    # 끝에서부터 센 관측 순번이 window 이하인 행만
+    from_end = np.cumsum(obs[::-1], axis=0)[::-1]
+    in_window = obs & (from_end <= window)
+
+    Cw = np.where(in_window, C, np.nan)
+    Pw = np.where(in_window, P, np.nan)
+    close_ok = ~np.isnan(Cw)
+    change_ok = ~np.isnan(Pw)
+    has_close = close_ok.any(axis=0)
+    first = np.where(has_close, Cw[np.argmax(close_ok, axis=0), cols[0]], np.nan)
+    last = np.where(has_close, Cw[C.shape[0] - 1 - np.argmax(close_ok[::-1], axis=0), cols[0]], np.nan)
+    counts = np.maximum(change_ok.sum(axis=0), 1)
+    compound = (np.prod(np.where(change_ok, 1 + Pw / 100, 1.0), axis=0) - 1) * 100
+    mean = np.where(change_ok, Pw, 0.0).sum(axis=0) / counts
+    vol = np.sqrt(np.where(change_ok, (Pw - mean) ** 2, 0.0).sum(axis=0) / counts)
+
+    stats = []
+    for j in range(C.shape[1]):
+        changes_w = Pw[change_ok[:, j], j].tolist()
+        stats.append({
+            "n": int(in_window[:, j].sum()),
+            "first_close": None if np.isnan(first[j]) else float(first[j]),
+            "last_close": None if np.isnan(last[j]) else float(last[j]),
+            "close_count": int(close_ok[:, j].sum()),
+            "changes": changes_w,
+            "compound": float(compound[j]) if changes_w else None,
+            "vol": float(vol[j]) if changes_w else None,
+        })
+    return stats
+
+
+def _nan_equal(a, b):
+    return (a == b) | (np.isnan(a) & np.isnan(b))
+
+
+def compute(store: dict, report_date: str, timeframe: str, window: int | None = None) -> dict:
+    """{시리즈 키: 통계}. 대상 보고서 이전 행만 사용"""
+    load_config()
+    window = window or get_int("TREND_WINDOW", DEFAULT_WINDOW)
+    end = _window_rows(store, report_date, timeframe)
+    cols = store["columns"]
+    keys = [key for key, _, _ in INDEX_SERIES]
+    closes = [cols[f"{k}.close"][:end] for k in keys]
+    changes = [cols[f"{k}.change"][:end] for k in keys]
+
+    if np is not None and end:
+        to_matrix = lambda columns: [[np.nan if v is None else v for v in row] for row in zip(*columns)]
+        index_stats = dict(zip(keys, _series_stats_numpy(to_matrix(closes), to_matrix(changes), window)))
+    else:
+        index_stats = {k: _series_stats_python(c, p, window) for k, c, p in zip(keys, closes, changes)}
+
+    flow_stats = {}
+    for key, _, _ in FLOW_SERIES:
+        values = []
+        for v in cols[f"{key}.flow"][:end]:
+            if v is not None and (not values or v != values[-1]):
+                values.append(v)
+        values = values[-window:]
+        if np is not None and values:
+            arr = np.array(values, dtype=float)
+            flow_stats[key] = {"n": len(values), "sum": float(arr.sum()), "buy_days": int((arr > 0).sum())}
+        else:
+            flow_stats[key] = {"n": len(values), "sum": sum(values), "buy_days": sum(1 for v in values if v > 0)}
+    return {"index": index_stats, "flow": flow_stats, "window": window, "reports": end}
+
+
+# --- 요약 ---
+
+def _streak(changes: list) -> str:
+    if not changes or changes[-1] == 0:
+        return ""
+    sign = changes[-1] > 0
+    count = 0
+    for p in reversed(changes):
+        if p == 0 or (p > 0) != sign:
+            break
+        count += 1
+    return f"{count}회 연속 {'상승' if sign else '하락'}" if count >= 2 else ""
+
+
+def _fmt_close(value: float) -> str:
+    return f"{value:,.2f}".rstrip("0").rstrip(".")
+
+
+def _fmt_flow(amount: float) -> str:
+    """억 원 → '+1.2조 원' / '-3,200억 원'"""
+    if abs(amount) >= 10000:
+        return f"{amount / 10000:+.1f}조 원"
+    return f"{amount:+,.0f}억 원"
+
+
+def summary(stats: dict) -> str:
+    lines = []
+    for key, label, _ in INDEX_SERIES:
+        s = stats["index"][key]
+        if s["n"] < 2:
+            continue
+        parts = []
+        if s["close_count"] >= 2:
+            move = (s["last_close"] / s["first_close"] - 1) * 100 if s["first_close"] else 0.0
+            parts.append(f"{_fmt_close(s['first_close'])} → {_fmt_close(s['last_close'])} ({move:+.1f}%)")
+        elif s["compound"] is not None:
+            parts.append(f"누적 {s['compound']:+.1f}%")
+        if s["changes"]:
+            up = sum(1 for p in s["changes"] if p > 0)
+            down = sum(1 for p in s["changes"] if p < 0)
+            parts.append(f"상승 {up}·하락 {down}")
+            streak = _streak(s["changes"])
+            if streak:
+                parts.append(streak)
+            if len(s["changes"]) >= 3:
+                parts.append(f"일간 변동폭 {s['vol']:.1f}%p")
+        if parts:
+            lines.append(f"- {label}: 최근 {s['n']}회 " + ", ".join(parts))
+    for key, label, _ in FLOW_SERIES:
+        s = stats["flow"][key]
+        if s["n"] >= 2:
+            lines.append(f"- {label}: 최근 {s['n']}회 합계 {_fmt_flow(s['sum'])} (순매수 {s['buy_days']}회)")
+    return "\n".join(lines[:MAX_SUMMARY_LINES])
+
+
+def context_for(report_date: str, timeframe: str) -> str:
+    """
+    보고서 프롬프트에 넣을 추세 블록 (YYYY-MM-DD, AM/PM). 꺼져 있거나 자료가 부족하면 빈 문자열.
+    실패해도 보고서 생성은 계속되도록 예외를 삼킴
+    """
+    if not enabled():
+        return ""
+    try:
+        text = summary(compute(update(), report_date, timeframe))
+    except Exception as e:
+        log(f"Trend summary failed: {e}")
+        return ""
+    if not text:
+        return ""
+    return ("[최근 추세 참고 자료 - 지난 보고서에서 추출한 수치]\n" + text +
+            "\n(BWS 투자 인사이트에서 최근 흐름을 언급할 때만 참고하고, 오늘 수치는 반드시 자막을 따르세요.)")
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    parser = argparse.ArgumentParser(description="지난 보고서 추세 요약")
+    parser.add_argument("--date", help="대상 보고서 날짜 YYYYMMDD (기본: 오늘)")
+    parser.add_argument("--timeframe", choices=["AM", "PM"], default="PM")
+    parser.add_argument("--window", type=int, default=None)
+    parser.add_argument("--rebuild", action="store_true", help="저장소를 처음부터 다시 추출")
+    args = parser.parse_args()
+
+    target = datetime.strptime(args.date, "%Y%m%d") if args.date else datetime.now()
+    store = update(rebuild=args.rebuild)
+    stats = compute(store, target.strftime("%Y-%m-%d"), args.timeframe, args.window)
+    print(f"{stats['reports']} earlier report(s), window {stats['window']}, "
+          f"{'NumPy' if np is not None else 'pure Python'}")
+    print(summary(stats) or "(추세를 계산할 자료 부족)")
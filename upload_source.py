@@ -7,12 +7,20 @@ NotebookLM 자동 소스 업로드 스크립트
 사용법:
     python upload_source.py                          # 최신 보고서 자동 감지
     python upload_source.py output/20260226_AM.md   # 특정 파일 업로드
+    python upload_source.py a.md b.md --notebook URL # 여러 파일을 한 번의 업로드 대화상자로
+    python upload_source.py --since 20260301         # 그 날짜 이후 보고서 중 노트북에 없는 것 모두 업로드
+    python upload_source.py a.md --force             # 이미 올린 파일이어도 기존 소스를 지우고 다시 업로드
+
+같은 파일(이름·내용)을 두 번 올리지 않습니다: 업로드 기록(notebooklm_manifest.py)에 있으면 브라우저를 띄우지 않고,
+기록에 없어도 노트북 소스 목록에 같은 이름이 있으면 건너뜁니다.
 """
 
+import argparse
 import os
 import sys
 import time
 import json
+from datetime import datetime
 from pathlib import Path
 
 # Windows 콘솔 인코딩 문제 방지
@@ -29,9 +37,258 @@ from patchright.sync_api import sync_playwright
 from browser_utils import BrowserFactory
 from auth_manager import AuthManager
 
+sys.path.insert(0, str(Path(__file__).parent))
+import notebooklm_manifest
+import selector_registry
+
 # 업로드할 노트북 URL
 NOTEBOOK_URL = os.getenv("NOTEBOOKLM_URL", "YOUR_NOTEBOOKLM_URL")
 
+# 대기 조건 셀렉터 (notebooklm_debug.html 기준)
+ADD_SOURCE_BUTTONS = 'button[aria-label="업로드 소스 대화상자 열기"], button.upload-icon-button'
+SOURCE_PANEL_READY = f"{ADD_SOURCE_BUTTONS}, .single-source-container, .source-empty-state"
+UPLOAD_DIALOG_READY = 'button[xapscottyuploadertrigger], button[class*="upload-bu"], mat-dialog-container'
+SOURCE_ITEM = ".single-source-container"
+SOURCE_TITLE = ".source-title"
+SOURCE_BUSY = "mat-progress-spinner, mat-spinner, [role='progressbar']"
+SOURCE_ERROR = ".single-source-error-container"
+
+SPA_READY_TIMEOUT_MS = 30000
+DIALOG_TIMEOUT_MS = 10000
+UPLOAD_TIMEOUT_MS = 90000
+BATCH_EXTRA_MS_PER_FILE = 15000
+POLL_MS = 250
+# 이름이 같은 소스가 이미 여러 개 쌓였을 때 지울 최대 개수
+MAX_DUPLICATE_SOURCES = 5
+
+TIMING_LOG = Path(__file__).parent / "logs" / "upload_timing.jsonl"
+
+
+class Timeline:
+    """
+    업로드 단계별 실제 소요 시간. save() 하면 logs/upload_timing.jsonl 에 실행당 한 줄(JSON) 추가.
+    mark(step) 는 직전 mark 이후 걸린 시간을 기록
+    """
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.started = self.last = time.monotonic()
+        self.steps = []
+
+    def mark(self, step: str, **extra):
+        now = time.monotonic()
+        self.steps.append(dict(step=step, ms=round((now - self.last) * 1000), **extra))
+        self.last = now
+
+    def save(self, files, ok: bool):
+        total_ms = round((time.monotonic() - self.started) * 1000)
+        print("  [타이밍] " + ", ".join(f"{s['step']} {s['ms'] / 1000:.1f}s" for s in self.steps)
+              + f" / 합계 {total_ms / 1000:.1f}s")
+        entry = {"started_at": self.started_at, "mode": self.mode, "files": [os.path.basename(f) for f in files],
+                 "ok": ok, "total_ms": total_ms, "steps": self.steps}
+        try:
+            TIMING_LOG.parent.mkdir(parents=True, exist_ok=True)
+            with open(TIMING_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"  [경고] 타이밍 기록 실패: {e}")
+
+
+class UploadRequests:
+    """업로드 요청(URL 에 upload 포함, POST/PUT) 진행 상황 — 모두 끝나야 업로드 완료로 판단"""
+
+    def __init__(self, page):
+        self.page = page
+        self.inflight = set()
+        self.started = 0
+        self.failed = 0
+        page.on("request", self._on_request)
+        page.on("requestfinished", self._on_finished)
+        page.on("requestfailed", self._on_failed)
+
+    @staticmethod
+    def _is_upload(request):
+        return request.method in ("POST", "PUT") and "upload" in request.url.lower()
+
+    def _on_request(self, request):
+        if self._is_upload(request):
+            self.inflight.add(request)
+            self.started += 1
+
+    def _on_finished(self, request):
+        self.inflight.discard(request)
+
+    def _on_failed(self, request):
+        if request in self.inflight:
+            self.inflight.discard(request)
+            self.failed += 1
+
+    def idle(self) -> bool:
+        return not self.inflight
+
+    def close(self):
+        # 상주 브라우저에서는 페이지를 계속 쓰므로 리스너 제거
+        self.page.remove_listener("request", self._on_request)
+        self.page.remove_listener("requestfinished", self._on_finished)
+        self.page.remove_listener("requestfailed", self._on_failed)
+
+
+def wait_visible(page, selector: str, timeout_ms: int, state: str = "visible") -> bool:
+    """selector 중 하나가 나타날 때까지 대기 (고정 sleep 대신). 시간 초과면 False"""
+    try:
+        page.locator(selector).first.wait_for(state=state, timeout=timeout_ms)
+        return True
+    except Exception:
+        return False
+
+
+# 업로드 전 소스 행에 표시 → 완료 판단은 표시 없는 (새) 행만 보고 이름이 같은 기존 소스와 혼동하지 않음
+_MARK_SOURCES_JS = """({item}) => {
+    const rows = [...document.querySelectorAll(item)];
+    rows.forEach(row => row.dataset.beforeUpload = "1");
+    return rows.length;
+}"""
+
+
+_SOURCE_STATE_JS = """({item, title, busy, error, names}) => {
+    const rows = [...document.querySelectorAll(item)];
+    const fresh = rows.filter(row => !row.dataset.beforeUpload);
+    const text = row => ((row.querySelector(title) || row).innerText || "").trim();
+    const matches = name => fresh.filter(row => text(row).includes(name));
+    return {
+        count: rows.length,
+        ready: names.filter(n => matches(n).some(row => !row.querySelector(busy))),
+        errors: names.filter(n => matches(n).some(row => row.querySelector(error))),
+    };
+}"""
+
+
+_SOURCE_TITLES_JS = """({item, title}) => [...document.querySelectorAll(item)]
+    .map(row => ((row.querySelector(title) || row).innerText || "").trim())"""
+
+
+def existing_sources(page) -> list:
+    """노트북 소스 목록에 표시된 제목들"""
+    return page.evaluate(_SOURCE_TITLES_JS, {"item": SOURCE_ITEM, "title": SOURCE_TITLE})
+
+
+class SourceInventory:
+    """업로드 한 번에 한 번만 읽는 노트북 소스 목록. 파일이 이미 있는지 이름(확장자 유무 무관)으로 O(1) 확인"""
+
+    def __init__(self, titles):
+        self.titles = set()
+        for title in titles:
+            self.titles.add(title)
+            self.titles.add(os.path.splitext(title)[0])
+
+    def __len__(self):
+        return len(self.titles)
+
+    def has(self, path) -> bool:
+        return Path(path).stem in self.titles
+
+
+def skip_present(paths, inventory: SourceInventory, notebook_url: str, force: bool = False) -> tuple:
+    """
+    (올릴 파일, 노트북의 같은 이름 소스를 지우고 올릴 파일).
+    노트북에 같은 이름이 이미 있는 파일은 건너뛰고, 업로드 기록상 다른 내용으로 올렸던 파일(보고서 수정)과
+    force 인 파일은 기존 소스를 바꿔 올림 (같은 이름 소스가 두 개 남지 않도록)
+    """
+    known = notebooklm_manifest.entries(notebook_url)
+    adopted, changed = [], []
+    for path in paths:
+        if not inventory.has(path):
+            continue
+        entry = known.get(os.path.basename(path))
+        if force or (entry and entry["hash"] != notebooklm_manifest.content_hash(path)):
+            changed.append(path)
+        else:
+            adopted.append(path)
+    if adopted:
+        print(f"  이미 있는 소스 건너뜀: {', '.join(os.path.basename(p) for p in adopted)}")
+        notebooklm_manifest.record(notebook_url, adopted, origin="adopted")
+    if changed:
+        print(f"  기존 소스를 바꿔 올림: {', '.join(os.path.basename(p) for p in changed)}")
+    return [p for p in paths if p not in adopted], changed
+
+
+def _source_rows(page, path):
+    return page.locator(SOURCE_ITEM).filter(has_text=Path(path).stem)
+
+
+def remove_source(page, path, timeout_ms: int = DIALOG_TIMEOUT_MS) -> bool:
+    """소스 목록에서 이름이 같은 소스(들)를 삭제 (행 메뉴 → 삭제 → 확인). 하나라도 남으면 False"""
+    for _ in range(MAX_DUPLICATE_SOURCES):
+        rows = _source_rows(page, path)
+        count = rows.count()
+        if count == 0:
+            return True
+        row = rows.first
+        if not (selector_registry.attempt(row, "source_menu", lambda btn: js_click(page, btn), timeout_ms=0)
+                and selector_registry.attempt(page, "delete_source", lambda item: js_click(page, item))
+                and selector_registry.attempt(page, "confirm_delete", lambda btn: btn.click())):
+            page.keyboard.press("Escape")
+            return False
+        deadline = time.monotonic() + timeout_ms / 1000
+        while _source_rows(page, path).count() >= count:
+            if time.monotonic() > deadline:
+                return False
+            page.wait_for_timeout(POLL_MS)
+    return _source_rows(page, path).count() == 0
+
+
+def replace_sources(page, paths) -> list:
+    """기존 소스를 지우지 못한 파일 목록 (이번 실행에서는 올리지 않음)"""
+    failed = []
+    for path in paths:
+        if remove_source(page, path):
+            print(f"  [OK] 이전 소스 삭제: {os.path.basename(path)}")
+        else:
+            failed.append(path)
+    if failed:
+        print(f"  [경고] 이전 소스를 지우지 못해 건너뜀 (노트북에서 직접 지운 뒤 다시 실행): "
+              f"{', '.join(os.path.basename(p) for p in failed)}")
+    return failed
+
+
+def mark_sources(page) -> int:
+    """지금 있는 소스 행에 표시하고 행 수를 반환 (wait_for_sources 가 새 행만 보도록)"""
+    return page.evaluate(_MARK_SOURCES_JS, {"item": SOURCE_ITEM})
+
+
+def source_names(paths) -> list:
+    """소스 목록에 표시되는 이름 (확장자는 표시되지 않을 수 있으므로 stem 으로 비교)"""
+    return [Path(p).stem for p in paths]
+
+
+def wait_for_sources(page, paths, before: int, uploads: UploadRequests, timeout_ms: int = UPLOAD_TIMEOUT_MS) -> bool:
+    """
+    업로드한 파일이 모두 소스 목록에 새 행으로 나타나고(처리 중 표시 없음, 행 수 before + 파일 수 이상)
+    업로드 요청이 끝날 때까지 대기. before 는 mark_sources() 로 표시한 기존 행 수.
+    소스 목록 셀렉터가 전혀 맞지 않으면(화면 구조 변경) 업로드 요청 완료만으로 판단
+    """
+    names = source_names(paths)
+    args = {"item": SOURCE_ITEM, "title": SOURCE_TITLE, "busy": SOURCE_BUSY, "error": SOURCE_ERROR, "names": names}
+    deadline = time.monotonic() + timeout_ms / 1000
+    state = {"count": before, "ready": [], "errors": []}
+    while time.monotonic() < deadline:
+        state = page.evaluate(_SOURCE_STATE_JS, args)
+        if state["errors"]:
+            print(f"  [오류] 소스 처리 실패: {', '.join(state['errors'])}")
+            return False
+        if len(state["ready"]) == len(names) and state["count"] >= before + len(names) and uploads.idle():
+            return True
+        if state["count"] == 0 and before == 0 and uploads.started and uploads.idle():
+            print("  [경고] 소스 목록을 찾지 못해 업로드 요청 완료로 판단합니다 (화면 구조 변경 확인 필요)")
+            return uploads.failed == 0
+        page.wait_for_timeout(POLL_MS)
+    missing = [n for n in names if n not in state["ready"]]
+    print(f"  [오류] {timeout_ms // 1000}초 안에 업로드가 끝나지 않음: "
+          + (f"소스 목록에 없음 {', '.join(missing)} " if missing else "")
+          + f"(업로드 요청 {uploads.started}건, 진행 중 {len(uploads.inflight)}건)")
+    return False
+
 
 def js_click(page, locator):
     """
@@ -45,19 +302,177 @@ def js_click(page, locator):
     return False
 
 
-def upload_report(report_path: str, notebook_url: str = NOTEBOOK_URL) -> bool:
+def open_notebook(page, notebook_url: str, timeline: Timeline | None = None) -> bool:
+    """노트북 페이지를 열고 SPA(소스 패널)가 그려질 때까지 대기. 로그인 페이지로 넘어가면 False"""
+    print(f"\n[1/4] 노트북 페이지 로딩 중...")
+    page.goto(notebook_url, wait_until="domcontentloaded", timeout=60000)
+    if timeline:
+        timeline.mark("goto")
+
+    # 로그인 확인
+    if "accounts.google.com" in page.url:
+        print("[오류] 로그인이 필요합니다. 인증을 다시 설정하세요.")
+        return False
+
+    # SPA 렌더링 완료 = 소스 추가 버튼 / 소스 목록 / 빈 상태 중 하나가 DOM 에 나타남
+    if not wait_visible(page, SOURCE_PANEL_READY, SPA_READY_TIMEOUT_MS, state="attached"):
+        print(f"  [경고] {SPA_READY_TIMEOUT_MS // 1000}초 안에 소스 패널을 확인하지 못했습니다. 계속 진행합니다.")
+    if timeline:
+        timeline.mark("spa_ready")
+    if "accounts.google.com" in page.url:
+        print("[오류] 로그인이 필요합니다. 인증을 다시 설정하세요.")
+        return False
+
+    print(f"  현재 URL: {page.url}")
+    return True
+
+
+def _as_list(report_paths) -> list:
+    return [report_paths] if isinstance(report_paths, (str, Path)) else list(report_paths)
+
+
+def show_sources(page):
+    """소스 탭('출처')을 먼저 활성화 - 소스 패널이 숨겨져 있을 수 있음"""
+    try:
+        sources_tab = page.get_by_text("출처", exact=True)
+        if sources_tab.count() > 0:
+            js_click(page, sources_tab.first)
+            wait_visible(page, ADD_SOURCE_BUTTONS, 5000)
+            print("  소스 탭 활성화 완료")
+    except Exception:
+        pass
+
+
+def upload_on_page(page, report_paths, notebook_url: str, timeline: Timeline | None = None, force: bool = False) -> bool:
+    """
+    이미 열린 노트북 페이지에서 '소스 추가' → 파일 업로드.
+    report_paths 가 여러 개면 한 번의 파일 선택으로 모두 올리고 한 번만 완료 대기.
+    노트북에 같은 이름의 소스가 이미 있는 파일은 건너뛰고, 내용이 바뀐 파일(force 면 모두)은 기존 소스를 지운 뒤 올림.
+    올린 파일은 업로드 기록에 남김.
+    upload_report(새 브라우저)와 notebooklm_service(상주 브라우저)가 함께 사용.
+    timeline 을 주지 않으면(상주 브라우저) 직접 만들어 기록
+    """
+    paths = [os.path.abspath(p) for p in _as_list(report_paths)]
+    own_timeline = timeline is None
+    timeline = timeline or Timeline("service")
+    ok = False
+    try:
+        # 2. '소스 추가' 버튼 클릭 (오버레이 우회 위해 JS click 사용)
+        print(f"\n[2/4] '소스 추가' 버튼 찾는 중...")
+        show_sources(page)
+        titles = existing_sources(page)
+        timeline.mark("sources_tab", sources=len(titles))
+
+        paths, changed = skip_present(paths, SourceInventory(titles), notebook_url, force=force)
+        failed = replace_sources(page, changed) if changed else []
+        if changed:
+            paths = [p for p in paths if p not in failed]
+            timeline.mark("replace_sources", replaced=len(changed) - len(failed), failed=len(failed))
+        if not paths:
+            if not failed:
+                print("  [OK] 업로드할 새 파일이 없습니다.")
+            ok = not failed
+            return ok
+        ok = _upload_steps(page, paths, timeline, mark_sources(page))
+        if ok:
+            notebooklm_manifest.record(notebook_url, paths)
+        # 이전 소스를 지우지 못해 건너뛴 파일이 있으면 실패 (다음 실행에서 다시 시도)
+        ok = ok and not failed
+        return ok
+    finally:
+        if own_timeline:
+            timeline.save(paths, ok)
+
+
+def _upload_steps(page, paths: list, timeline: Timeline, before: int) -> bool:
+    # 소스 추가 버튼: 지난번에 통한 후보부터 (selector_registry)
+    add_source = selector_registry.attempt(page, "open_add_source", lambda btn: js_click(page, btn))
+    if add_source:
+        print(f"  [OK] 소스 추가 버튼 JS 클릭 성공 ({add_source})")
+
+    if not add_source:
+        print("  [오류] 소스 추가 버튼을 찾을 수 없습니다.")
+        page.screenshot(path="upload_error.png")
+        print("  스크린샷 저장: upload_error.png")
+        return False
+
+    # 3. 다이얼로그에서 '파일 업로드' 클릭 -> 파일 선택
+    print(f"\n[3/4] 업로드 다이얼로그 처리 중...")
+    if not wait_visible(page, UPLOAD_DIALOG_READY, DIALOG_TIMEOUT_MS):
+        print("  [경고] 업로드 다이얼로그를 확인하지 못했습니다. 파일 선택을 계속 시도합니다.")
+    timeline.mark("dialog_open")
+
+    # 다이얼로그 상태 디버그 스크린샷
+    page.screenshot(path="upload_dialog.png")
+    print("  다이얼로그 스크린샷 저장: upload_dialog.png")
+
+    # 파일 선택 전부터 업로드 요청 추적
+    uploads = UploadRequests(page)
+    try:
+        return _choose_and_wait(page, paths, timeline, before, uploads)
+    finally:
+        uploads.close()
+
+
+def _choose_and_wait(page, paths: list, timeline: Timeline, before: int, uploads: UploadRequests) -> bool:
+    def choose(trigger):
+        with page.expect_file_chooser(timeout=10000) as fc_info:
+            trigger.click(force=True)
+        fc_info.value.set_files(paths)
+
+    # '파일 업로드' 버튼 force 클릭 → 파일 선택 (후보 순서는 selector_registry)
+    file_set = selector_registry.attempt(page, "file_chooser", choose)
+    if file_set:
+        print(f"  [OK] 파일 선택 완료 ({file_set}): {', '.join(os.path.basename(p) for p in paths)}")
+
+    if not file_set:
+        print("  [오류] 파일 설정 방법 모두 실패")
+        page.screenshot(path="upload_error.png")
+        print("  스크린샷 저장: upload_error.png")
+        return False
+
+    timeline.mark("file_set")
+
+    # 4. 업로드 완료 대기 (소스 목록에 새 소스가 나타나고 업로드 요청이 끝날 때까지)
+    print(f"\n[4/4] 업로드 처리 중 (최대 {UPLOAD_TIMEOUT_MS // 1000}초 대기)...")
+    done = wait_for_sources(page, paths, before, uploads,
+                            timeout_ms=UPLOAD_TIMEOUT_MS + BATCH_EXTRA_MS_PER_FILE * (len(paths) - 1))
+    timeline.mark("source_ready", requests=uploads.started)
+    if not done:
+        page.screenshot(path="upload_error.png")
+        print("  스크린샷 저장: upload_error.png")
+        return False
+
+    # 성공 스크린샷
+    page.screenshot(path="upload_success.png")
+    print("  스크린샷 저장: upload_success.png")
+    print("  [OK] 업로드 완료!")
+
+    return True
+
+
+def upload_report(report_paths, notebook_url: str = NOTEBOOK_URL, force: bool = False) -> bool:
     """
-    분석 보고서를 NotebookLM 노트북에 파일 소스로 업로드합니다.
+    분석 보고서(여러 개 가능)를 NotebookLM 노트북에 파일 소스로 업로드합니다.
+    브라우저 실행, 노트북 로딩, 업로드 대화상자는 파일 수와 관계없이 한 번.
+    업로드 기록상 모두 이미 올린 파일이면 브라우저를 띄우지 않음
     """
     # 절대경로로 변환
-    report_path = os.path.abspath(report_path)
+    report_paths = [os.path.abspath(p) for p in _as_list(report_paths)]
 
-    if not os.path.exists(report_path):
-        print(f"[오류] 파일을 찾을 수 없습니다: {report_path}")
+    missing = [p for p in report_paths if not os.path.exists(p)]
+    if missing:
+        print(f"[오류] 파일을 찾을 수 없습니다: {', '.join(missing)}")
         return False
+    if not force:
+        report_paths = notebooklm_manifest.pending(notebook_url, report_paths)
+        if not report_paths:
+            print("[완료] 업로드 기록상 모두 이미 올린 파일입니다.")
+            return True
 
     print(f"[업로드 시작]")
-    print(f"  파일: {report_path}")
+    for report_path in report_paths:
+        print(f"  파일: {report_path}")
     print(f"  노트북: {notebook_url}")
 
     # 인증 상태 확인
@@ -71,143 +486,13 @@ def upload_report(report_path: str, notebook_url: str = NOTEBOOK_URL) -> bool:
         context = BrowserFactory.launch_persistent_context(p, headless=True)
         page = context.new_page()
 
+        timeline = Timeline("cold")
+        ok = False
         try:
-            # 1. 노트북 페이지 이동
-            print(f"\n[1/4] 노트북 페이지 로딩 중...")
-            page.goto(notebook_url, wait_until="domcontentloaded", timeout=60000)
-            page.wait_for_timeout(7000)  # SPA 렌더링 충분히 대기
-
-            # 로그인 확인
-            if "accounts.google.com" in page.url:
-                print("[오류] 로그인이 필요합니다. 인증을 다시 설정하세요.")
-                return False
-
-            print(f"  현재 URL: {page.url}")
-
-            # 2. '소스 추가' 버튼 클릭 (오버레이 우회 위해 JS click 사용)
-            print(f"\n[2/4] '소스 추가' 버튼 찾는 중...")
-
-            # 소스 탭('출처')을 먼저 활성화 - 소스 패널이 숨겨져 있을 수 있음
-            try:
-                sources_tab = page.get_by_text("출처", exact=True)
-                if sources_tab.count() > 0:
-                    js_click(page, sources_tab.first)
-                    page.wait_for_timeout(1500)
-                    print("  소스 탭 활성화 완료")
-            except Exception:
-                pass
-
-            add_source_clicked = False
-
-            # 시도 1: aria-label 버튼을 JS click으로 클릭
-            btn = page.locator('button[aria-label="업로드 소스 대화상자 열기"]')
-            if btn.count() > 0:
-                try:
-                    if js_click(page, btn.first):
-                        add_source_clicked = True
-                        print("  [OK] aria-label 버튼 JS 클릭 성공")
-                except Exception as e:
-                    print(f"  aria-label JS 클릭 실패: {e}")
-
-            # 시도 2: 소스 패널의 upload 아이콘 버튼 (소스가 이미 있는 노트북)
-            if not add_source_clicked:
-                upload_icon_btn = page.locator('button.upload-icon-button')
-                if upload_icon_btn.count() > 0:
-                    try:
-                        if js_click(page, upload_icon_btn.first):
-                            add_source_clicked = True
-                            print("  [OK] upload-icon-button JS 클릭 성공")
-                    except Exception as e:
-                        print(f"  upload-icon-button 클릭 실패: {e}")
-
-            # 시도 3: 텍스트 기반 버튼
-            if not add_source_clicked:
-                for text in ["소스 추가", "소스 업로드", "시작하려면 소스 추가"]:
-                    el = page.get_by_text(text, exact=True)
-                    if el.count() > 0:
-                        try:
-                            if js_click(page, el.first):
-                                add_source_clicked = True
-                                print(f"  [OK] 텍스트 '{text}'로 클릭 성공")
-                                break
-                        except Exception as e:
-                            print(f"  '{text}' JS 클릭 실패: {e}")
-
-            if not add_source_clicked:
-                print("  [오류] 소스 추가 버튼을 찾을 수 없습니다.")
-                page.screenshot(path="upload_error.png")
-                print("  스크린샷 저장: upload_error.png")
-                return False
-
-            # 3. 다이얼로그에서 '파일 업로드' 클릭 -> 파일 선택
-            print(f"\n[3/4] 업로드 다이얼로그 처리 중...")
-            page.wait_for_timeout(3000)  # 다이얼로그 열리길 대기
-
-            # 다이얼로그 상태 디버그 스크린샷
-            page.screenshot(path="upload_dialog.png")
-            print("  다이얼로그 스크린샷 저장: upload_dialog.png")
-
-            # 방법 1: button[xapscottyuploadertrigger] - HTML 분석으로 확인된 정확한 셀렉터
-            file_set = False
-            try:
-                upload_trigger = page.locator('button[xapscottyuploadertrigger]')
-                count = upload_trigger.count()
-                print(f"  xapscottyuploadertrigger 버튼 수: {count}")
-                if count > 0:
-                    with page.expect_file_chooser(timeout=10000) as fc_info:
-                        upload_trigger.first.click(force=True)
-                        print("  [OK] xapscottyuploadertrigger 버튼 force 클릭")
-                    file_chooser = fc_info.value
-                    file_chooser.set_files(report_path)
-                    file_set = True
-                    print(f"  [OK] 파일 선택 완료: {os.path.basename(report_path)}")
-            except Exception as e:
-                print(f"  xapscottyuploadertrigger 방식 실패: {e}")
-
-            # 방법 2: class에 'upload-bu' 포함하는 버튼
-            if not file_set:
-                try:
-                    upload_btn = page.locator('button[class*="upload-bu"]').first
-                    if upload_btn.count() > 0:
-                        with page.expect_file_chooser(timeout=10000) as fc_info:
-                            upload_btn.click(force=True)
-                            print("  [OK] upload-bu* 버튼 force 클릭")
-                        file_chooser = fc_info.value
-                        file_chooser.set_files(report_path)
-                        file_set = True
-                        print(f"  [OK] 파일 선택 완료: {os.path.basename(report_path)}")
-                except Exception as e:
-                    print(f"  upload-bu* 방식 실패: {e}")
-
-            # 방법 3: '파일 업로드' 텍스트 버튼 force 클릭
-            if not file_set:
-                try:
-                    with page.expect_file_chooser(timeout=10000) as fc_info:
-                        page.get_by_text("파일 업로드", exact=True).first.click(force=True)
-                        print("  [OK] '파일 업로드' force 클릭")
-                    file_chooser = fc_info.value
-                    file_chooser.set_files(report_path)
-                    file_set = True
-                    print(f"  [OK] 파일 선택 완료: {os.path.basename(report_path)}")
-                except Exception as e:
-                    print(f"  텍스트 방식 실패: {e}")
-
-            if not file_set:
-                print("  [오류] 파일 설정 방법 모두 실패")
-                page.screenshot(path="upload_error.png")
-                print("  스크린샷 저장: upload_error.png")
+            if not open_notebook(page, notebook_url, timeline):
                 return False
-
-            # 4. 업로드 완료 대기
-            print(f"\n[4/4] 업로드 처리 중 (최대 30초 대기)...")
-            page.wait_for_timeout(20000)
-
-            # 성공 스크린샷
-            page.screenshot(path="upload_success.png")
-            print("  스크린샷 저장: upload_success.png")
-            print("  [OK] 업로드 완료!")
-
-            return True
+            ok = upload_on_page(page, report_paths, notebook_url, timeline, force=force)
+            return ok
 
         except Exception as e:
             print(f"\n[오류] 업로드 실패: {e}")
@@ -219,32 +504,69 @@ def upload_report(report_path: str, notebook_url: str = NOTEBOOK_URL) -> bool:
             return False
 
         finally:
+            timeline.save(report_paths, ok)
             context.close()
 
 
 def get_latest_report() -> str:
-    """최신 보고서 경로 자동 감지"""
-    output_dir = Path(__file__).parent / "output" / "reports"
-    reports = sorted(output_dir.glob("*_분석보고서.md"), reverse=True)
-    return str(reports[0]) if reports else ""
+    """최신 보고서 경로 자동 감지 (보고서 색인 조회)"""
+    import report_index
+    row = report_index.latest()
+    return row["path"] if row else ""
 
 
-if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        report_path = sys.argv[1]
-        notebook_url = sys.argv[2] if len(sys.argv) > 2 else NOTEBOOK_URL
-    else:
-        report_path = get_latest_report()
-        notebook_url = NOTEBOOK_URL
+def reports_since(since) -> list:
+    """since 이후 보고서 경로 (NotebookLM 용으로 렌더링된 파일이 있으면 그것을)"""
+    import report_index
+    notebooklm_dir = Path(__file__).parent / "output" / "notebooklm"
+    paths = []
+    for row in report_index.reports(since=since):
+        rendered = notebooklm_dir / row["name"]
+        paths.append(str(rendered) if rendered.exists() else row["path"])
+    return paths
+
 
-        if not report_path:
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NotebookLM 소스 업로드")
+    parser.add_argument("paths", nargs="*", help="업로드할 파일 (여러 개면 한 번에)")
+    parser.add_argument("--notebook", default=NOTEBOOK_URL, help="노트북 URL")
+    parser.add_argument("--since", help="YYYYMMDD 이후 보고서 중 노트북에 없는 것 모두 업로드")
+    parser.add_argument("--force", action="store_true", help="이미 올린 파일이어도 기존 소스를 지우고 다시 업로드")
+    args = parser.parse_args()
+
+    # 예전 호출 형식 호환: upload_source.py <파일> <노트북 URL>
+    report_paths = [p for p in args.paths if not p.startswith("http")]
+    notebook_url = next((p for p in args.paths if p.startswith("http")), args.notebook)
+    if args.since:
+        synced = reports_since(args.since)
+        report_paths += synced
+        print(f"[동기화] {args.since} 이후 보고서 {len(synced)}개 (노트북에 이미 있는 것은 건너뜀)")
+    elif not report_paths:
+        latest_report = get_latest_report()
+
+        if not latest_report:
             print("[오류] 업로드할 보고서를 찾을 수 없습니다.")
             print("  사용법: python upload_source.py <파일경로>")
             sys.exit(1)
 
-        print(f"[자동 감지] 최신 보고서: {report_path}")
-
-    success = upload_report(report_path, notebook_url)
+        print(f"[자동 감지] 최신 보고서: {latest_report}")
+        report_paths = [latest_report]
+    missing = [p for p in report_paths if not os.path.exists(p)]
+    if missing:
+        print(f"[오류] 파일을 찾을 수 없습니다: {', '.join(missing)}")
+        sys.exit(1)
+    if not args.force:
+        report_paths = notebooklm_manifest.pending(notebook_url, report_paths)
+    if not report_paths:
+        print("[완료] 업로드할 새 파일이 없습니다 (업로드 기록상 모두 이미 올림).")
+        sys.exit(0)
+
+    # 상주 브라우저(notebooklm_service.py)가 실행 중이면 그쪽으로, 아니면 새 브라우저로
+    import notebooklm_service
+    success = notebooklm_service.run_or_fallback(
+        "upload", lambda: upload_report(report_paths, notebook_url, force=args.force),
+        timeout=120 + 30 * len(report_paths),
+        notebook_url=notebook_url, paths=[os.path.abspath(p) for p in report_paths], force=args.force)
 
     if success:
         print("\n[완료] NotebookLM 업로드 성공!")